@@ -32,11 +32,109 @@ AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-pre
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-3-pro-preview")
 
+# Document Intelligence 추출 (큰 PDF는 페이지 구간별로 동시에 분석)
+DOCUMENT_PAGES_PER_RANGE = int(os.getenv("DOCUMENT_PAGES_PER_RANGE", "20"))  # 구간당 페이지 수
+DOCUMENT_MAX_CONCURRENT_RANGES = int(os.getenv("DOCUMENT_MAX_CONCURRENT_RANGES", "4"))  # 파일 하나에서 동시에 분석하는 구간 수
+DOCUMENT_POLL_INTERVAL = float(os.getenv("DOCUMENT_POLL_INTERVAL", "1"))  # 분석 완료 확인 주기 (초)
+DOCUMENT_TEXT_LAYER_MIN_CHARS = int(os.getenv("DOCUMENT_TEXT_LAYER_MIN_CHARS", "40"))  # PDF 텍스트 레이어를 쓰는 페이지의 최소 글자 수 (미만이면 OCR)
+DOCUMENT_TEXT_LAYER_MAX_GARBAGE = float(os.getenv("DOCUMENT_TEXT_LAYER_MAX_GARBAGE", "0.05"))  # 깨진 문자 비율 상한 (초과하면 OCR)
+
+# LLM 전처리 (긴 문서는 구간으로 나누어 동시 처리)
+ANALYZE_SEGMENT_MAX_CHARS = int(os.getenv("ANALYZE_SEGMENT_MAX_CHARS", "20000"))  # 구간당 최대 글자 수
+ANALYZE_CONCURRENCY = int(os.getenv("ANALYZE_CONCURRENCY", "4"))  # 파일 하나에서 동시에 보내는 Gemini 호출 수
+
+# 임베딩 배치 처리
+EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "64"))  # 요청당 최대 입력 개수
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "50000"))  # 요청당 최대 토큰 (추정치)
+EMBEDDING_MAX_INPUT_TOKENS = int(os.getenv("EMBEDDING_MAX_INPUT_TOKENS", "8000"))  # 입력 1건당 최대 토큰
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))  # 동시에 보내는 배치 수
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+
+# 임베딩 캐시 (쿼리 / 청크 텍스트)
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 메모리 계층 상한 (0이면 메모리 캐시 끔)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "")  # 지정하면 디스크 계층 사용
+EMBEDDING_CACHE_DISK_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))  # 디스크 계층 상한 (넘으면 오래 안 쓴 파일부터 삭제, 0이면 제한 없음)
+
+# AI Search 배치 업로드
+SEARCH_UPLOAD_MAX_BYTES = int(os.getenv("SEARCH_UPLOAD_MAX_BYTES", str(12 * 1024 * 1024)))  # 요청당 최대 크기 (서비스 한도 16MB)
+SEARCH_UPLOAD_MAX_DOCS = int(os.getenv("SEARCH_UPLOAD_MAX_DOCS", "1000"))  # 요청당 최대 문서 수 (서비스 한도 1000)
+SEARCH_UPLOAD_CONCURRENCY = int(os.getenv("SEARCH_UPLOAD_CONCURRENCY", "4"))
+SEARCH_UPLOAD_MAX_RETRIES = int(os.getenv("SEARCH_UPLOAD_MAX_RETRIES", "4"))
+
+# 검색 인덱스 부트스트랩 (앱 시작 시 스키마 확인 / 없는 인덱스 생성)
+SEARCH_INDEX_BOOTSTRAP = os.getenv("SEARCH_INDEX_BOOTSTRAP", "true").lower() == "true"
+SEARCH_KNOWN_INDEXES = [name.strip() for name in os.getenv("SEARCH_KNOWN_INDEXES", "").split(",") if name.strip()]  # 기본 인덱스 외에 미리 만들 인덱스
+
+# 인덱스 통계 (메모리 캐시 + 백그라운드 갱신)
+INDEX_STATS_REFRESH_SECONDS = float(os.getenv("INDEX_STATS_REFRESH_SECONDS", "300"))  # 0이면 백그라운드 갱신 끔
+
+# 검색 백엔드
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "azure")  # azure | local (로컬 엔진만) | replica (Azure에 쓰고 로컬에서 검색)
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "local_index"))
+LOCAL_IVF_MIN_ROWS = int(os.getenv("LOCAL_IVF_MIN_ROWS", "20000"))  # 이보다 적으면 IVF 없이 전수 비교
+LOCAL_IVF_NPROBE = int(os.getenv("LOCAL_IVF_NPROBE", "16"))  # 검색 시 탐색할 클러스터 수
+LOCAL_IVF_REBUILD_RATIO = float(os.getenv("LOCAL_IVF_REBUILD_RATIO", "0.2"))  # IVF 이후 추가된 행 비율이 넘으면 재생성
+
+# HTTP 연결 풀 (SDK 클라이언트 공유)
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))  # 호스트당 유지할 keep-alive 연결 수
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))  # 유휴 연결 유지 시간 (초)
+
+# 동기 SDK 호출용 스레드 풀 (이벤트 루프 블로킹 방지)
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "32"))
+
+# 업로드 처리(Ingest) 워커 풀
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))  # 동시에 처리하는 파일 수
+INGEST_QUEUE_MAX = int(os.getenv("INGEST_QUEUE_MAX", "50"))  # 대기열 최대 길이 (초과 시 429)
+INGEST_STAGE_LIMITS = os.getenv("INGEST_STAGE_LIMITS", "blob=4,extract=2,llm=2,index=2")  # 단계별 동시 실행 상한 (index는 임베딩+업로드)
+INGEST_DRAIN_TIMEOUT = float(os.getenv("INGEST_DRAIN_TIMEOUT", "60"))  # 종료 시 대기열 처리 대기 시간 (초)
+
+# 업로드 스풀 (요청 본문을 임시 파일에 기록하며 해시 계산, 이후 단계는 파일에서 읽음)
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", "")  # 비우면 시스템 임시 디렉터리
+UPLOAD_SPOOL_CHUNK_BYTES = int(os.getenv("UPLOAD_SPOOL_CHUNK_BYTES", str(1024 * 1024)))  # 한 번에 읽는 크기
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(500 * 1024 * 1024)))  # 파일 최대 크기 (초과 시 413, 0이면 제한 없음)
+BLOB_UPLOAD_CONCURRENCY = int(os.getenv("BLOB_UPLOAD_CONCURRENCY", "4"))  # 큰 파일 블록 병렬 업로드 수
+
+# Blob SAS 서명 (개발: 계정 키 / 그 외: Managed Identity의 user delegation key를 캐시해 재사용)
+BLOB_SAS_HOURS = float(os.getenv("BLOB_SAS_HOURS", "1"))  # 발급하는 SAS URL 유효 시간
+BLOB_DELEGATION_KEY_HOURS = float(os.getenv("BLOB_DELEGATION_KEY_HOURS", "24"))  # user delegation key 유효 시간 (최대 7일)
+BLOB_DELEGATION_KEY_REFRESH_MARGIN = int(os.getenv("BLOB_DELEGATION_KEY_REFRESH_MARGIN", "900"))  # 만료 몇 초 전에 새 키를 받을지
+
+# 업로드 작업 상태 저장소
+TASK_STATE_BACKEND = os.getenv("TASK_STATE_BACKEND", "memory")  # memory | sqlite (여러 워커 공유)
+TASK_STATE_DB_PATH = os.getenv("TASK_STATE_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "task_state.db"))
+TASK_TTL_SECONDS = int(os.getenv("TASK_TTL_SECONDS", "3600"))  # 완료된 작업 보관 시간
+TASK_FLUSH_INTERVAL = float(os.getenv("TASK_FLUSH_INTERVAL", "1.0"))  # 진행률 저장 주기 (초)
+
+# 채팅 컨텍스트 (프롬프트에 넣는 검색 결과)
+CHAT_SEARCH_TOP_K = int(os.getenv("CHAT_SEARCH_TOP_K", "8"))  # 검색 결과 수 (예산 안에서 점수 순으로 채움)
+CHAT_CONTEXT_MAX_TOKENS = int(os.getenv("CHAT_CONTEXT_MAX_TOKENS", "6000"))  # 컨텍스트 토큰 예산
+CHAT_CONTEXT_CHUNK_MAX_TOKENS = int(os.getenv("CHAT_CONTEXT_CHUNK_MAX_TOKENS", "1500"))  # 청크 하나의 최대 토큰
+
+# 인수인계서 생성 (섹션별 검색 + 병렬 생성)
+HANDOVER_CONCURRENCY = int(os.getenv("HANDOVER_CONCURRENCY", "7"))  # 동시에 생성하는 섹션 수
+HANDOVER_SECTION_TOP_K = int(os.getenv("HANDOVER_SECTION_TOP_K", "8"))  # 섹션별 검색 결과 수
+HANDOVER_SECTION_MAX_TOKENS = int(os.getenv("HANDOVER_SECTION_MAX_TOKENS", "3000"))  # 섹션별 검색 컨텍스트 토큰 예산
+HANDOVER_FILE_CONTEXT_TOKENS = int(os.getenv("HANDOVER_FILE_CONTEXT_TOKENS", "2000"))  # 요청에 포함된 파일 내용을 섹션마다 넣는 최대 토큰
+HANDOVER_SECTION_RETRIES = int(os.getenv("HANDOVER_SECTION_RETRIES", "1"))  # 누락/검증 실패한 키만 다시 요청하는 횟수
+
+# 채팅 답변 캐시
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))  # 0이면 비활성화
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "600"))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))  # 비슷한 질문 재사용 임계값 (0이면 정확히 같은 질문만)
+
 # ===== NEW: Key Vault 설정 =====
 
 KEYVAULT_URL = os.getenv("KEYVAULT_URL", "https://honeycomb-kv.vault.azure.net/")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
+# Key Vault 시크릿 캐시 (만료 전 백그라운드 갱신, Key Vault 장애 시 이전 값 사용)
+SECRET_CACHE_TTL_SECONDS = float(os.getenv("SECRET_CACHE_TTL_SECONDS", "3600"))  # 기본 캐시 유효 시간
+SECRET_CACHE_TTLS = os.getenv("SECRET_CACHE_TTLS", "")  # 시크릿별 유효 시간 (예: "AZURE-OPENAI-API-KEY=600,JWT-SECRET=86400")
+SECRET_REFRESH_AHEAD_SECONDS = float(os.getenv("SECRET_REFRESH_AHEAD_SECONDS", "300"))  # 만료 몇 초 전부터 백그라운드 갱신
+SECRET_REFRESH_CHECK_SECONDS = float(os.getenv("SECRET_REFRESH_CHECK_SECONDS", "30"))  # 갱신 대상 확인 주기
+SECRET_MAX_STALE_SECONDS = float(os.getenv("SECRET_MAX_STALE_SECONDS", "86400"))  # Key Vault 장애 시 만료된 값을 계속 쓸 수 있는 시간
+SECRET_PREFETCH = os.getenv("SECRET_PREFETCH", "")  # 앱 시작 시 한 번에 미리 가져올 시크릿 이름 (쉼표 구분)
+
 # ===== NEW: Key Vault 클라이언트 초기화 =====
 
 from azure.identity import DefaultAzureCredential
@@ -66,29 +164,23 @@ def get_keyvault_client():
             print(f"⚠️ Key Vault 연결 실패: {e}")
     return _keyvault_client
 
+def fetch_secret(secret_name: str) -> str:
+    """
+    Key Vault에서 시크릿 한 건 조회 (캐시 없이 매번 요청)
+    클라이언트가 없거나 조회에 실패하면 예외
+    """
+    client = get_keyvault_client()
+    if client is None:
+        raise Exception("Key Vault 클라이언트를 만들 수 없습니다")
+    return client.get_secret(secret_name).value
+
 def get_secret(secret_name: str) -> str:
-    """Key Vault에서 시크릿 가져오기 (캐싱 없음)"""
-    
-    # 로컬 개발: 먼저 .env에서 확인
-    if ENVIRONMENT == "development":
-        env_value = os.getenv(secret_name)
-        if env_value:
-            return env_value
-    
-    # Key Vault에서 가져오기
-    try:
-        client = get_keyvault_client()
-        if client:
-            secret = client.get_secret(secret_name)
-            return secret.value
-    except Exception as e:
-        print(f"⚠️ Key Vault에서 {secret_name} 조회 실패: {e}")
-    
-    # 환경변수에도 없고 Key Vault도 실패 시
-    if ENVIRONMENT == "development":
-        return ""  # 개발 환경에서는 빈 문자열 반환
-    else:
-        raise Exception(f"필수 시크릿 {secret_name}을(를) 찾을 수 없습니다")
+    """
+    시크릿 가져오기 (secret_cache를 통해 TTL 동안 재사용, 만료 전 백그라운드 갱신)
+    로컬 개발에서는 .env 값을 먼저 사용
+    """
+    from app.services.secret_cache import secret_cache
+    return secret_cache.get(secret_name)
 
 # ===== 환경변수 검증 (기존) =====
 
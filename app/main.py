@@ -1,9 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from app.routers import upload, chat, auth  # ← 추가: auth import
-from app.config import validate_config
+from app.auth import require_role
+from app.config import validate_config, INGEST_DRAIN_TIMEOUT, SEARCH_BACKEND, SEARCH_INDEX_BOOTSTRAP
+from app.services.blob_service import known_containers, sas_signer
+from app.services.client_registry import client_registry
+from app.services.embedding_cache import embedding_cache
+from app.services.executor import shutdown_executor, run_blocking
+from app.services.index_bootstrap import index_registry
+from app.services.index_stats import index_stats
+from app.services.ingest_queue import ingest_queue
+from app.services.secret_cache import secret_cache
+from app.services.upload_spool import remove_all_spools
+from app.state import task_manager
+from contextlib import asynccontextmanager
 import os
 
 
@@ -13,7 +25,36 @@ if not is_config_valid:
     print("⚠️  Warning: Some environment variables are missing. Some features may not work correctly.")
 
 
-app = FastAPI(title="RAG Chatbot API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 시작/종료 시 공유 리소스 관리"""
+    # 시작: 자주 쓰는 Key Vault 시크릿을 한 번에 미리 가져오고 만료 전 백그라운드 갱신
+    await run_blocking(secret_cache.prefetch)
+    secret_cache.start()
+    # 시작: 인덱스 스키마 확인/생성을 한 번만 (업로드/검색 경로에서는 스키마 조회 없음)
+    if SEARCH_INDEX_BOOTSTRAP and SEARCH_BACKEND != "local":
+        await run_blocking(index_registry.bootstrap)
+    ingest_queue.start()
+    index_stats.start()
+    yield
+    index_stats.stop()
+    secret_cache.stop()
+    # 종료: 새 업로드 접수를 멈추고 대기 중인 Ingest 작업을 마무리
+    # (최대 INGEST_DRAIN_TIMEOUT초 대기하므로 스레드 풀에서 실행하여 이벤트 루프를 막지 않음)
+    abandoned = await run_blocking(ingest_queue.drain, INGEST_DRAIN_TIMEOUT)
+    for task_id in abandoned:
+        task_manager.update_task(task_id, status="failed", message="Server shut down before processing started. Please upload again.")
+    task_manager.flush()
+    # 처리하지 못한 업로드의 스풀 임시 파일 정리
+    removed = remove_all_spools()
+    if removed:
+        print(f"🧹 Removed {removed} pending upload spool files")
+    # 종료: 진행 중인 블로킹 호출을 마친 뒤 공유 SDK 클라이언트와 keep-alive 연결 정리
+    shutdown_executor()
+    client_registry.close()
+
+
+app = FastAPI(title="RAG Chatbot API", lifespan=lifespan)
 
 
 # CORS 미들웨어 설정
@@ -97,6 +138,36 @@ def health_check():
     return {"status": "ok", "config_valid": is_config_valid}
 
 
+@app.get("/api/health/clients")
+def client_stats():
+    """SDK 클라이언트 생성/재사용 및 HTTP 연결 재사용 통계"""
+    return client_registry.stats()
+
+
+@app.get("/api/health/embedding-cache")
+def embedding_cache_stats():
+    """임베딩 캐시 적중률 및 메모리 사용량"""
+    return embedding_cache.stats()
+
+
+@app.get("/api/health/indexes")
+def index_registry_health():
+    """캐시된 인덱스 목록, 시작 시 생성한 인덱스, 코드 스키마와의 차이(drift)"""
+    return index_registry.stats()
+
+
+@app.get("/api/health/blob")
+def blob_stats():
+    """확인된 Blob 컨테이너 목록과 SAS 서명 방식 / user delegation key 만료 시각"""
+    return {"known_containers": known_containers(), "sas": sas_signer.stats()}
+
+
+@app.get("/api/admin/secrets")
+def secret_cache_stats(user: dict = Depends(require_role('admin'))):
+    """시크릿별 캐시 나이 / 만료까지 남은 시간 / Key Vault 조회 실패 기록 (값은 노출하지 않음)"""
+    return secret_cache.stats()
+
+
 @app.get("/test")
 def test():
     return {"message": "Backend is working!"}
@@ -1,11 +1,21 @@
 # app/routers/chat.py
 
 from fastapi import APIRouter, HTTPException, Depends, Request  # ← Request 추가!
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.services.search_service import search_documents
-from app.services.openai_service import chat_with_context, analyze_files_for_handover
+from app.services.search_filters import FilterError, parse_filters
+from app.services.openai_service import chat_with_context, chat_with_context_stream, analyze_files_for_handover, get_embedding
+from app.services.answer_cache import answer_cache
+from app.config import AZURE_SEARCH_INDEX_NAME, CHAT_SEARCH_TOP_K
+from app.services.context_builder import build_context
+from app.services.handover_engine import empty_handover, iter_handover_events, merge_section
 from app.auth import get_current_user  # ← 추가 (한 줄)
+from app.services.executor import run_blocking, iterate_blocking
+from app.services.metrics import metrics
+from app.services.sse import format_sse, SSE_HEADERS
 import json
+import time
 import traceback
 from app.routers.auth import verify_csrf_token, verify_token
 
@@ -18,9 +28,13 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     messages: list
     index_name: str = None  # RAG 인덱스 선택 (optional)
+    stream: bool = False  # True면 SSE로 sources → token... → done 순서로 전송
+    filters: dict = None  # 검색 필터 (예: {"fileType": "code", "tags": ["배포"], "isArchived": false})
 
 class AnalyzeRequest(BaseModel):
     messages: list
+    index_name: str = None  # 검색할 RAG 인덱스 (None이면 기본 인덱스)
+    stream: bool = False  # True면 SSE로 항목(section)이 완성되는 대로 전송 → done
 
 # ===== 변경 1: analyze 함수 =====
 @router.post("/analyze")
@@ -39,6 +53,7 @@ async def analyze(
     verify_csrf_token(csrf_token, user['email'])
     """
     인수인계서 분석 (로그인 필수)
+    stream=true면 HandoverData 최상위 항목을 완성·검증되는 즉시 SSE로 보냅니다.
     """
     try:
         # 사용자 정보 로깅 (감사 추적)
@@ -55,9 +70,17 @@ async def analyze(
         if len(user_message) == 0:
             print("⚠️ 빈 메시지 - 샘플 데이터로 응답")
 
+        # 스트리밍: 항목별로 완성되는 즉시 전송
+        if analyze_request.stream:
+            return StreamingResponse(
+                _stream_handover(user, user_message, analyze_request.index_name),
+                media_type="text/event-stream",
+                headers=SSE_HEADERS
+            )
+
         # OpenAI API를 호출하여 인수인계서 JSON 생성
         print("🤖 OpenAI API 호출 시작...")
-        response = analyze_files_for_handover(user_message)
+        response = await run_blocking(analyze_files_for_handover, user_message, analyze_request.index_name)
 
         print(f"✅ OpenAI 응답 완료 - 타입: {type(response)}")
         print(f"응답 샘플: {str(response)[:200]}")
@@ -94,6 +117,47 @@ async def analyze(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _stream_handover(user: dict, file_context: str, index_name: str = None):
+    """
+    SSE 이벤트 순서 (섹션은 병렬 생성되므로 항목 순서는 완성 순):
+      section (HandoverData 최상위 키 하나: key, value) 여러 번
+      section_error (재요청 후에도 실패한 섹션, 해당 키는 기본값)
+      done (병합된 전체 HandoverData + 지연 시간)
+    """
+    started = time.perf_counter()
+    handover = empty_handover()
+    first = None
+    try:
+        async for kind, payload in iterate_blocking(iter_handover_events(file_context, index_name)):
+            if kind == "key":
+                if first is None:
+                    first = time.perf_counter() - started
+                    metrics.record("analyze.stream.first_section", first)
+                yield format_sse("section", payload)
+            else:
+                merge_section(handover, payload)
+                if payload["error"]:
+                    yield format_sse("section_error", {"section": payload["section"], "detail": payload["error"]})
+    except Exception as e:
+        print(f"❌ Analyze stream error: {e}")
+        yield format_sse("error", {"detail": str(e)})
+        return
+
+    total = time.perf_counter() - started
+    metrics.record("analyze.stream.total", total)
+    print(f"✅ [{user['name']}] 인수인계서 스트리밍 완료 - {total:.2f}s")
+    yield format_sse("done", {
+        "content": handover,
+        "first_section_ms": round((first or total) * 1000, 1),
+        "total_ms": round(total * 1000, 1),
+        "user_info": {
+            "name": user['name'],
+            "email": user['email'],
+            "role": user['role']
+        }
+    })
+
+
 # ===== 변경 2: chat 함수 =====
 @router.post("/chat")
 async def chat(
@@ -111,7 +175,9 @@ async def chat(
     verify_csrf_token(csrf_token, user['email'])  # ← CSRF 검증!
     """
     채팅 (로그인 필수)
+    stream=true면 검색 직후 sources를 먼저 보내고, 답변 토큰은 생성되는 대로 SSE로 전송합니다.
     """
+    started = time.perf_counter()
     try:
         # messages 배열에서 사용자 메시지 추출
         messages = chat_request.messages  # ← chat_request 사용!
@@ -127,7 +193,16 @@ async def chat(
         print(f"💬 [{user['name']}] /chat 요청 - 메시지: {user_message[:100]}, 인덱스: {chat_request.index_name or 'default'}")
 
         # 1. 관련 문서 검색 (선택된 인덱스에서)
-        search_results = search_documents(user_message, index_name=chat_request.index_name)
+        # 쿼리 임베딩은 검색과 답변 캐시 유사도 비교에 함께 사용
+        target_index = chat_request.index_name or AZURE_SEARCH_INDEX_NAME
+        parse_filters(chat_request.filters)  # 잘못된 필터는 임베딩 호출 전에 400
+        cache_generation = answer_cache.generation(target_index)
+        query_embedding = await run_blocking(get_embedding, user_message)
+        search_results = await run_blocking(
+            search_documents, user_message, filters=chat_request.filters, top_k=CHAT_SEARCH_TOP_K,
+            index_name=chat_request.index_name, query_embedding=query_embedding
+        )
+        metrics.record("chat.retrieval", time.perf_counter() - started)
 
         if not search_results:
             return {
@@ -135,22 +210,52 @@ async def chat(
                 "response": "관련 문서를 찾을 수 없습니다. 먼저 문서를 업로드해주세요."
             }
 
-        # 2. 컨텍스트 생성
-        context = "\n\n".join([
-            f"[{doc['file_name']}]\n{doc['content']}"
-            for doc in search_results
-        ])
+        # 2. 컨텍스트 생성 (점수 순으로 토큰 예산 안에 채우고, 중복/같은 파일 청크는 묶음)
+        built = build_context(search_results)
+        context = built["context"]
+        sources = built["sources"]
+        context_info = {key: built[key] for key in ("tokens", "budget", "full", "summarized", "dropped", "duplicates")}
+        print(f"🧩 컨텍스트: {built['tokens']}/{built['budget']} tokens, 본문 {built['full']}개, "
+              f"요약 {built['summarized']}개, 제외 {built['dropped']}개, 중복 {built['duplicates']}개")
+
+        # 3. 답변 캐시 조회 (같은 인덱스 + 같은 질문(또는 유사 질문) + 같은 컨텍스트 문서)
+        cache_key = answer_cache.make_key(target_index, user_message, built["doc_ids"])
+        cached_answer = answer_cache.get(cache_key, query_embedding)
+        if cached_answer is not None:
+            metrics.record("chat.cached.total", time.perf_counter() - started)
+            print(f"♻️ [{user['name']}] 캐시된 답변 사용")
+
+        def remember(answer: str):
+            answer_cache.put(cache_key, answer, query_embedding, generation=cache_generation)
 
-        # 3. GPT로 답변 생성
-        response = chat_with_context(user_message, context)
+        # 4-a. 스트리밍: 토큰이 생성되는 대로 전송
+        if chat_request.stream:
+            return StreamingResponse(
+                _stream_chat_answer(user, user_message, context, sources, started, cached_answer, remember, context_info),
+                media_type="text/event-stream",
+                headers=SSE_HEADERS
+            )
 
-        print(f"✅ [{user['name']}] 채팅 응답 완료 - {len(response)} 글자")
+        # 4-b. GPT로 답변 생성 (전체 완료 후 한 번에 응답)
+        if cached_answer is not None:
+            response = cached_answer
+        else:
+            response = await run_blocking(chat_with_context, user_message, context)
+            remember(response)
+
+            # 비스트리밍은 첫 바이트가 곧 전체 응답
+            elapsed = time.perf_counter() - started
+            metrics.record("chat.sync.ttfb", elapsed)
+            metrics.record("chat.sync.total", elapsed)
+            print(f"✅ [{user['name']}] 채팅 응답 완료 - {len(response)} 글자, {elapsed:.2f}s")
 
         # 응답에 사용자 정보 포함
         return {
             "content": response,
             "response": response,
-            "sources": [doc["file_name"] for doc in search_results],
+            "sources": sources,
+            "cached": cached_answer is not None,
+            "context": context_info,
             "user_info": {
                 "name": user['name'],
                 "email": user['email'],
@@ -158,7 +263,93 @@ async def chat(
             }
         }
 
+    except FilterError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 필터: {e}")
     except Exception as e:
         print(f"❌ Chat error: {e}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _stream_chat_answer(user: dict, user_message: str, context: str, sources: list, started: float,
+                              cached_answer: str = None, remember=None, context_info: dict = None):
+    """
+    SSE 이벤트 순서:
+      sources (검색 결과) → token (답변 조각, 여러 번) → done (전체 답변 + 지연 시간)
+    실패 시 error 이벤트로 종료합니다.
+    캐시된 답변이 있으면 token 한 번으로 전체 답변을 보냅니다.
+    """
+    yield format_sse("sources", {"sources": sources, "context": context_info})
+
+    if cached_answer is not None:
+        yield format_sse("token", {"content": cached_answer})
+        total = time.perf_counter() - started
+        yield format_sse("done", {
+            "content": cached_answer,
+            "response": cached_answer,
+            "sources": sources,
+            "cached": True,
+            "ttfb_ms": round(total * 1000, 1),
+            "total_ms": round(total * 1000, 1),
+            "user_info": {
+                "name": user['name'],
+                "email": user['email'],
+                "role": user['role']
+            }
+        })
+        return
+
+    parts = []
+    ttfb = None
+    try:
+        async for delta in iterate_blocking(chat_with_context_stream(user_message, context)):
+            if ttfb is None:
+                # 첫 답변 토큰까지의 시간 (검색 + 첫 토큰 생성)
+                ttfb = time.perf_counter() - started
+                metrics.record("chat.stream.ttfb", ttfb)
+            parts.append(delta)
+            yield format_sse("token", {"content": delta})
+    except Exception as e:
+        print(f"❌ Chat stream error: {e}")
+        yield format_sse("error", {"detail": str(e)})
+        return
+
+    total = time.perf_counter() - started
+    metrics.record("chat.stream.total", total)
+    response = "".join(parts)
+    if remember is not None:
+        remember(response)
+    print(f"✅ [{user['name']}] 채팅 스트리밍 완료 - {len(response)} 글자, 첫 토큰 {ttfb or 0:.2f}s / 전체 {total:.2f}s")
+
+    yield format_sse("done", {
+        "content": response,
+        "response": response,
+        "sources": sources,
+        "cached": False,
+        "context": context_info,
+        "ttfb_ms": round((ttfb or total) * 1000, 1),
+        "total_ms": round(total * 1000, 1),
+        "user_info": {
+            "name": user['name'],
+            "email": user['email'],
+            "role": user['role']
+        }
+    })
+
+
+@router.get("/chat/metrics")
+async def chat_metrics(user: dict = Depends(get_current_user)):
+    """
+    채팅 지연 시간 통계 (ms)
+    - chat.retrieval: 검색 소요 시간
+    - chat.sync.ttfb / chat.sync.total: 비스트리밍 (둘이 같음)
+    - chat.stream.ttfb / chat.stream.total: 스트리밍 (첫 답변 토큰 / 마지막 토큰)
+    - chat.cached.total: 캐시된 답변 응답 시간
+    """
+    return metrics.snapshot(prefix="chat.")
+
+
+@router.get("/chat/cache")
+async def chat_cache_stats(user: dict = Depends(get_current_user)):
+    """답변 캐시 통계 (항목 수, 적중률, 무효화 횟수)"""
+    return answer_cache.stats()
@@ -1,123 +1,111 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Form, Depends, Request
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends, Request, Query
+from fastapi.responses import StreamingResponse
 from app.auth import get_current_user
 from app.routers.auth import verify_csrf_token
-from app.services.blob_service import upload_to_blob, save_processed_json
-from app.services.document_service import extract_text_from_url, extract_text_from_docx
-from app.services.search_service import add_document_to_index, get_document_count, get_all_documents
+from app.services.blob_service import upload_to_blob, save_processed_json, load_processed_json
+from app.services.content_hash import assign_chunk_ids
+from app.services.document_service import extract_document, extract_text_from_docx
+from app.services.search_service import add_document_to_index, get_all_documents, list_indexes as list_search_indexes
+from app.services.index_stats import index_stats
+from app.services.executor import run_blocking
+from app.services.ingest_queue import ingest_queue, QueueFullError, QueueClosedError
+from app.services.sse import format_sse, SSE_HEADERS
+from app.services.document_listing import GROUP_FIELDS, decode_token, fetch_page, stream_document_listing
+from app.services.upload_spool import SpooledUpload, UploadTooLargeError, spool_upload
 import uuid
 import traceback
-from app.state import task_manager
+from app.state import task_manager, TERMINAL_STATUSES
 from app.services.openai_service import analyze_text_for_search
 from app.services.search_service import index_processed_chunks
 import json
+import asyncio
 
 router = APIRouter()
 
+SSE_KEEPALIVE_SECONDS = 15
+
 # --- Async File Processing Pipeline ---
 
 #창훈 코드 추가
 
-async def process_file_background(task_id: str, file_name: str, file_data: bytes, file_ext: str, index_name: str = None):
+def process_file_background(task_id: str, file_name: str, spool: SpooledUpload, file_ext: str, index_name: str = None):
     """
-    백그라운드에서 실행될 실제 파이프라인 로직
+    Ingest 워커 스레드에서 실행될 실제 파이프라인 로직
+    (단계마다 ingest_queue.stage()로 동시 실행 수를 제한)
+    파일 내용은 스풀 임시 파일에서 필요한 단계만 읽고, 작업이 끝나면 임시 파일 삭제
+    0. 콘텐츠 해시로 이전 처리 결과 확인 (같은 파일이면 1~4 생략)
     1. Blob 업로드 (Raw)
     2. 텍스트 추출
     3. LLM 전처리 (JSON 생성)
     4. Blob 업로드 (Processed JSON)
-    5. Azure Search 인덱싱
+    5. Azure Search 인덱싱 (바뀐 청크만 임베딩/업로드, 사라진 청크 삭제)
 
     Args:
         index_name: RAG 인덱스 이름 (지정하지 않으면 기본 인덱스 사용)
     """
     try:
         print(f"[Background] Processing task {task_id} for file {file_name}...")
-        task_manager.update_task(task_id, status="processing", progress=10, message=f"Uploading raw file: {file_name}")
-        
-        # 1. Blob 업로드 (Raw)
-        # 중요: 파일명에 한글/특수문자/공백이 있으면 Document Intelligence가 URL 다운로드에 실패함.
-        # 따라서 Blob 저장 시에는 안전한 영문 이름(Task ID)을 사용하고, 원본 파일명은 메타데이터로만 관리함.
-        safe_file_name = f"{task_id}.{file_ext}" if file_ext else task_id
+        task_manager.update_task(task_id, status="processing", stage="blob", progress=5, message="Checking previously processed content...")
 
+        # 0. 같은 내용의 파일을 이미 처리했으면 저장된 Processed JSON 재사용
+        # (해시는 스풀 시 스트리밍으로 계산됨)
+        content_hash = spool.sha256
+        processed_file_name = f"{content_hash}_processed.json"
+        chunks = None
         try:
-            # upload_to_blob은 이미 SAS Token이 포함된 URL을 반환함
-            blob_url_with_sas = upload_to_blob(safe_file_name, file_data, index_name=index_name)
-            print(f"[Background] Blob upload success: {blob_url_with_sas}")
-            
+            with ingest_queue.stage("blob"):
+                cached_json = load_processed_json(processed_file_name, index_name=index_name)
+            if cached_json:
+                chunks = json.loads(cached_json)
+                print(f"[Background] Identical content already processed ({content_hash[:12]}). Reusing chunks.")
+                task_manager.add_detail(task_id, f"Identical file already processed ({content_hash[:12]}), reusing {len(chunks)} chunks")
         except Exception as e:
-            print(f"[Background] Blob upload failed: {e}")
-            raise e
+            print(f"⚠️ Failed to load processed json, processing from scratch: {e}")
 
-        task_manager.update_task(task_id, progress=30, message="Extracting text...")
-        
-        # 2. 텍스트 추출
-        extracted_text = ""
-        if file_ext in ['txt', 'py', 'js', 'java', 'c', 'cpp', 'h', 'cs', 'ts', 'tsx', 'html', 'css', 'json', 'md']:
-            # 텍스트/코드 파일은 직접 디코딩
-            try:
-                extracted_text = file_data.decode('utf-8')
-            except UnicodeDecodeError:
-                extracted_text = file_data.decode('cp949', errors='ignore')
-        elif file_ext == 'docx':
-            # DOCX 로컬 추출 (빠르고 무료, URL 에러 없음)
-            print("[Background] File is DOCX. Attempting local extraction...")
-            try:
-                extracted_text = extract_text_from_docx(file_data)
-                print(f"[Background] DOCX extraction success. Length: {len(extracted_text)}")
-            except Exception as e:
-                print(f"[Background] DOCX extraction failed: {e}")
-                task_manager.update_task(task_id, status="failed", message=f"DOCX extraction failed: {str(e)}")
-                return
-        else:
-            # PDF, 이미지 등은 Document Intelligence 사용 (SAS Token 포함 URL 사용)
-            try:
-                extracted_text = extract_text_from_url(blob_url_with_sas)
-            except Exception as e:
-                task_manager.update_task(task_id, status="failed", message=f"Text extraction failed: {str(e)}")
+        if not chunks:
+            chunks = _extract_and_analyze(task_id, file_name, spool, file_ext, content_hash, index_name)
+            if not chunks:
                 return
 
-        if not extracted_text:
-            task_manager.update_task(task_id, status="failed", message="No text extracted from file.")
-            return
-            
-        task_manager.update_task(task_id, progress=50, message="Analyzing with AI (Preprocessing)...")
-        print("[Background] Starting LLM analysis...")
+            task_manager.update_task(task_id, stage="save", progress=70, message="Saving processed data...")
 
-        # 3. LLM 전처리
-        # 파일 유형 구분 (code vs doc)
-        file_type = "code" if file_ext in ['py', 'js', 'java', 'cpp', 'ts', 'tsx', 'cs'] else "doc"
-        
-        # print(f"extracted_text : {extracted_text}")
-        chunks = analyze_text_for_search(extracted_text, file_name, file_type=file_type)
-        print(f"[Background] LLM analysis returned {len(chunks) if chunks else 0} chunks.")
-        
-        if not chunks:
-            task_manager.update_task(task_id, status="failed", message="AI preprocessing failed (No chunks generated).")
-            return
-
-        task_manager.update_task(task_id, progress=70, message="Saving processed data...")
+            # 4. Processed JSON 저장 (Blob)
+            # 콘텐츠 해시 기반 이름 → 같은 파일 재업로드 시 0단계에서 재사용
+            try:
+                json_str = json.dumps(chunks, ensure_ascii=False, indent=2)
+                with ingest_queue.stage("blob"):
+                    save_processed_json(processed_file_name, json_str, index_name=index_name)
+            except Exception as e:
+                print(f"⚠️ Failed to save processed json: {e}")
+                # 저장은 실패해도 진행
 
-        # 4. Processed JSON 저장 (Blob)
-        # JSON 파일명도 안전하게 Task ID 기반으로 저장
-        processed_file_name = f"{task_id}_processed.json"
-        try:
-            json_str = json.dumps(chunks, ensure_ascii=False, indent=2)
-            save_processed_json(processed_file_name, json_str, index_name=index_name)
-        except Exception as e:
-            print(f"⚠️ Failed to save processed json: {e}")
-            # 저장은 실패해도 진행
+        # 파일명이 달라도 내용이 같으면 같은 JSON을 쓰므로, 현재 파일명 기준으로 id 재계산
+        assign_chunk_ids(chunks, file_name)
 
-        task_manager.update_task(task_id, progress=80, message="Indexing to Search...")
+        task_manager.update_task(task_id, stage="index", progress=80, message="Indexing to Search...")
 
         # 5. Azure Search 인덱싱
         print(f"[Background] Starting indexing for {len(chunks)} chunks to index '{index_name or 'default'}'...")
+        def report_embedding_progress(done: int, total: int):
+            # 임베딩 진행률을 80~95% 구간에 반영
+            task_manager.update_task(task_id, progress=80 + int(15 * done / total), message=f"Embedding chunks ({done}/{total})...")
+
         try:
-            indexed_count = index_processed_chunks(chunks, index_name=index_name)
+            with ingest_queue.stage("index"):
+                indexed_count = index_processed_chunks(
+                    chunks, index_name=index_name, on_progress=report_embedding_progress, replace_file=file_name
+                )
             print(f"[Background] Indexing complete. Count: {indexed_count}")
+            task_manager.add_detail(task_id, f"Indexed {indexed_count} chunks to '{index_name or 'default'}'")
         except Exception as e:
             print(f"[Background] Indexing failed: {e}")
             raise e
         
-        if indexed_count > 0:
+        if 0 < indexed_count < len(chunks):
+            # 일부 청크 임베딩/업로드 실패: 이전 버전 청크는 삭제되지 않고 남아 있음
+            task_manager.add_detail(task_id, f"{len(chunks) - indexed_count} chunks failed to index; previous version kept")
+            task_manager.update_task(task_id, status="completed_with_warning", progress=100, message="Partially indexed. Please upload again.")
+        elif indexed_count > 0:
             task_manager.update_task(task_id, status="completed", progress=100, message="Upload & Indexing Complete!")
         else:
             task_manager.update_task(task_id, status="completed_with_warning", progress=100, message="Finished, but no documents indexed.")
@@ -126,12 +114,99 @@ async def process_file_background(task_id: str, file_name: str, file_data: bytes
         print(f"❌ Background task failed: {e}")
         traceback.print_exc()
         task_manager.update_task(task_id, status="failed", message=f"Internal Server Error: {str(e)}")
+    finally:
+        spool.remove()
+
+
+def _extract_and_analyze(task_id: str, file_name: str, spool: SpooledUpload, file_ext: str, content_hash: str, index_name: str = None):
+    """
+    1~3단계: Raw 업로드 → 텍스트 추출 → LLM 전처리
+    실패하면 작업 상태를 failed로 바꾸고 None 반환
+    """
+    task_manager.update_task(task_id, stage="blob", progress=10, message=f"Uploading raw file: {file_name}")
+    
+    # 1. Blob 업로드 (Raw)
+    # 중요: 파일명에 한글/특수문자/공백이 있으면 Document Intelligence가 URL 다운로드에 실패함.
+    # 따라서 Blob 저장 시에는 안전한 영문 이름(콘텐츠 해시)을 사용하고, 원본 파일명은 메타데이터로만 관리함.
+    safe_file_name = f"{content_hash}.{file_ext}" if file_ext else content_hash
+
+    try:
+        # upload_to_blob은 이미 SAS Token이 포함된 URL을 반환함
+        # 스풀 파일을 스트림으로 업로드 (큰 파일은 블록 단위 병렬 업로드)
+        with ingest_queue.stage("blob"), spool.open() as stream:
+            blob_url_with_sas = upload_to_blob(safe_file_name, stream, index_name=index_name, length=spool.size)
+        print(f"[Background] Blob upload success: {blob_url_with_sas}")
+        task_manager.add_detail(task_id, f"Raw file uploaded ({spool.size} bytes)")
+        
+    except Exception as e:
+        print(f"[Background] Blob upload failed: {e}")
+        raise e
+
+    task_manager.update_task(task_id, stage="extract", progress=30, message="Extracting text...")
+    
+    # 2. 텍스트 추출
+    extracted_text = ""
+    extracted_pages = None
+    if file_ext in ['txt', 'py', 'js', 'java', 'c', 'cpp', 'h', 'cs', 'ts', 'tsx', 'html', 'css', 'json', 'md']:
+        # 텍스트/코드 파일은 직접 디코딩
+        file_data = spool.read_bytes()
+        try:
+            extracted_text = file_data.decode('utf-8')
+        except UnicodeDecodeError:
+            extracted_text = file_data.decode('cp949', errors='ignore')
+    elif file_ext == 'docx':
+        # DOCX 로컬 추출 (빠르고 무료, URL 에러 없음)
+        print("[Background] File is DOCX. Attempting local extraction...")
+        try:
+            with ingest_queue.stage("extract"), spool.open() as stream:
+                extracted_text = extract_text_from_docx(stream)
+            print(f"[Background] DOCX extraction success. Length: {len(extracted_text)}")
+        except Exception as e:
+            print(f"[Background] DOCX extraction failed: {e}")
+            task_manager.update_task(task_id, status="failed", message=f"DOCX extraction failed: {str(e)}")
+            return None
+    else:
+        # PDF, 이미지 등은 Document Intelligence 사용 (SAS Token 포함 URL 사용)
+        try:
+            # 텍스트 레이어 / 페이지 수 확인은 mmap으로 (파일 전체를 bytes로 읽지 않음)
+            with ingest_queue.stage("extract"), spool.mapped() as file_view:
+                extracted = extract_document(blob_url_with_sas, file_view)
+            extracted_text = extracted["text"]
+            extracted_pages = extracted["pages"]
+            ocr_pages = sum(1 for page in extracted["pages"] if page.get("source") == "ocr")
+            task_manager.add_detail(task_id, f"Extracted {len(extracted['pages'])} pages ({ocr_pages} via OCR)")
+        except Exception as e:
+            task_manager.update_task(task_id, status="failed", message=f"Text extraction failed: {str(e)}")
+            return None
+
+    if not extracted_text:
+        task_manager.update_task(task_id, status="failed", message="No text extracted from file.")
+        return None
+        
+    task_manager.add_detail(task_id, f"Extracted {len(extracted_text)} characters")
+    task_manager.update_task(task_id, stage="llm", progress=50, message="Analyzing with AI (Preprocessing)...")
+    print("[Background] Starting LLM analysis...")
+
+    # 3. LLM 전처리
+    # 파일 유형 구분 (code vs doc)
+    file_type = "code" if file_ext in ['py', 'js', 'java', 'cpp', 'ts', 'tsx', 'cs'] else "doc"
+    
+    # print(f"extracted_text : {extracted_text}")
+    with ingest_queue.stage("llm"):
+        chunks = analyze_text_for_search(extracted_text, file_name, file_type=file_type, pages=extracted_pages)
+    print(f"[Background] LLM analysis returned {len(chunks) if chunks else 0} chunks.")
+    
+    if not chunks:
+        task_manager.update_task(task_id, status="failed", message="AI preprocessing failed (No chunks generated).")
+        return None
+
+    task_manager.add_detail(task_id, f"AI preprocessing generated {len(chunks)} chunks")
+    return chunks
 
 
 @router.post("")
 async def upload_document(
     request: Request,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     index_name: str = Form(None),
     user: dict = Depends(get_current_user)
@@ -146,15 +221,20 @@ async def upload_document(
     verify_csrf_token(csrf_token, user['email'])
     """
     파일 업로드 엔드포인트 (비동기 처리)
-    파일을 받자마자 task_id를 리턴하고, 백그라운드에서 처리 시작.
+    파일을 임시 파일로 스풀(해시 동시 계산)한 뒤 Ingest 대기열에 등록하고 바로 task_id를 리턴.
+    대기열이 가득 차면 429와 현재 대기열 길이, UPLOAD_MAX_BYTES를 넘으면 413을 반환.
 
     Args:
         file: 업로드할 파일
         index_name: RAG 인덱스 이름 (선택 사항, 지정하지 않으면 기본 인덱스)
     """
+    spool = None
     try:
-        # 1. 파일 데이터 읽기 (메모리)
-        file_data = await file.read()
+        # 1. 파일을 청크 단위로 임시 파일에 기록 (메모리에 전체를 올리지 않음)
+        try:
+            spool = await spool_upload(file)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=f"파일이 너무 큽니다. (최대 {e.limit} bytes)")
         file_name = file.filename
         file_ext = file_name.lower().split('.')[-1] if '.' in file_name else ''
 
@@ -162,46 +242,132 @@ async def upload_document(
         task_id = str(uuid.uuid4())
         task_manager.create_task(task_id)
 
-        # 3. 백그라운드 작업 등록
+        # 3. Ingest 대기열에 등록 (처리는 워커 스레드에서)
         print(f"📋 Upload request: file={file_name}, index={index_name or 'default'}")
-        background_tasks.add_task(process_file_background, task_id, file_name, file_data, file_ext, index_name)
+        try:
+            position = ingest_queue.submit(task_id, process_file_background, task_id, file_name, spool, file_ext, index_name)
+        except QueueFullError as e:
+            task_manager.delete_task(task_id)
+            spool.remove()
+            raise HTTPException(
+                status_code=429,
+                detail={
+                    "message": "업로드 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.",
+                    "queue_depth": e.depth,
+                    "queue_capacity": e.capacity
+                },
+                headers={"Retry-After": "30"}
+            )
+        except QueueClosedError:
+            task_manager.delete_task(task_id)
+            spool.remove()
+            raise HTTPException(status_code=503, detail="서버가 종료 중입니다. 잠시 후 다시 시도해주세요.")
+
+        task_manager.update_task(task_id, message=f"Queued (position {position})")
 
         return {
             "message": "Upload started",
             "task_id": task_id,
             "file_name": file_name,
-            "index_name": index_name or "default"
+            "index_name": index_name or "default",
+            "queue_position": position
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
+        if spool is not None:
+            spool.remove()
         print(f"❌ Upload request failed: {e}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/queue")
+async def get_queue_stats():
+    """Ingest 대기열 / 워커 / 단계별 동시 실행 현황"""
+    return ingest_queue.stats()
+
+
 @router.get("/status/{task_id}")
 async def get_task_status(task_id: str):
     """백그라운드 작업 상태 조회"""
-    task = task_manager.get_task(task_id)
+    task = await run_blocking(task_manager.get_task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
 
+@router.get("/status/{task_id}/stream")
+async def stream_task_status(task_id: str, request: Request):
+    """
+    작업 상태 변경을 Server-Sent Events로 push
+    - 연결 즉시 최신 상태를 보내고, 이후 변경될 때마다 전송 (stage, progress, message, details)
+    - 완료/실패 시 'done' 이벤트를 보내고 스트림 종료
+    - 같은 작업을 여러 클라이언트가 동시에 구독 가능
+    """
+    # 구독을 먼저 등록해야 조회와 구독 사이의 변경을 놓치지 않음
+    subscription = task_manager.subscribe(task_id)
+    task = await run_blocking(task_manager.get_task, task_id)
+    if not task:
+        task_manager.unsubscribe(task_id, subscription)
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def event_stream():
+        try:
+            snapshot = task
+            while True:
+                if snapshot["status"] in TERMINAL_STATUSES:
+                    yield format_sse("done", snapshot)
+                    return
+                yield format_sse("progress", snapshot)
+
+                # 변경이 없으면 주기적으로 주석 줄을 보내 프록시 연결 유지
+                while True:
+                    try:
+                        snapshot = await asyncio.wait_for(subscription.next(), timeout=SSE_KEEPALIVE_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            return
+                        yield ": keep-alive\n\n"
+        finally:
+            task_manager.unsubscribe(task_id, subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 
 @router.get("/stats")
-async def get_stats(index_name: str = "documents-index"):
-    """시스템 통계 조회 - 최근 업로드 갯수, 인덱스 문서 갯수"""
+async def get_stats(index_name: str = "documents-index", include_files: bool = False):
+    """
+    시스템 통계 조회 - 인덱스 문서 갯수, 파일 수, facet 분포 (fileType / language / serviceDomain)
+    메모리에 유지되는 통계로 응답 (인덱스당 첫 조회만 서비스에서 계산, 이후 업로드 시 반영 + 주기적 갱신)
+    include_files=true면 파일별 청크 수 포함
+    """
     try:
-        doc_count = get_document_count(index_name)
-        print(f"📊 시스템 통계: {doc_count}개 문서 인덱싱됨")
-        
-        return {
-            "total_documents": doc_count,
-            "recent_uploads": doc_count,  # AI Search에 인덱싱된 모든 문서
+        stats = index_stats.peek(index_name, include_files)
+        if stats is None:
+            stats = await run_blocking(index_stats.get, index_name, include_files)
+            print(f"📊 시스템 통계: {stats['documents']}개 문서 인덱싱됨")
+
+        result = {
+            "total_documents": stats["documents"],
+            "recent_uploads": stats["documents"],  # AI Search에 인덱싱된 모든 문서
             "status": "✅ Active",
-            "index_name": index_name
+            "index_name": index_name,
+            "total_files": stats["files"],
+            "facets": stats["facets"],
+            "refreshed_at": stats["refreshed_at"],
+            "updated_at": stats["updated_at"]
         }
+        if include_files:
+            result["file_chunks"] = stats["file_chunks"]
+        return result
     except Exception as e:
         print(f"❌ Stats error: {e}")
         return {
@@ -212,52 +378,47 @@ async def get_stats(index_name: str = "documents-index"):
         }
 
 @router.get("/documents")
-async def list_documents():
-    """AI Search 인덱스에 저장된 모든 문서 목록 조회 - 실제 content 포함"""
+async def list_documents(
+    index_name: str = None,
+    limit: int = 100,
+    continuation_token: str = None,
+    include_content: bool = False,
+    group_by: str = None,
+    fetch_all: bool = Query(False, alias="all")
+):
+    """
+    AI Search 인덱스에 저장된 문서(청크) 목록 조회 (id 순 페이지네이션)
+    - 기본은 메타데이터 필드만 반환 (include_content=true면 content 포함, 벡터는 항상 제외)
+    - 응답의 continuation_token을 다음 요청에 넘기면 이어서 조회
+    - group_by=fileName|parentId 로 묶어서 반환
+    - all=true면 모든 페이지를 JSON 스트림으로 전송
+    - 문서마다 이전 형식의 file_name(/content_length)도 함께 반환
+    """
+    if group_by and group_by not in GROUP_FIELDS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {', '.join(GROUP_FIELDS)}")
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
     try:
-        from app.services.search_service import get_search_client
-        
-        search_client = get_search_client()
-        results = search_client.search(search_text="*", include_total_count=True, top=100)
-        
-        docs = []
-        for result in results:
-            docs.append({
-                "id": result.get("id", ""),
-                "file_name": result.get("file_name", "Unknown"),
-                "content": result.get("content", ""),  # 실제 content 포함!
-                "content_length": len(result.get("content", ""))
-            })
-        
-        print(f"📋 API 응답: {len(docs)}개 문서 (실제 content 포함)")
-        
-        return {
-            "count": len(docs),
-            "documents": docs
-        }
+        cursor = decode_token(continuation_token)
+        first_page = await fetch_page(index_name, limit, cursor, include_content)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"❌ Documents list error: {e}")
         traceback.print_exc()
-        return {
-            "count": 0,
-            "documents": []
-        }
+        raise HTTPException(status_code=500, detail=str(e))
+
+    print(f"📋 문서 목록 조회: index={index_name or 'default'}, limit={limit}, group_by={group_by}, all={fetch_all}")
+    return StreamingResponse(
+        stream_document_listing(first_page, index_name, limit, include_content, group_by, fetch_all),
+        media_type="application/json"
+    )
 
 @router.get("/indexes")
 async def list_indexes():
     """사용 가능한 모든 RAG 인덱스 목록 조회"""
     try:
-        from app.services.search_service import get_search_index_client
-        
-        index_client = get_search_index_client()
-        indexes = index_client.list_indexes()
-        
-        index_list = []
-        for index in indexes:
-            index_list.append({
-                "name": index.name,
-                "fields_count": len(index.fields) if index.fields else 0
-            })
+        index_list = await run_blocking(list_search_indexes)
         
         print(f"📋 사용 가능한 인덱스: {len(index_list)}개")
         for idx in index_list:
@@ -0,0 +1,151 @@
+"""
+채팅 답변 캐시
+- 키: (인덱스 이름, 정규화된 질문, 검색된 문서 id 목록)
+- 같은 문서가 검색된 비슷한 질문은 질문 임베딩의 코사인 유사도로 재사용 (ANSWER_CACHE_SIMILARITY)
+- LRU + TTL 만료
+- index_processed_chunks가 인덱스에 쓰면 해당 인덱스 캐시 무효화
+  (프로세스별 캐시이므로 다른 워커 프로세스는 TTL로 만료됨)
+"""
+
+from array import array
+from collections import OrderedDict, defaultdict
+import math
+import re
+import threading
+import time
+import unicodedata
+
+from app.config import ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_SIMILARITY
+
+
+def normalize_query(query: str) -> str:
+    """대소문자/공백/끝 문장부호 차이를 무시하도록 질문 정규화"""
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip("?!.。？！ ")
+
+
+def _unit_vector(vector) -> array:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return array("f", (v / norm for v in vector))
+
+
+class AnswerCache:
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES, ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+                 similarity_threshold: float = ANSWER_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+        self._exact_hits = 0
+        self._similar_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    @staticmethod
+    def make_key(index_name: str, query: str, doc_ids: list) -> tuple:
+        return (index_name or "", normalize_query(query), tuple(sorted(str(d) for d in doc_ids if d)))
+
+    def generation(self, index_name: str) -> int:
+        """인덱스 캐시 세대 (조회 시점에 받아두었다가 put에 전달)"""
+        with self._lock:
+            return self._generations[index_name or ""]
+
+    def get(self, key: tuple, query_embedding=None):
+        """
+        캐시된 답변 조회. 정확히 같은 키가 없으면, 같은 인덱스·같은 문서 집합의 항목 중
+        질문 임베딩 유사도가 임계값 이상인 것을 찾습니다. 없으면 None.
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry["created_at"] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._exact_hits += 1
+                return entry["answer"]
+            if entry is not None:
+                del self._entries[key]
+
+            if query_embedding is not None and self.similarity_threshold > 0:
+                target = _unit_vector(query_embedding)
+                index_name, _, doc_ids = key
+                best_key, best_score = None, self.similarity_threshold
+                for candidate_key, candidate in self._entries.items():
+                    # 검색된 문서가 다르면 답변 근거가 다르므로 비교하지 않음
+                    if candidate_key[0] != index_name or candidate_key[2] != doc_ids:
+                        continue
+                    if candidate["embedding"] is None or now - candidate["created_at"] > self.ttl_seconds:
+                        continue
+                    score = sum(a * b for a, b in zip(target, candidate["embedding"]))
+                    if score >= best_score:
+                        best_key, best_score = candidate_key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self._similar_hits += 1
+                    return self._entries[best_key]["answer"]
+
+            self._misses += 1
+            return None
+
+    def put(self, key: tuple, answer: str, query_embedding=None, generation: int = None):
+        """
+        답변 저장. generation이 조회 시점과 다르면(그 사이 인덱스가 갱신됨) 저장하지 않습니다.
+        """
+        if not self.enabled or not answer:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generations[key[0]]:
+                return
+            self._entries[key] = {
+                "answer": answer,
+                "embedding": _unit_vector(query_embedding) if query_embedding is not None else None,
+                "created_at": time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_index(self, index_name: str) -> int:
+        """해당 인덱스의 캐시 항목 삭제 (문서가 추가/변경되었을 때)"""
+        index_name = index_name or ""
+        with self._lock:
+            self._generations[index_name] += 1
+            stale = [key for key in self._entries if key[0] == index_name]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += 1
+        if stale:
+            print(f"🧹 Answer cache invalidated for index '{index_name}': {len(stale)} entries")
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._exact_hits + self._similar_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "similarity_threshold": self.similarity_threshold,
+                "exact_hits": self._exact_hits,
+                "similar_hits": self._similar_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self._invalidations
+            }
+
+
+# 전역 인스턴스
+answer_cache = AnswerCache()
@@ -1,7 +1,17 @@
 from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
+from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError
 from datetime import datetime, timedelta
-from app.config import AZURE_STORAGE_ACCOUNT_NAME, AZURE_STORAGE_ACCOUNT_KEY, ENVIRONMENT
+from app.config import (
+    AZURE_STORAGE_ACCOUNT_NAME,
+    AZURE_STORAGE_ACCOUNT_KEY,
+    ENVIRONMENT,
+    BLOB_UPLOAD_CONCURRENCY,
+    BLOB_SAS_HOURS,
+    BLOB_DELEGATION_KEY_HOURS,
+    BLOB_DELEGATION_KEY_REFRESH_MARGIN
+)
 from azure.identity import DefaultAzureCredential
+import threading
 import os
 
 # ===== Blob 클라이언트 초기화 =====
@@ -25,59 +35,155 @@ def get_blob_client():
             )
     return _blob_client
 
+# ===== 컨테이너 캐시 =====
+# 쓰기 전에 exists()를 확인하지 않고 바로 쓰고, ContainerNotFound일 때만 생성 후 한 번 재시도.
+# 한 번 확인된 컨테이너는 기억해 두므로 업로드 1건 = 쓰기 요청 1건.
+
+_known_containers = set()
+_containers_lock = threading.Lock()
+
+
+def _container_name(index_name: str, suffix: str, default: str) -> str:
+    """인덱스 이름 → 컨테이너명 (Azure Blob 컨테이너 명명 규칙: 소문자, 하이픈)"""
+    if not index_name:
+        return default
+    safe_index = index_name.lower().replace('_', '-').replace(' ', '-')
+    return f"{safe_index}-{suffix}"
+
+
+def _is_container_missing(error: ResourceNotFoundError) -> bool:
+    return getattr(error, "error_code", None) == "ContainerNotFound"
+
+
+def _create_container(container_client, container_name: str):
+    print(f"📁 Creating container: {container_name}")
+    try:
+        container_client.create_container()
+    except ResourceExistsError:
+        pass  # 다른 워커가 먼저 생성함
+
+
+def _write_blob(container_name: str, blob_name: str, data, length: int = None):
+    """
+    Blob 쓰기 (컨테이너가 없을 때만 생성 후 재시도)
+    data가 스트림이면 재시도 전에 처음 위치로 되돌림
+    """
+    container_client = get_blob_client().get_container_client(container_name)
+    blob_client = container_client.get_blob_client(blob_name)
+    start = data.tell() if hasattr(data, "seek") else None
+    try:
+        blob_client.upload_blob(data, length=length, overwrite=True, max_concurrency=BLOB_UPLOAD_CONCURRENCY)
+    except ResourceNotFoundError as e:
+        if not _is_container_missing(e):
+            raise
+        with _containers_lock:
+            _known_containers.discard(container_name)
+        _create_container(container_client, container_name)
+        if start is not None:
+            data.seek(start)
+        blob_client.upload_blob(data, length=length, overwrite=True, max_concurrency=BLOB_UPLOAD_CONCURRENCY)
+    with _containers_lock:
+        _known_containers.add(container_name)
+
+
+def known_containers() -> list:
+    with _containers_lock:
+        return sorted(_known_containers)
+
+# ===== SAS 서명 =====
+
+class SasSigner:
+    """
+    Blob 읽기용 SAS 생성
+    - 계정 키가 있는 개발 환경: 계정 키로 로컬 서명 (네트워크 요청 없음)
+    - 그 외 (Managed Identity): user delegation key를 받아 만료 직전까지 재사용
+      새 SAS가 항상 BLOB_SAS_HOURS 전체 기간 동안 유효하도록, 남은 시간이
+      SAS 유효 시간 + BLOB_DELEGATION_KEY_REFRESH_MARGIN보다 짧아지면 미리 새 키를 받음
+    """
+
+    def __init__(self, sas_hours: float = BLOB_SAS_HOURS, key_hours: float = BLOB_DELEGATION_KEY_HOURS,
+                 refresh_margin: int = BLOB_DELEGATION_KEY_REFRESH_MARGIN):
+        self.sas_lifetime = timedelta(hours=sas_hours)
+        self.key_lifetime = timedelta(hours=key_hours)
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self._delegation_key = None
+        self._key_expiry = None
+        self._key_fetches = 0
+        self._lock = threading.Lock()
+
+    def use_account_key(self) -> bool:
+        return ENVIRONMENT == "development" and bool(AZURE_STORAGE_ACCOUNT_KEY)
+
+    def _get_delegation_key(self, now: datetime):
+        with self._lock:
+            if self._delegation_key is None or self._key_expiry - now < self.sas_lifetime + self.refresh_margin:
+                # 시계 오차를 고려해 시작 시각을 약간 앞당김
+                start = now - timedelta(minutes=5)
+                expiry = now + self.key_lifetime
+                self._delegation_key = get_blob_client().get_user_delegation_key(start, expiry)
+                self._key_expiry = expiry
+                self._key_fetches += 1
+                print(f"🔑 User delegation key acquired (expires {expiry.isoformat()}Z)")
+            return self._delegation_key, self._key_expiry
+
+    def blob_sas(self, container_name: str, blob_name: str) -> str:
+        now = datetime.utcnow()
+        expiry = now + self.sas_lifetime
+        if self.use_account_key():
+            credential = {"account_key": AZURE_STORAGE_ACCOUNT_KEY}
+        else:
+            delegation_key, key_expiry = self._get_delegation_key(now)
+            credential = {"user_delegation_key": delegation_key}
+            expiry = min(expiry, key_expiry)
+        return generate_blob_sas(
+            account_name=AZURE_STORAGE_ACCOUNT_NAME,
+            container_name=container_name,
+            blob_name=blob_name,
+            permission=BlobSasPermissions(read=True),
+            expiry=expiry,
+            **credential
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": "account_key" if self.use_account_key() else "user_delegation",
+                "delegation_key_expiry": self._key_expiry.isoformat() + "Z" if self._key_expiry else None,
+                "delegation_key_fetches": self._key_fetches
+            }
+
+
+# 전역 인스턴스
+sas_signer = SasSigner()
+
 # ===== 기존 함수들 (유지) =====
 
-def upload_to_blob(file_name: str, file_data: bytes, index_name: str = None):
+def upload_to_blob(file_name: str, file_data, index_name: str = None, length: int = None):
     """
     Blob Storage에 파일 업로드
     SAS Token이 포함된 URL 반환
 
     Args:
         file_name: 업로드할 파일명
-        file_data: 파일 데이터
+        file_data: 파일 데이터 (bytes 또는 읽기용 파일 스트림)
         index_name: RAG 인덱스 이름 (None이면 기본 컨테이너 사용)
+        length: 스트림 길이 (스트림이면 지정, 큰 파일은 블록 단위로 나누어 병렬 업로드)
     """
     # 인덱스 이름에 따른 동적 컨테이너명 생성
-    if index_name:
-        # 인덱스명에서 특수문자 제거 및 소문자 변환 (Azure Blob 컨테이너 명명 규칙)
-        safe_index = index_name.lower().replace('_', '-').replace(' ', '-')
-        container_name = f"{safe_index}-raw"
-    else:
-        container_name = "kkuldanji-mvp-raw"  # 기본값
+    container_name = _container_name(index_name, "raw", "kkuldanji-mvp-raw")
 
     print(f"📦 Using blob container: {container_name}")
-    
+
     try:
-        client = get_blob_client()
-        container_client = client.get_container_client(container_name)
-        
-        # 파일 업로드
-        blob_client = container_client.get_blob_client(file_name)
-        
-        # 컨테이너가 없으면 생성
-        try:
-            if not container_client.exists():
-                print(f"📁 Creating container: {container_name}")
-                container_client.create_container()
-        except Exception as e:
-            print(f"⚠️ Container creation check failed: {e}")
-
-        blob_client.upload_blob(file_data, overwrite=True)
-        
-        # SAS Token 생성 (1시간 유효)
-        sas_token = generate_blob_sas(
-            account_name=AZURE_STORAGE_ACCOUNT_NAME,
-            container_name=container_name,
-            blob_name=file_name,
-            account_key=AZURE_STORAGE_ACCOUNT_KEY,
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.utcnow() + timedelta(hours=1)
-        )
-        
+        _write_blob(container_name, file_name, file_data, length=length)
+
+        # SAS Token 생성 (BLOB_SAS_HOURS 동안 유효, 서명 키는 sas_signer가 캐시)
+        sas_token = sas_signer.blob_sas(container_name, file_name)
+
         blob_url_with_sas = f"https://{AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/{container_name}/{file_name}?{sas_token}"
-        
+
         return blob_url_with_sas
-    
+
     except Exception as e:
         print(f"❌ Blob upload failed: {e}")
         raise
@@ -92,32 +198,33 @@ def save_processed_json(file_name: str, json_str: str, index_name: str = None):
         index_name: RAG 인덱스 이름 (None이면 기본 컨테이너 사용)
     """
     # 인덱스 이름에 따른 동적 컨테이너명 생성
-    if index_name:
-        safe_index = index_name.lower().replace('_', '-').replace(' ', '-')
-        container_name = f"{safe_index}-processed"
-    else:
-        container_name = "kkuldanji-mvp-processed"  # 기본값
+    container_name = _container_name(index_name, "processed", "kkuldanji-mvp-processed")
 
     print(f"📦 Using processed container: {container_name}")
-    
+
     try:
-        client = get_blob_client()
-        container_client = client.get_container_client(container_name)
-        
-        blob_client = container_client.get_blob_client(file_name)
-        
-        # 컨테이너가 없으면 생성
-        try:
-            if not container_client.exists():
-                print(f"📁 Creating container: {container_name}")
-                container_client.create_container()
-        except Exception as e:
-            print(f"⚠️ Container creation check failed: {e}")
-
-        blob_client.upload_blob(json_str.encode('utf-8'), overwrite=True)
-        
+        _write_blob(container_name, file_name, json_str.encode('utf-8'))
+
         print(f"✅ Processed JSON saved: {file_name}")
-    
+
     except Exception as e:
         print(f"⚠️ Failed to save processed JSON: {e}")
         raise
+
+def load_processed_json(file_name: str, index_name: str = None):
+    """
+    저장된 처리 결과 JSON 읽기 (같은 내용의 파일을 다시 업로드했을 때 재사용)
+    없으면 None 반환 (컨테이너가 없어도 None)
+
+    Args:
+        file_name: 읽을 파일명
+        index_name: RAG 인덱스 이름 (None이면 기본 컨테이너 사용)
+    """
+    container_name = _container_name(index_name, "processed", "kkuldanji-mvp-processed")
+
+    try:
+        client = get_blob_client()
+        blob_client = client.get_container_client(container_name).get_blob_client(file_name)
+        return blob_client.download_blob().readall().decode('utf-8')
+    except ResourceNotFoundError:
+        return None
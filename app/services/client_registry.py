@@ -0,0 +1,209 @@
+"""
+SDK 클라이언트 레지스트리
+- 각 클라이언트를 프로세스당 한 번만 생성 (Search는 인덱스 이름별로 한 번)
+- OpenAI/Gemini는 공유 httpx 풀, Azure SDK는 공유 requests 세션으로 keep-alive 연결 재사용
+- 앱 종료 시 close()로 모든 연결 정리
+- 연결 재사용 통계 제공 (stats)
+"""
+
+from collections import defaultdict
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from openai import AzureOpenAI, OpenAI
+from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
+from azure.search.documents import SearchClient
+from azure.search.documents.indexes import SearchIndexClient
+from azure.ai.formrecognizer import DocumentAnalysisClient
+
+from app.config import (
+    AZURE_OPENAI_ENDPOINT,
+    AZURE_OPENAI_API_KEY,
+    AZURE_OPENAI_API_VERSION,
+    GOOGLE_API_KEY,
+    AZURE_SEARCH_ENDPOINT,
+    AZURE_SEARCH_KEY,
+    AZURE_SEARCH_INDEX_NAME,
+    AZURE_SEARCH_ADMIN_KEY,
+    AZURE_SEARCH_SERVICE_ENDPOINT,
+    AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT,
+    AZURE_DOCUMENT_INTELLIGENCE_KEY,
+    HTTP_POOL_MAXSIZE,
+    HTTP_KEEPALIVE_EXPIRY
+)
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+
+
+class _HttpxConnectionTracer:
+    """httpx 요청마다 trace 확장을 붙여 새 연결 생성 횟수를 집계"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self._lock = threading.Lock()
+
+    def on_request(self, request: httpx.Request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    def _trace(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+
+
+class ClientRegistry:
+    def __init__(self, pool_maxsize: int = HTTP_POOL_MAXSIZE, keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY):
+        self.pool_maxsize = pool_maxsize
+        self.keepalive_expiry = keepalive_expiry
+        self._lock = threading.RLock()
+        self._clients = {}
+        self._builds = defaultdict(int)
+        self._hits = defaultdict(int)
+        self._http_client = None
+        self._httpx_tracer = _HttpxConnectionTracer()
+        self._session = None
+
+    # ----- 공유 HTTP 풀 -----
+
+    def _get_http_client(self) -> httpx.Client:
+        """OpenAI SDK용 공유 httpx 클라이언트 (keep-alive 풀)"""
+        if self._http_client is None:
+            self._http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=self.pool_maxsize * 2,
+                    max_keepalive_connections=self.pool_maxsize,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                event_hooks={"request": [self._httpx_tracer.on_request]}
+            )
+        return self._http_client
+
+    def _get_azure_transport(self) -> RequestsTransport:
+        """Azure SDK용 공유 requests 세션 (keep-alive 풀)"""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        # 세션은 레지스트리가 소유 → 클라이언트 close 시 세션은 닫히지 않음
+        return RequestsTransport(session=self._session, session_owner=False)
+
+    # ----- 클라이언트 조회 -----
+
+    def _get(self, key: tuple, factory):
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._hits[key[0]] += 1
+                return client
+            client = factory()
+            self._clients[key] = client
+            self._builds[key[0]] += 1
+            print(f"🔌 Client created: {'/'.join(str(k) for k in key)}")
+            return client
+
+    def openai(self) -> AzureOpenAI:
+        return self._get(("openai",), lambda: AzureOpenAI(
+            api_key=AZURE_OPENAI_API_KEY,
+            api_version=AZURE_OPENAI_API_VERSION,
+            azure_endpoint=AZURE_OPENAI_ENDPOINT,
+            http_client=self._get_http_client()
+        ))
+
+    def google(self) -> OpenAI:
+        return self._get(("google",), lambda: OpenAI(
+            api_key=GOOGLE_API_KEY,
+            base_url=GEMINI_BASE_URL,
+            http_client=self._get_http_client()
+        ))
+
+    def search(self, index_name: str = None) -> SearchClient:
+        index_name = index_name or AZURE_SEARCH_INDEX_NAME
+        return self._get(("search", index_name), lambda: SearchClient(
+            endpoint=AZURE_SEARCH_ENDPOINT,
+            index_name=index_name,
+            credential=AzureKeyCredential(AZURE_SEARCH_KEY),
+            transport=self._get_azure_transport()
+        ))
+
+    def search_index(self) -> SearchIndexClient:
+        return self._get(("search_index",), lambda: SearchIndexClient(
+            endpoint=AZURE_SEARCH_SERVICE_ENDPOINT,
+            credential=AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY),
+            transport=self._get_azure_transport()
+        ))
+
+    def document(self) -> DocumentAnalysisClient:
+        return self._get(("document",), lambda: DocumentAnalysisClient(
+            endpoint=AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT,
+            credential=AzureKeyCredential(AZURE_DOCUMENT_INTELLIGENCE_KEY),
+            transport=self._get_azure_transport()
+        ))
+
+    # ----- 종료 / 통계 -----
+
+    def close(self):
+        """모든 클라이언트와 연결 풀 종료 (앱 shutdown 시 호출)"""
+        with self._lock:
+            for key, client in self._clients.items():
+                try:
+                    client.close()
+                except Exception as e:
+                    print(f"⚠️ Failed to close client {key}: {e}")
+            self._clients.clear()
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        print("🔌 All SDK clients closed.")
+
+    def stats(self) -> dict:
+        """클라이언트 생성/재사용 횟수와 HTTP 연결 재사용 통계"""
+        with self._lock:
+            azure_requests = 0
+            azure_connections = 0
+            if self._session is not None:
+                for adapter in set(self._session.adapters.values()):
+                    pools = adapter.poolmanager.pools
+                    # RecentlyUsedContainer는 직접 순회할 수 없으므로 keys() 스냅샷 사용
+                    for key in pools.keys():
+                        pool = pools.get(key)
+                        if pool is not None:
+                            azure_requests += pool.num_requests
+                            azure_connections += pool.num_connections
+
+            openai_requests = self._httpx_tracer.requests
+            openai_connections = self._httpx_tracer.new_connections
+
+            return {
+                "clients": {
+                    kind: {"built": self._builds[kind], "reused": self._hits[kind]}
+                    for kind in sorted(set(self._builds) | set(self._hits))
+                },
+                "http": {
+                    "openai": {
+                        "requests": openai_requests,
+                        "new_connections": openai_connections,
+                        "reused_connections": max(0, openai_requests - openai_connections)
+                    },
+                    "azure": {
+                        "requests": azure_requests,
+                        "new_connections": azure_connections,
+                        "reused_connections": max(0, azure_requests - azure_connections)
+                    }
+                },
+                "pool_maxsize": self.pool_maxsize
+            }
+
+
+# 전역 인스턴스
+client_registry = ClientRegistry()
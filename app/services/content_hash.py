@@ -0,0 +1,36 @@
+"""
+콘텐츠 해시 기반 식별자
+- 파일: 원본 바이트의 sha256 → Raw Blob / Processed JSON 이름 (같은 파일 재업로드 시 재사용)
+- 청크: 파일명 + 청크 본문의 해시 → 본문이 바뀐 청크만 새 id를 가짐 (증분 재인덱싱)
+"""
+
+import hashlib
+
+
+def sha256_hex(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunk_id(file_name: str, chunk: dict) -> str:
+    """
+    파일명 해시 + 본문 해시 (Azure Search 키 허용 문자: 영문/숫자/_/-/=)
+    코드 청크는 설명(content)과 원본 코드(rawCode)를 함께 해시
+    """
+    body = f"{chunk.get('content') or ''}\0{chunk.get('rawCode') or ''}"
+    return f"{sha256_hex(file_name)[:12]}_{sha256_hex(body)[:32]}"
+
+
+def assign_chunk_ids(chunks: list, file_name: str) -> list:
+    """
+    청크 id를 본문 기반으로 다시 매기고 fileName을 실제 업로드 파일명으로 맞춤.
+    한 파일 안에 본문이 같은 청크가 여러 개면 순번을 붙여 구분합니다.
+    """
+    seen = {}
+    for chunk in chunks:
+        chunk["fileName"] = file_name
+        base = chunk_id(file_name, chunk)
+        seen[base] = seen.get(base, 0) + 1
+        chunk["id"] = base if seen[base] == 1 else f"{base}_{seen[base]}"
+    return chunks
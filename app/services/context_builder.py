@@ -0,0 +1,143 @@
+"""
+채팅 프롬프트용 컨텍스트 구성
+- 검색 결과를 reranker 점수 순으로 토큰 예산(CHAT_CONTEXT_MAX_TOKENS) 안에 채움
+- 같은 본문 / 다른 청크에 포함된 본문은 제거하고, 같은 parentId 청크는 한 블록으로 묶어 파일 요약을 한 번만 씀
+- 본문이 예산에 들어가지 않으면 chunkSummary → parentSummary 순으로 대체
+"""
+
+import hashlib
+import re
+
+from app.config import CHAT_CONTEXT_MAX_TOKENS, CHAT_CONTEXT_CHUNK_MAX_TOKENS
+from app.services.token_utils import estimate_tokens, truncate_to_tokens
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalized(text: str) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def _score(doc: dict) -> float:
+    reranker = doc.get("reranker_score")
+    return reranker if reranker is not None else (doc.get("score") or 0.0)
+
+
+def _dedupe(docs: list) -> tuple:
+    """
+    점수 순 문서에서 중복 제거
+    - 본문이 같은 청크 (공백 차이 무시)
+    - 같은 parentId에서 더 높은 점수 청크의 본문에 포함된 청크 (겹치는 구간)
+    Returns: (남은 문서, 제거된 개수)
+    """
+    kept = []
+    seen_hashes = set()
+    kept_texts = {}  # parentId -> [정규화된 본문]
+    for doc in docs:
+        text = _normalized(doc.get("content"))
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if text and digest in seen_hashes:
+            continue
+        parent = doc.get("parentId") or doc.get("fileName")
+        if text and any(text in other for other in kept_texts.get(parent, ())):
+            continue
+        seen_hashes.add(digest)
+        kept_texts.setdefault(parent, []).append(text)
+        kept.append(doc)
+    return kept, len(docs) - len(kept)
+
+
+def build_context(search_results: list, max_tokens: int = None, chunk_max_tokens: int = None) -> dict:
+    """
+    검색 결과 → 프롬프트 컨텍스트
+
+    Returns:
+        {
+            "context": 프롬프트에 넣을 텍스트,
+            "sources": 포함된 파일명 (점수 순, 중복 제거),
+            "doc_ids": 포함된 청크 id,
+            "tokens": 컨텍스트 토큰 수 (추정), "budget": 예산,
+            "full": 본문 포함 수, "summarized": 요약으로 대체된 수, "dropped": 제외된 수, "duplicates": 중복 제거 수
+        }
+    """
+    max_tokens = max_tokens or CHAT_CONTEXT_MAX_TOKENS
+    chunk_max_tokens = chunk_max_tokens or CHAT_CONTEXT_CHUNK_MAX_TOKENS
+
+    docs = sorted(search_results, key=_score, reverse=True)
+    docs, duplicates = _dedupe(docs)
+
+    # parentId별 블록 (처음 등장한 순서 = 최고 점수 순)
+    blocks = {}
+    used = 0
+    counts = {"full": 0, "summarized": 0, "dropped": 0}
+
+    for doc in docs:
+        parent = doc.get("parentId") or doc.get("fileName") or doc.get("id")
+        block = blocks.get(parent)
+        header_tokens = 0
+        if block is None:
+            block = {"fileName": doc.get("fileName") or "Unknown", "parentSummary": None, "parts": [], "ids": []}
+            header_tokens = estimate_tokens(f"[{block['fileName']}]\n")
+
+        content = truncate_to_tokens(doc.get("content") or "", chunk_max_tokens)
+        candidates = [("full", content)]
+        if doc.get("chunkSummary"):
+            candidates.append(("summarized", f"(요약) {doc['chunkSummary']}"))
+
+        added = False
+        for kind, text in candidates:
+            if not text:
+                continue
+            tokens = estimate_tokens(text) + header_tokens
+            if used + tokens <= max_tokens:
+                block["parts"].append(text)
+                used += tokens
+                counts[kind] += 1
+                added = True
+                break
+
+        # 청크 요약도 들어가지 않으면 파일 요약 (블록당 한 번)
+        if not added and doc.get("parentSummary") and block["parentSummary"] is None:
+            text = f"(파일 요약) {doc['parentSummary']}"
+            tokens = estimate_tokens(text) + header_tokens
+            if used + tokens <= max_tokens:
+                block["parentSummary"] = text
+                used += tokens
+                counts["summarized"] += 1
+                added = True
+
+        if not added:
+            counts["dropped"] += 1
+            continue
+        block["ids"].append(doc.get("id"))
+        blocks.setdefault(parent, block)
+
+    # 같은 파일의 청크가 2개 이상이면 파일 요약을 앞에 한 번 붙여 맥락 제공 (예산이 남을 때만)
+    for block in blocks.values():
+        if block["parentSummary"] is None and len(block["parts"]) > 1:
+            summary = next((d.get("parentSummary") for d in docs if d.get("id") in block["ids"] and d.get("parentSummary")), None)
+            if summary:
+                text = f"(파일 요약) {summary}"
+                tokens = estimate_tokens(text)
+                if used + tokens <= max_tokens:
+                    block["parentSummary"] = text
+                    used += tokens
+
+    sections = []
+    for block in blocks.values():
+        lines = [f"[{block['fileName']}]"]
+        if block["parentSummary"]:
+            lines.append(block["parentSummary"])
+        lines.extend(block["parts"])
+        sections.append("\n".join(lines))
+    context = "\n\n".join(sections)
+
+    return {
+        "context": context,
+        "sources": list(dict.fromkeys(block["fileName"] for block in blocks.values())),
+        "doc_ids": [doc_id for block in blocks.values() for doc_id in block["ids"]],
+        "tokens": estimate_tokens(context),
+        "budget": max_tokens,
+        "duplicates": duplicates,
+        **counts
+    }
@@ -0,0 +1,129 @@
+"""
+문서 목록 응답 (페이지네이션 / 그룹화 / JSON 스트리밍)
+- continuation_token: 다음 페이지 커서를 base64로 감싼 문자열 (클라이언트에는 불투명)
+- group_by: fileName / parentId 기준으로 묶음.
+  청크 id가 파일명 해시로 시작하므로(content_hash) id 순 페이지에서 같은 파일의 청크는 연속됩니다.
+  페이지 끝에서 잘린 그룹은 다음 페이지로 넘겨 한 그룹이 두 페이지에 나뉘지 않게 합니다.
+- all=true: 페이지를 차례로 가져오며 바로 내보내므로 인덱스 크기와 관계없이 메모리 사용량이 일정
+"""
+
+import base64
+import binascii
+import json
+
+from app.services.executor import run_blocking
+from app.services.search_service import list_documents_page
+
+GROUP_FIELDS = ("fileName", "parentId")
+
+
+def encode_token(cursor: dict):
+    if not cursor:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(cursor, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def decode_token(token: str):
+    """잘못된 토큰은 ValueError"""
+    if not token:
+        return None
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ValueError("Invalid continuation token")
+    if not isinstance(cursor, dict) or not set(cursor) <= {"after", "skip"}:
+        raise ValueError("Invalid continuation token")
+    return cursor
+
+
+def group_documents(docs: list, group_by: str) -> list:
+    """연속된 같은 키의 문서를 하나의 그룹으로 묶음"""
+    groups = []
+    for doc in docs:
+        key = doc.get(group_by) or "Unknown"
+        if groups and groups[-1]["key"] == key:
+            groups[-1]["documents"].append(doc)
+        else:
+            groups.append({"key": key, "documents": [doc]})
+    for group in groups:
+        group["count"] = len(group["documents"])
+    return groups
+
+
+def _split_trailing_group(docs: list, group_by: str, cursor: dict):
+    """
+    다음 페이지가 있을 때 마지막 그룹은 잘렸을 수 있으므로 다음 페이지로 미룸
+    Returns: (이번 페이지 문서, 다음 커서)
+    """
+    if cursor is None or "after" not in cursor or not docs:
+        return docs, cursor
+    last_key = docs[-1].get(group_by)
+    cut = len(docs)
+    while cut > 0 and docs[cut - 1].get(group_by) == last_key:
+        cut -= 1
+    if cut == 0:
+        # 페이지 전체가 한 그룹 (페이지 크기보다 큰 그룹): 그대로 내보내고 다음 페이지에서 이어짐
+        return docs, cursor
+    return docs[:cut], {"after": docs[cut - 1]["id"]}
+
+
+def _with_legacy_fields(docs: list, include_content: bool) -> list:
+    """
+    이전 응답 형식의 키 유지 (기존 클라이언트 호환)
+    file_name: fileName과 같은 값 / content_length: content를 포함할 때만
+    """
+    for doc in docs:
+        doc["file_name"] = doc.get("fileName") or "Unknown"
+        if include_content:
+            doc["content_length"] = len(doc.get("content") or "")
+    return docs
+
+
+async def fetch_page(index_name: str, limit: int, cursor: dict, include_content: bool):
+    docs, next_cursor = await run_blocking(list_documents_page, index_name, limit, cursor, include_content)
+    return _with_legacy_fields(docs, include_content), next_cursor
+
+
+async def stream_document_listing(first_page: tuple, index_name: str, limit: int, include_content: bool,
+                                  group_by: str = None, all_pages: bool = False):
+    """
+    목록 응답 JSON을 조각 단위로 생성
+    {"index_name": ..., "documents" 또는 "groups": [...], "count": n, "continuation_token": ...}
+    all_pages에서 두 번째 이후 페이지 조회가 실패하면 "error"를 추가하고, continuation_token은
+    마지막으로 성공한 페이지 다음 위치를 가리킴
+
+    Args:
+        first_page: fetch_page 결과 (첫 페이지 오류는 응답 시작 전에 HTTP 오류로 반환되도록 호출자가 미리 조회)
+    """
+    items_key = "groups" if group_by else "documents"
+    yield f'{{"index_name": {json.dumps(index_name)}, "{items_key}": ['
+
+    count = 0
+    error = None
+    page = first_page
+    while True:
+        docs, next_cursor = page
+        if group_by:
+            docs, next_cursor = _split_trailing_group(docs, group_by, next_cursor)
+            items = group_documents(docs, group_by)
+        else:
+            items = docs
+        for item in items:
+            yield ("," if count else "") + json.dumps(item, ensure_ascii=False, default=str)
+            count += 1
+        cursor = next_cursor
+        if cursor is None or not all_pages:
+            break
+        try:
+            page = await fetch_page(index_name, limit, cursor, include_content)
+        except Exception as e:
+            # 응답이 이미 시작되어 HTTP 오류로 바꿀 수 없으므로, JSON을 닫으면서 오류와
+            # 실패한 페이지부터 다시 받을 수 있는 continuation_token을 함께 내보냄
+            print(f"❌ Document listing page failed after {count} items: {e}")
+            error = str(e)
+            break
+
+    tail = f'], "count": {count}, "continuation_token": {json.dumps(encode_token(cursor))}'
+    if error is not None:
+        tail += f', "error": {json.dumps(error, ensure_ascii=False)}'
+    yield tail + "}"
@@ -1,36 +1,255 @@
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
-from app.config import AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT, AZURE_DOCUMENT_INTELLIGENCE_KEY
+from app.config import (
+    DOCUMENT_PAGES_PER_RANGE,
+    DOCUMENT_MAX_CONCURRENT_RANGES,
+    DOCUMENT_POLL_INTERVAL,
+    DOCUMENT_TEXT_LAYER_MIN_CHARS,
+    DOCUMENT_TEXT_LAYER_MAX_GARBAGE
+)
+from app.services.client_registry import client_registry
+from app.services.segmenter import PAGE_BREAK
 
 from io import BytesIO
 from docx import Document
+from pypdf import PdfReader
+import bisect
+import re
+import time
+import unicodedata
 
 def get_document_client():
-    return DocumentAnalysisClient(
-        endpoint=AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT,
-        credential=AzureKeyCredential(AZURE_DOCUMENT_INTELLIGENCE_KEY)
-    )
+    """Document Intelligence 클라이언트 (프로세스 공유)"""
+    return client_registry.document()
 
-def extract_text_from_url(blob_url: str) -> str:
+# PDF 페이지 트리 루트의 전체 페이지 수 (/Type /Pages ... /Count N)
+_PDF_PAGE_COUNT = re.compile(rb"/Count\s+(\d+)")
+
+
+def _is_pdf(file_data) -> bool:
+    """bytes / mmap 모두 지원 (mmap에는 startswith가 없음)"""
+    return bool(file_data) and file_data[:4] == b"%PDF"
+
+
+def count_pdf_pages(file_data) -> int:
+    """
+    PDF 전체 페이지 수 (페이지 트리의 /Count 중 최댓값). 알 수 없으면 0
+    객체 스트림으로 압축된 PDF는 /Count가 보이지 않으므로 0 → 분할 없이 한 번에 분석
+    file_data는 bytes 또는 mmap (정규식 검색은 mmap에서도 그대로 동작)
+    """
+    if not _is_pdf(file_data):
+        return 0
+    counts = [int(m) for m in _PDF_PAGE_COUNT.findall(file_data)]
+    return max(counts) if counts else 0
+
+
+def page_ranges(page_numbers, pages_per_range: int) -> list:
+    """
+    페이지 번호 목록 → Document Intelligence pages 인자 목록 (구간당 최대 pages_per_range 페이지)
+    예: [1..25], 10 → ["1-10", "11-20", "21-25"] / [3, 7, 8, 9], 10 → ["3,7-9"]
+    """
+    groups = []
+    for start in range(0, len(page_numbers), pages_per_range):
+        numbers = list(page_numbers[start:start + pages_per_range])
+        spans = []
+        span_start = prev = numbers[0]
+        for number in numbers[1:] + [None]:
+            if number is not None and number == prev + 1:
+                prev = number
+                continue
+            spans.append(f"{span_start}-{prev}" if prev > span_start else str(span_start))
+            if number is not None:
+                span_start = prev = number
+        groups.append(",".join(spans))
+    return groups
+
+
+# ----- 로컬 텍스트 레이어 (pypdf) -----
+
+def _garbage_ratio(text: str) -> float:
+    """깨진 문자 비율 (대체 문자, 제어 문자, 사설 영역 등 정상 텍스트로 보기 어려운 문자)"""
+    chars = [ch for ch in text if not ch.isspace()]
+    if not chars:
+        return 1.0
+    garbage = 0
+    for ch in chars:
+        category = unicodedata.category(ch)
+        if ch == "\ufffd" or category in ("Cc", "Cf", "Co", "Cs", "Cn"):
+            garbage += 1
+    return garbage / len(chars)
+
+
+def text_layer_page_ok(text: str) -> bool:
+    """텍스트 레이어 품질 확인: 글자 수(스캔 페이지는 거의 비어 있음) + 깨진 문자 비율"""
+    visible = sum(1 for ch in text if not ch.isspace())
+    return visible >= DOCUMENT_TEXT_LAYER_MIN_CHARS and _garbage_ratio(text) <= DOCUMENT_TEXT_LAYER_MAX_GARBAGE
+
+
+def extract_pdf_text_layer(file_data):
+    """
+    PDF에 포함된 텍스트 레이어를 페이지별로 읽음 (pypdf)
+    file_data가 mmap이면 복사 없이 그대로 스트림으로 사용
+    Returns: 페이지별 텍스트 리스트 (암호화되었거나 읽을 수 없으면 None → 모든 페이지 OCR)
+    """
+    if not _is_pdf(file_data):
+        return None
+    try:
+        reader = PdfReader(BytesIO(file_data) if isinstance(file_data, bytes) else file_data)
+        if reader.is_encrypted:
+            return None
+        pages = []
+        for page in reader.pages:
+            try:
+                text = page.extract_text() or ""
+            except Exception:
+                text = ""  # 이 페이지만 OCR로
+            # 줄 끝 공백 정리 (Document Intelligence 결과와 같은 줄 단위 형식)
+            pages.append("".join(line.rstrip() + "\n" for line in text.splitlines()))
+        return pages
+    except Exception as e:
+        print(f"[DocService] Text layer read failed, falling back to OCR: {e}")
+        return None
+
+
+def build_pages(page_texts: list, first_page: int = 1) -> dict:
+    """
+    페이지별 텍스트 → 전체 텍스트 + 페이지 오프셋
+    페이지 사이에 \f를 넣어 긴 문서 분할 시 페이지 경계로 사용 (segmenter.PAGE_BREAK)
+
+    Returns:
+        {"text": 전체 텍스트, "pages": [{"page": 번호, "offset": 시작 위치, "length": 길이}, ...]}
+    """
+    pages = []
+    offset = 0
+    for number, page_text in enumerate(page_texts, start=first_page):
+        pages.append({"page": number, "offset": offset, "length": len(page_text)})
+        offset += len(page_text) + len(PAGE_BREAK)
+    return {"text": PAGE_BREAK.join(page_texts), "pages": pages}
+
+
+def page_for_offset(pages: list, offset: int) -> int:
+    """전체 텍스트의 위치 → 페이지 번호 (청크를 원본 페이지로 매핑)"""
+    starts = [page["offset"] for page in pages]
+    index = bisect.bisect_right(starts, offset) - 1
+    return pages[max(index, 0)]["page"] if pages else 0
+
+
+def _page_texts(result) -> list:
+    """AnalyzeResult → 페이지 번호 순 (번호, 텍스트). 줄은 리스트에 모아 한 번에 join"""
+    return [
+        (page.page_number, "".join([line.content + "\n" for line in page.lines]))
+        for page in result.pages
+    ]
+
+
+def _run_ranges(client, blob_url: str, ranges: list, page_texts: dict) -> list:
+    """
+    구간마다 begin_analyze 요청을 먼저 보내고 각 poller가 백그라운드에서 상태를 확인
+    (동시에 진행하는 구간 수는 DOCUMENT_MAX_CONCURRENT_RANGES로 제한)
+    한 구간이 실패해도 나머지 구간의 결과는 끝까지 수집하여 page_texts에 채움
+    Returns: 실패한 구간 [(pages, 오류), ...]
+    """
+    pollers = []
+    failed = []
+    pending = list(ranges)
+    while pending or pollers:
+        # 동시 진행 한도까지 요청 시작
+        while pending and len(pollers) < DOCUMENT_MAX_CONCURRENT_RANGES:
+            pages = pending.pop(0)
+            kwargs = {"pages": pages} if pages else {}
+            try:
+                pollers.append((pages, client.begin_analyze_document_from_url(
+                    "prebuilt-read", blob_url, polling_interval=DOCUMENT_POLL_INTERVAL, **kwargs
+                )))
+            except Exception as e:
+                failed.append((pages, e))
+        if not pollers:
+            continue
+        # 가장 먼저 시작한 구간부터 결과 수집 (나머지는 그동안 백그라운드에서 진행)
+        pages, poller = pollers.pop(0)
+        try:
+            result = poller.result()
+        except Exception as e:
+            failed.append((pages, e))
+            continue
+        for number, text in _page_texts(result):
+            page_texts[number] = text
+    return failed
+
+
+def _analyze_pages(blob_url: str, ranges: list) -> dict:
+    """
+    Document Intelligence(prebuilt-read)로 pages 구간들을 분석 → {페이지 번호: 텍스트}
+    실패한 구간만 한 번 더 분석하고, 그래도 실패하면 그 구간들을 오류 메시지에 담아 RuntimeError
+    ranges가 [None]이면 문서 전체를 한 번에 분석
+    """
     client = get_document_client()
-    poller = client.begin_analyze_document_from_url("prebuilt-read", blob_url)
-    result = poller.result()
-    
-    text = ""
-    for page in result.pages:
-        for line in page.lines:
-            text += line.content + "\n"
-    
-    return text
-
-def extract_text_from_docx(file_data: bytes) -> str:
-    """
-    python-docx 라이브러리를 사용하여 메모리 상의 docx 파일에서 텍스트를 추출합니다.
+    page_texts = {}
+    failed = _run_ranges(client, blob_url, ranges, page_texts)
+    if failed:
+        print(f"[DocService] {len(failed)}/{len(ranges)} page ranges failed, retrying: "
+              f"{[pages or 'all' for pages, _ in failed]}")
+        failed = _run_ranges(client, blob_url, [pages for pages, _ in failed], page_texts)
+    if failed:
+        details = "; ".join(f"pages {pages or 'all'}: {error}" for pages, error in failed)
+        raise RuntimeError(f"Document analysis failed for {len(failed)}/{len(ranges)} page ranges ({details})")
+    return page_texts
+
+
+def extract_document(blob_url: str, file_data=None) -> dict:
+    """
+    PDF/이미지 텍스트 추출
+    1. PDF 텍스트 레이어(pypdf)를 먼저 읽고 페이지별 품질 확인
+    2. 스캔/저품질 페이지만 Document Intelligence로 OCR
+       (페이지가 DOCUMENT_PAGES_PER_RANGE보다 많으면 구간으로 나누어 동시에 분석)
+
+    Args:
+        blob_url: SAS 토큰이 포함된 Blob URL
+        file_data: 원본 바이트 또는 스풀 파일 mmap (텍스트 레이어 / PDF 페이지 수 확인용)
+
+    Returns:
+        build_pages 형식 {"text", "pages"}, 페이지마다 "source": "text_layer" | "ocr"
+    """
+    started = time.perf_counter()
+    local_pages = extract_pdf_text_layer(file_data) if file_data else None
+
+    if local_pages is not None:
+        page_texts = {n: text for n, text in enumerate(local_pages, start=1) if text_layer_page_ok(text)}
+        ocr_numbers = [n for n in range(1, len(local_pages) + 1) if n not in page_texts]
+        ocr_texts = _analyze_pages(blob_url, page_ranges(ocr_numbers, DOCUMENT_PAGES_PER_RANGE)) if ocr_numbers else {}
+        page_texts.update(ocr_texts)
+        print(f"[DocService] PDF {len(local_pages)} pages: {len(local_pages) - len(ocr_numbers)} from text layer, "
+              f"{len(ocr_numbers)} via OCR ({time.perf_counter() - started:.2f}s)")
+    else:
+        total_pages = count_pdf_pages(file_data) if file_data else 0
+        if total_pages > DOCUMENT_PAGES_PER_RANGE:
+            ranges = page_ranges(list(range(1, total_pages + 1)), DOCUMENT_PAGES_PER_RANGE)
+        else:
+            ranges = [None]
+        ocr_texts = page_texts = _analyze_pages(blob_url, ranges)
+        if len(ranges) > 1:
+            print(f"[DocService] Analyzed {total_pages} pages in {len(ranges)} ranges "
+                  f"({time.perf_counter() - started:.1f}s)")
+
+    numbers = sorted(page_texts)
+    if not numbers:
+        return {"text": "", "pages": []}
+    document = build_pages([page_texts.get(n, "") for n in range(numbers[0], numbers[-1] + 1)], first_page=numbers[0])
+    for page in document["pages"]:
+        page["source"] = "ocr" if page["page"] in ocr_texts else "text_layer"
+    return document
+
+
+def extract_text_from_url(blob_url: str, file_data: bytes = None) -> str:
+    return extract_document(blob_url, file_data)["text"]
+
+def extract_text_from_docx(file_data) -> str:
+    """
+    python-docx 라이브러리를 사용하여 docx 파일에서 텍스트를 추출합니다.
+    file_data는 bytes 또는 읽기용 파일 스트림 (스풀 파일)
     Azure API를 타지 않으므로 빠르고 비용이 들지 않습니다.
     """
     try:
         print("[DocService] Extracting text locally using python-docx...")
-        doc = Document(BytesIO(file_data))
+        doc = Document(BytesIO(file_data) if isinstance(file_data, bytes) else file_data)
         full_text = []
         for para in doc.paragraphs:
             full_text.append(para.text)
@@ -0,0 +1,228 @@
+"""
+임베딩 캐시 (쿼리 / 청크 텍스트 공용)
+- 키: sha256(모델 이름 + 텍스트)
+- 벡터는 파이썬 float 리스트 대신 float32 array로 보관 (3072차원 기준 약 12KB)
+- 메모리 사용량 상한(EMBEDDING_CACHE_MAX_BYTES)을 넘으면 가장 오래 안 쓴 항목부터 제거 (LRU)
+- EMBEDDING_CACHE_DIR를 지정하면 디스크 계층 사용 (메모리에서 밀려난 항목도 재시작 후 재사용)
+  디스크 사용량이 EMBEDDING_CACHE_DISK_MAX_BYTES를 넘으면 수정 시각(읽을 때 갱신)이 오래된 파일부터 삭제
+"""
+
+from array import array
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+
+from app.config import EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_DISK_MAX_BYTES
+
+# 항목당 키/OrderedDict 노드/array 헤더 등 부가 메모리 (대략치)
+ENTRY_OVERHEAD_BYTES = 200
+
+# 디스크 정리 시 상한의 이 비율까지 줄임 (쓰기마다 정리가 반복되지 않도록)
+DISK_SWEEP_TARGET_RATIO = 0.9
+
+
+def cache_key(text: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES, disk_dir: str = EMBEDDING_CACHE_DIR,
+                 disk_max_bytes: int = EMBEDDING_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._disk_writes = 0
+        self._disk_evictions = 0
+        # 디스크 사용량 추정치 (None이면 아직 모름 → 첫 쓰기 때 디렉터리를 훑어 계산)
+        # 다른 워커 프로세스의 쓰기는 정리할 때 다시 훑으면서 반영됨
+        self._disk_bytes = None
+        self._sweep_lock = threading.Lock()
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            print(f"🧮 Embedding cache disk tier: {self.disk_dir}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 or bool(self.disk_dir)
+
+    # ----- 조회 / 저장 -----
+
+    def get(self, text: str, model: str):
+        """캐시된 벡터(float32 array) 또는 None"""
+        if not self.enabled:
+            return None
+        key = cache_key(text, model)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return vector
+
+        vector = self._read_disk(key)
+        with self._lock:
+            if vector is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            self._store(key, vector)
+        return vector
+
+    def put(self, text: str, model: str, vector):
+        if not self.enabled or vector is None:
+            return
+        key = cache_key(text, model)
+        packed = vector if isinstance(vector, array) else array("f", vector)
+        with self._lock:
+            self._store(key, packed)
+        self._write_disk(key, packed)
+
+    def _store(self, key: str, vector: array):
+        """메모리 계층에 저장 후 예산 초과분 제거 (lock 보유 상태에서 호출)"""
+        if self.max_bytes <= 0:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= self._size(old)
+        self._entries[key] = vector
+        self._bytes += self._size(vector)
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self._size(evicted)
+            self._evictions += 1
+
+    @staticmethod
+    def _size(vector: array) -> int:
+        return len(vector) * vector.itemsize + ENTRY_OVERHEAD_BYTES
+
+    # ----- 디스크 계층 -----
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.f32")
+
+    def _read_disk(self, key: str):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if self.disk_max_bytes > 0:
+                os.utime(path)  # 최근 사용 표시 (정리 시 LRU 기준)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"⚠️ Embedding cache read failed: {e}")
+            return None
+        vector = array("f")
+        vector.frombytes(data)
+        return vector
+
+    def _write_disk(self, key: str, vector: array):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 다른 워커가 읽는 중에 덜 쓴 파일이 보이지 않도록 임시 파일 후 교체
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                vector.tofile(f)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._disk_writes += 1
+                if self._disk_bytes is not None:
+                    self._disk_bytes += len(vector) * vector.itemsize
+                over_budget = self.disk_max_bytes > 0 and (self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes)
+        except OSError as e:
+            print(f"⚠️ Embedding cache write failed: {e}")
+            return
+        if over_budget:
+            self._sweep_disk()
+
+    def _sweep_disk(self):
+        """
+        디스크 계층 전체를 훑어 사용량을 다시 계산하고, 상한을 넘으면
+        수정 시각이 오래된 파일부터 상한의 DISK_SWEEP_TARGET_RATIO까지 삭제
+        (다른 스레드가 이미 정리 중이면 건너뜀)
+        """
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            files = []
+            total = 0
+            for entry in os.scandir(self.disk_dir):
+                if not entry.is_dir():
+                    continue
+                for item in os.scandir(entry.path):
+                    if not item.name.endswith(".f32"):
+                        continue
+                    try:
+                        stat = item.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, item.path))
+                    total += stat.st_size
+
+            removed = 0
+            if total > self.disk_max_bytes:
+                target = self.disk_max_bytes * DISK_SWEEP_TARGET_RATIO
+                files.sort()
+                for _, size, path in files:
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                    removed += 1
+                print(f"🧹 Embedding cache disk tier: removed {removed} files ({total} bytes left)")
+            with self._lock:
+                self._disk_bytes = total
+                self._disk_evictions += removed
+        except OSError as e:
+            print(f"⚠️ Embedding cache disk sweep failed: {e}")
+        finally:
+            self._sweep_lock.release()
+
+    # ----- 통계 -----
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "disk_dir": self.disk_dir,
+                "disk_writes": self._disk_writes,
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes,
+                "disk_evictions": self._disk_evictions
+            }
+
+
+# 전역 인스턴스
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,175 @@
+"""
+배치 임베딩 엔진
+- 여러 입력을 하나의 embeddings.create 호출로 묶어 전송 (토큰 추정치 기준 배치 크기 결정)
+- 배치 간 동시 실행 (EMBEDDING_CONCURRENCY로 상한 제한)
+- 입력 오류로 배치가 거부되면 배치를 나누어 재시도하여, 한 건의 문제 입력이 배치 전체를 실패시키지 않음
+- 임베딩 캐시에 있는 텍스트는 API를 호출하지 않음 (재업로드 / 같은 청크 반복 시)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import random
+import time
+import traceback
+
+import openai
+
+from app.config import (
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+    EMBEDDING_BATCH_MAX_ITEMS,
+    EMBEDDING_BATCH_MAX_TOKENS,
+    EMBEDDING_MAX_INPUT_TOKENS,
+    EMBEDDING_CONCURRENCY,
+    EMBEDDING_MAX_RETRIES
+)
+from app.services.openai_service import get_openai_client
+from app.services.embedding_cache import embedding_cache
+from app.services.token_utils import estimate_tokens, truncate_to_tokens
+
+# 일시적인 오류로 보고 재시도할 예외 (429, 5xx, 타임아웃, 연결 오류)
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def build_batches(token_counts: list, max_items: int = None, max_tokens: int = None) -> list:
+    """
+    입력별 토큰 수를 보고 배치(인덱스 리스트)로 나눕니다.
+    순서를 유지하며, 각 배치는 max_items개 / max_tokens 토큰을 넘지 않습니다.
+    """
+    max_items = max_items or EMBEDDING_BATCH_MAX_ITEMS
+    max_tokens = max_tokens or EMBEDDING_BATCH_MAX_TOKENS
+
+    batches = []
+    current = []
+    current_tokens = 0
+    for i, tokens in enumerate(token_counts):
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _backoff(attempt: int):
+    """지수 백오프 + 지터"""
+    time.sleep(min(2 ** attempt, 20) + random.uniform(0, 0.5))
+
+
+def _create_embeddings(client, texts: list) -> list:
+    """embeddings.create 1회 호출, 입력 순서대로 벡터 반환"""
+    response = client.embeddings.create(
+        input=texts,
+        model=AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+    )
+    # 응답 순서가 보장되지 않을 수 있으므로 index 기준으로 정렬
+    ordered = sorted(response.data, key=lambda d: d.index)
+    return [d.embedding for d in ordered]
+
+
+def _embed_batch(client, texts: list, max_retries: int) -> list:
+    """
+    배치 하나를 임베딩.
+    일시적 오류(429, 타임아웃 등)는 배치 단위로 재시도하고, 재시도를 다 써도 실패하면
+    배치 전체를 None으로 반환합니다 (나누어 보내면 요청 수만 늘어 제한이 더 심해짐).
+    입력 오류로 거부되면 배치를 반으로 나누어 문제 항목만 None으로 격리합니다.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return _create_embeddings(client, texts)
+        except RETRYABLE_ERRORS as e:
+            if attempt >= max_retries:
+                print(f"❌ Embedding batch failed after {max_retries} retries ({len(texts)} items): {e}")
+                return [None] * len(texts)
+            _backoff(attempt)
+        except Exception as e:
+            # 400 등 입력 자체의 문제는 재시도해도 소용없음
+            print(f"⚠️ Embedding batch rejected ({len(texts)} items): {e}")
+            break
+
+    if len(texts) == 1:
+        return [None]
+
+    # 절반씩 나누어 재시도 → 문제 항목만 격리되고 나머지는 배치로 처리됨
+    mid = len(texts) // 2
+    print(f"   Splitting rejected batch into {mid} + {len(texts) - mid} items...")
+    return _embed_batch(client, texts[:mid], max_retries) + _embed_batch(client, texts[mid:], max_retries)
+
+
+def embed_texts(texts: list, concurrency: int = None, max_retries: int = None, on_progress=None) -> list:
+    """
+    여러 텍스트를 배치로 임베딩합니다.
+
+    Args:
+        texts: 임베딩할 텍스트 리스트
+        concurrency: 동시에 처리할 배치 수 (기본: EMBEDDING_CONCURRENCY)
+        max_retries: 배치/항목별 최대 재시도 횟수 (기본: EMBEDDING_MAX_RETRIES)
+        on_progress: (완료 개수, 전체 개수)를 받는 콜백 (선택)
+
+    Returns:
+        입력과 같은 순서의 벡터 리스트. 빈 입력이나 실패한 항목은 None.
+    """
+    if not texts:
+        return []
+
+    concurrency = max(1, concurrency or EMBEDDING_CONCURRENCY)
+    max_retries = EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+
+    results = [None] * len(texts)
+
+    # 빈 문자열은 API가 거부하므로 제외하고, 너무 긴 입력은 잘라냄
+    # 캐시에 있는 벡터는 바로 채움
+    pending = []
+    cached = 0
+    for i, text in enumerate(texts):
+        if text and text.strip():
+            text = truncate_to_tokens(text, EMBEDDING_MAX_INPUT_TOKENS)
+            vector = embedding_cache.get(text, AZURE_OPENAI_EMBEDDING_DEPLOYMENT)
+            if vector is not None:
+                results[i] = vector.tolist()
+                cached += 1
+            else:
+                pending.append((i, text))
+
+    total = len(pending) + cached
+    if not pending:
+        if cached and on_progress:
+            on_progress(cached, total)
+        return results
+
+    batches = build_batches([estimate_tokens(text) for _, text in pending])
+    done = cached
+    started = time.time()
+    print(f"🧮 Embedding {len(pending)} texts in {len(batches)} batches (concurrency={concurrency}, cached={cached})...")
+
+    client = get_openai_client()
+
+    def run_batch(batch: list):
+        batch_texts = [pending[j][1] for j in batch]
+        return batch, _embed_batch(client, batch_texts, max_retries)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+        futures = [executor.submit(run_batch, batch) for batch in batches]
+        for future in futures:
+            try:
+                batch, vectors = future.result()
+            except Exception as e:
+                print(f"❌ Embedding batch crashed: {e}")
+                traceback.print_exc()
+                continue
+            for j, vector in zip(batch, vectors):
+                results[pending[j][0]] = vector
+                embedding_cache.put(pending[j][1], AZURE_OPENAI_EMBEDDING_DEPLOYMENT, vector)
+            done += len(batch)
+            if on_progress:
+                on_progress(done, total)
+
+    failed = sum(1 for i, _ in pending if results[i] is None)
+    print(f"✅ Embedded {len(pending) - failed}/{len(pending)} texts in {time.time() - started:.1f}s (+{cached} from cache)")
+    return results
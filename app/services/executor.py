@@ -0,0 +1,94 @@
+"""
+동기 SDK 호출을 이벤트 루프 밖에서 실행하기 위한 스레드 풀
+Azure Search / OpenAI SDK는 동기 API이므로, async 핸들러에서 직접 호출하면
+응답을 기다리는 동안 같은 워커의 다른 요청(/api/health 포함)이 모두 멈춥니다.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import threading
+
+from app.config import BLOCKING_IO_WORKERS
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """공유 스레드 풀 (싱글톤, 최대 BLOCKING_IO_WORKERS개 스레드)"""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    동기 함수를 스레드 풀에서 실행하고 결과를 기다림
+
+    사용법:
+        results = await run_blocking(search_documents, query, index_name=index_name)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+_END = object()
+
+
+def _close_iterator(iterator):
+    close = getattr(iterator, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception as e:
+        print(f"⚠️ Failed to close blocking iterator: {e}")
+
+
+def _submit_close(executor, iterator):
+    try:
+        executor.submit(_close_iterator, iterator)
+    except RuntimeError:
+        # 종료 중이라 스레드 풀이 이미 닫힘 → 이 자리에서 바로 닫음
+        _close_iterator(iterator)
+
+
+async def iterate_blocking(iterator):
+    """
+    동기 이터레이터(예: OpenAI 스트리밍 응답)를 스레드 풀에서 한 항목씩 꺼내는 async 이터레이터
+
+    사용법:
+        async for delta in iterate_blocking(chat_with_context_stream(query, context)):
+            ...
+    """
+    iterator = iter(iterator)
+    executor = get_executor()
+    pending = None
+    try:
+        while True:
+            pending = executor.submit(next, iterator, _END)
+            item = await asyncio.wrap_future(pending)
+            if item is _END:
+                return
+            yield item
+    finally:
+        # 클라이언트 연결이 끊겨 중간에 멈춘 경우에도 원본 스트림(HTTP 연결)을 닫음.
+        # 취소된 scope 안에서는 await하지 않고, 워커 스레드에서 닫기만 예약함.
+        # 진행 중인 next()가 있으면 그 호출이 끝난 뒤에 닫음 (실행 중인 제너레이터는 close할 수 없음)
+        if pending is not None and not pending.done():
+            pending.add_done_callback(lambda _: _submit_close(executor, iterator))
+        else:
+            _submit_close(executor, iterator)
+
+
+def shutdown_executor():
+    """앱 종료 시 스레드 풀 정리 (진행 중인 작업은 끝까지 기다림)"""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,346 @@
+"""
+인수인계서 생성 엔진 (섹션별 검색 + 병렬 생성)
+- 섹션마다 relatedSection 필터로 관련 청크만 검색 (필터 결과가 부족하면 필터 없이 보충)
+- 섹션별 컨텍스트는 context_builder로 작은 토큰 예산 안에 구성
+- 섹션 프롬프트를 동시에 실행하고, 결과를 HandoverData JSON 하나로 병합
+- 응답은 스트리밍으로 받아 최상위 키가 완성되는 즉시 검증/전달하고, 실패한 키만 다시 요청
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import time
+import traceback
+
+from app.config import (
+    HANDOVER_CONCURRENCY,
+    HANDOVER_SECTION_TOP_K,
+    HANDOVER_SECTION_MAX_TOKENS,
+    HANDOVER_FILE_CONTEXT_TOKENS,
+    HANDOVER_SECTION_RETRIES
+)
+from app.services.client_registry import client_registry
+from app.services.context_builder import build_context
+from app.services.json_stream import IncrementalJsonParser
+from app.services.token_utils import truncate_to_tokens
+
+# HandoverData 최상위 키별 응답 형식 (섹션 프롬프트 / 실패한 키 재요청에 사용)
+KEY_SCHEMAS = {
+    "overview": """{
+        "transferor": {"name": "인계자명", "position": "직급/부서", "contact": "연락처"},
+        "transferee": {"name": "인수자명", "position": "직급/부서", "contact": "연락처", "startDate": "시작일"},
+        "reason": "인수인계 사유",
+        "background": "업무 배경",
+        "period": "근무 기간",
+        "schedule": [{"date": "날짜", "activity": "활동"}]
+    }""",
+    "jobStatus": """{
+        "title": "직책",
+        "responsibilities": ["책임내용1", "책임내용2"],
+        "authority": "권한",
+        "reportingLine": "보고체계",
+        "teamMission": "팀 미션",
+        "teamGoals": ["목표1", "목표2"]
+    }""",
+    "priorities": """[
+        {"rank": 1, "title": "우선과제명", "status": "상태", "solution": "해결방안", "deadline": "마감일"}
+    ]""",
+    "checklist": """[{"text": "확인항목", "completed": false}]""",
+    "stakeholders": """{
+        "manager": "상급자",
+        "internal": [{"name": "이름", "role": "역할"}],
+        "external": [{"name": "이름", "role": "역할"}]
+    }""",
+    "teamMembers": """[
+        {"name": "팀원명", "position": "직급", "role": "역할", "notes": "비고"}
+    ]""",
+    "ongoingProjects": """[
+        {"name": "프로젝트명", "owner": "담당자", "status": "상태", "progress": 50, "deadline": "마감일", "description": "설명"}
+    ]""",
+    "roadmap": """{"shortTerm": "단기계획", "longTerm": "장기계획"}""",
+    "risks": """{"issues": "현안", "risks": "위험요소"}""",
+    "resources": """{
+        "docs": [{"category": "분류", "name": "문서명", "location": "위치"}],
+        "systems": [{"name": "시스템명", "usage": "사용방법", "contact": "담당자"}],
+        "contacts": [{"category": "분류", "name": "이름", "position": "직급", "contact": "연락처"}]
+    }""",
+}
+
+# 섹션 정의
+# - keys: 이 섹션이 채우는 HandoverData 최상위 키
+# - related: 검색 필터로 쓰는 relatedSection 값 (전처리 프롬프트가 청크마다 매핑한 값)
+# - query: 섹션 검색 쿼리
+HANDOVER_SECTIONS = {
+    "overview": {
+        "keys": ["overview"],
+        "related": [],
+        "query": "인계자 인수자 인수인계 사유 업무 배경 근무 기간 인수인계 일정"
+    },
+    "jobStatus": {
+        "keys": ["jobStatus"],
+        "related": ["jobStatus"],
+        "query": "직책 담당 업무 책임 권한 보고 체계 팀 미션 팀 목표"
+    },
+    "priorities": {
+        "keys": ["priorities", "checklist"],
+        "related": ["priorities"],
+        "query": "우선 과제 시급한 업무 마감일 해결 방안 확인 사항"
+    },
+    "stakeholders": {
+        "keys": ["stakeholders", "teamMembers"],
+        "related": ["stakeholders"],
+        "query": "상급자 이해관계자 협업 부서 외부 담당자 팀원 역할"
+    },
+    "ongoingProjects": {
+        "keys": ["ongoingProjects", "roadmap"],
+        "related": ["ongoingProjects", "roadmap"],
+        "query": "진행 중인 프로젝트 진행률 담당자 마감일 향후 계획 로드맵"
+    },
+    "risks": {
+        "keys": ["risks"],
+        "related": ["risks"],
+        "query": "현안 이슈 위험 요소 장애 일정 지연 문제점"
+    },
+    "resources": {
+        "keys": ["resources"],
+        "related": ["resources"],
+        "query": "참고 문서 매뉴얼 시스템 접근 방법 사용법 연락처"
+    },
+}
+
+
+def schema_for(keys: list) -> str:
+    return "{\n" + ",\n".join(f'    "{key}": {KEY_SCHEMAS[key]}' for key in keys) + "\n}"
+
+
+SECTION_SYSTEM_MESSAGE = """당신은 인수인계서 생성 전문가입니다. 반드시 유효한 JSON 형식으로만 답변하세요.
+
+인수인계서 전체 중 **지정된 항목만** 작성합니다. 아래 자료는 AI Search 인덱스에서 이 항목과 관련해 검색된 업무 문서의 요약 또는 원문입니다.
+중복되거나 불필요한 내용은 통합·요약하고, 실제 인수인계서처럼 구체적이고 실무적으로 작성하세요.
+자료에 있는 정보는 최대한 반영하고, 자료가 부족하거나 없는 항목은 빈 배열([]) 또는 빈 문자열("")로 채워주세요.
+
+응답 형식:
+{schema}
+"""
+
+SAMPLE_CONTEXT = """[샘플: 프로젝트 현황 보고]
+프로젝트명: 시스템 고도화
+담당자: 김철수 과장 (kim.cs@company.com)
+인수자: 이영희 대리 (lee.yh@company.com)
+인수 예정일: 2025-02-15
+개발현황: 70% 진행 중 (메인 기능 개발 완료, 최적화 진행 중)
+주요 담당 업무: 백엔드 API 개발, 데이터베이스 설계, 보안 구현
+팀원: 박준호(프론트엔드), 최민수(QA)
+위험요소: 일정 지연 가능성 (2주)
+다음 마일스톤: 2025-02-01 알파 테스트"""
+
+
+def empty_handover() -> dict:
+    """모든 항목이 빈 HandoverData (섹션 생성 실패 시 기본값)"""
+    return {
+        "overview": {
+            "transferor": {"name": "", "position": "", "contact": ""},
+            "transferee": {"name": "", "position": "", "contact": ""}
+        },
+        "jobStatus": {"title": "", "responsibilities": []},
+        "priorities": [],
+        "stakeholders": {"manager": "", "internal": [], "external": []},
+        "teamMembers": [],
+        "ongoingProjects": [],
+        "risks": {"issues": "", "risks": ""},
+        "roadmap": {"shortTerm": "", "longTerm": ""},
+        "resources": {"docs": [], "systems": [], "contacts": []},
+        "checklist": []
+    }
+
+
+def retrieve_section_context(section: str, index_name: str = None) -> dict:
+    """섹션 관련 청크 검색 → build_context 결과"""
+    from app.services.search_service import search_documents
+
+    spec = HANDOVER_SECTIONS[section]
+    results = []
+    if spec["related"]:
+        results = search_documents(spec["query"], filters={"relatedSection": spec["related"]},
+                                   top_k=HANDOVER_SECTION_TOP_K, index_name=index_name)
+    if len(results) < HANDOVER_SECTION_TOP_K:
+        # relatedSection이 없는 기존 청크 / 매핑되지 않은 섹션(overview)은 필터 없이 보충
+        seen = {doc.get("id") for doc in results}
+        extra = search_documents(spec["query"], top_k=HANDOVER_SECTION_TOP_K, index_name=index_name)
+        results += [doc for doc in extra if doc.get("id") not in seen][:HANDOVER_SECTION_TOP_K - len(results)]
+    return build_context(results, max_tokens=HANDOVER_SECTION_MAX_TOKENS)
+
+
+def validate_key(key: str, value) -> str:
+    """
+    섹션 값 검증 (기본 HandoverData와 같은 형태인지)
+    Returns: 오류 메시지 (정상이면 None)
+    """
+    expected = empty_handover()[key]
+    if isinstance(expected, dict):
+        if not isinstance(value, dict):
+            return f"expected object, got {type(value).__name__}"
+        for field, default in expected.items():
+            if field in value and isinstance(default, (dict, list)) and not isinstance(value[field], type(default)):
+                return f"'{field}' expected {type(default).__name__}"
+    elif isinstance(expected, list):
+        if not isinstance(value, list):
+            return f"expected array, got {type(value).__name__}"
+        if any(not isinstance(item, dict) for item in value):
+            return "array items must be objects"
+    return None
+
+
+def _stream_keys(context: str, keys: list):
+    """GPT 응답을 스트리밍으로 받으며 완성된 최상위 멤버를 즉시 반환 (키, 값)"""
+    stream = client_registry.openai().chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": SECTION_SYSTEM_MESSAGE.format(schema=schema_for(keys))},
+            {"role": "user", "content": f"자료:\n{context}\n\n위의 JSON 형식을 반드시 따르세요."}
+        ],
+        temperature=0.7,
+        max_tokens=1500,
+        response_format={"type": "json_object"},
+        stream=True
+    )
+    parser = IncrementalJsonParser()
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield from parser.feed(delta)
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    for key, error in parser.errors.items():
+        yield key, ValueError(error)
+
+
+def generate_section(section: str, file_context: str = "", index_name: str = None, on_key=None) -> dict:
+    """
+    섹션 하나 생성 (검색 + GPT 스트리밍 호출)
+    키마다 응답이 완성되는 즉시 검증하여 on_key(섹션, 키, 값)로 전달하고,
+    누락되거나 검증에 실패한 키만 HANDOVER_SECTION_RETRIES번까지 다시 요청합니다.
+
+    Returns:
+        {"section": 이름, "data": {키: 값}, "sources": [...], "context_tokens": n, "seconds": s,
+         "retries": n, "error": 메시지 또는 None}
+    """
+    spec = HANDOVER_SECTIONS[section]
+    started = time.perf_counter()
+    data = {}
+    errors = {}
+    built = {"sources": [], "tokens": 0}
+    attempt = 0
+    try:
+        built = retrieve_section_context(section, index_name)
+        parts = []
+        if file_context:
+            parts.append(truncate_to_tokens(file_context, HANDOVER_FILE_CONTEXT_TOKENS))
+        if built["context"]:
+            parts.append(built["context"])
+        context = "\n\n---\n\n".join(parts) or SAMPLE_CONTEXT
+
+        pending = list(spec["keys"])
+        while True:
+            if attempt:
+                print(f"🔁 Re-requesting handover keys {pending} (section '{section}', retry {attempt})")
+            try:
+                for key, value in _stream_keys(context, pending):
+                    if key not in pending or key in data:
+                        continue
+                    error = str(value) if isinstance(value, Exception) else validate_key(key, value)
+                    if error:
+                        errors[key] = error
+                        continue
+                    data[key] = value
+                    if on_key:
+                        on_key(section, key, value)
+            except Exception as e:
+                print(f"⚠️ Handover section '{section}' request failed: {e}")
+                for key in pending:
+                    errors.setdefault(key, str(e))
+            pending = [key for key in spec["keys"] if key not in data]
+            for key in pending:
+                errors.setdefault(key, "missing from response")
+            if not pending or attempt >= HANDOVER_SECTION_RETRIES:
+                break
+            attempt += 1
+    except Exception as e:
+        print(f"⚠️ Handover section '{section}' failed: {e}")
+        traceback.print_exc()
+        for key in spec["keys"]:
+            errors.setdefault(key, str(e))
+
+    failed = [key for key in spec["keys"] if key not in data]
+    return {
+        "section": section,
+        "data": data,
+        "sources": built["sources"],
+        "context_tokens": built["tokens"],
+        "seconds": round(time.perf_counter() - started, 2),
+        "retries": attempt,
+        "error": "; ".join(f"{key}: {errors[key]}" for key in failed) or None
+    }
+
+
+def iter_handover_events(file_context: str = "", index_name: str = None, sections: list = None):
+    """
+    섹션들을 동시에 생성하며 이벤트를 발생 순서대로 반환
+      ("key", {"section", "key", "value"})  키 하나가 완성·검증됨
+      ("section", 섹션 결과)                 섹션 하나가 끝남 (실패 포함)
+    """
+    sections = sections or list(HANDOVER_SECTIONS)
+    events = queue.Queue()
+
+    def on_key(section, key, value):
+        events.put(("key", {"section": section, "key": key, "value": value}))
+
+    def run(section):
+        try:
+            events.put(("section", generate_section(section, file_context, index_name, on_key)))
+        except BaseException as e:
+            events.put(("section", {"section": section, "data": {}, "sources": [], "context_tokens": 0,
+                                    "seconds": 0, "retries": 0, "error": str(e)}))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(HANDOVER_CONCURRENCY, len(sections)))) as pool:
+        for section in sections:
+            pool.submit(run, section)
+        remaining = len(sections)
+        while remaining:
+            event = events.get()
+            if event[0] == "section":
+                remaining -= 1
+            yield event
+
+
+def merge_section(handover: dict, result: dict):
+    """섹션 결과를 HandoverData에 병합 (실패한 키는 기본값 유지)"""
+    handover.update(result["data"])
+    info = handover.setdefault("sectionInfo", {})
+    info[result["section"]] = {
+        "sources": result["sources"],
+        "context_tokens": result["context_tokens"],
+        "seconds": result["seconds"],
+        "retries": result["retries"],
+        "error": result["error"]
+    }
+    status = "❌" if result["error"] else "✅"
+    print(f"{status} Handover section '{result['section']}' ({result['seconds']}s, "
+          f"{result['context_tokens']} tokens, retries {result['retries']})")
+
+
+def generate_handover(file_context: str = "", index_name: str = None) -> dict:
+    """전체 섹션을 병렬 생성하여 HandoverData 하나로 병합"""
+    started = time.perf_counter()
+    handover = empty_handover()
+    for kind, payload in iter_handover_events(file_context, index_name):
+        if kind == "section":
+            merge_section(handover, payload)
+    failed = [name for name, info in handover["sectionInfo"].items() if info["error"]]
+    print(f"📋 인수인계서 생성 완료: {len(HANDOVER_SECTIONS) - len(failed)}/{len(HANDOVER_SECTIONS)} 섹션, "
+          f"{time.perf_counter() - started:.1f}s")
+    return handover
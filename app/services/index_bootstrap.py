@@ -0,0 +1,183 @@
+"""
+검색 인덱스 부트스트랩 (앱 시작 시 1회)
+- list_indexes 한 번으로 기존 인덱스 스키마를 모두 읽어 프로세스에 캐시
+- 알려진 인덱스(기본 인덱스 + SEARCH_KNOWN_INDEXES) 중 없는 것은 코드 스키마(index_schema)로 생성
+- 코드 스키마와 실제 인덱스의 차이(drift)를 감지하여 로그 / 상태 조회로 노출
+- 업로드/검색 경로에서는 ensure()가 캐시만 확인하므로 get_index 왕복이 없음
+  (시작 이후 처음 보는 인덱스만 한 번 조회/생성)
+"""
+
+import threading
+import time
+
+from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError
+
+from app.config import AZURE_SEARCH_INDEX_NAME, SEARCH_KNOWN_INDEXES
+from app.services.client_registry import client_registry
+from app.services.index_schema import build_search_index, build_index_fields
+
+# drift 비교 대상 필드 속성
+_COMPARED_ATTRIBUTES = ("type", "key", "searchable", "filterable", "sortable", "facetable", "vector_search_dimensions")
+
+
+def _field_signature(field) -> dict:
+    signature = {}
+    for attribute in _COMPARED_ATTRIBUTES:
+        value = getattr(field, attribute, None)
+        if attribute == "type":
+            value = str(value)
+        elif attribute != "vector_search_dimensions":
+            value = bool(value)
+        signature[attribute] = value
+    return signature
+
+
+def detect_drift(index) -> list:
+    """
+    코드 스키마와 실제 인덱스 비교
+    Returns: 차이 설명 리스트 (없으면 빈 리스트)
+    """
+    expected = {field.name: _field_signature(field) for field in build_index_fields()}
+    actual = {field.name: _field_signature(field) for field in (index.fields or [])}
+
+    drift = []
+    for name, signature in expected.items():
+        if name not in actual:
+            drift.append(f"missing field '{name}'")
+            continue
+        for attribute, value in signature.items():
+            if actual[name][attribute] != value:
+                drift.append(f"'{name}'.{attribute}: index={actual[name][attribute]} schema={value}")
+    for name in actual:
+        if name not in expected:
+            drift.append(f"extra field '{name}' (not in code schema)")
+    return drift
+
+
+class IndexRegistry:
+    """인덱스 이름 → 스키마 캐시 (프로세스당 하나)"""
+
+    def __init__(self):
+        self._indexes = {}  # 이름 -> SearchIndex
+        self._drift = {}  # 이름 -> 차이 리스트
+        self._lock = threading.Lock()
+        self.bootstrapped_at = None
+        self.listed_at = None
+        self.lookups = 0  # get_index / list_indexes 왕복 횟수
+        self.created = []
+
+    def bootstrap(self, known_indexes: list = None):
+        """
+        시작 시 호출: 기존 인덱스 스키마 캐시 + 없는 인덱스 생성 + drift 감지
+        Azure에 연결할 수 없어도 앱 시작은 막지 않음 (ensure()가 필요할 때 다시 시도)
+        """
+        known = known_indexes if known_indexes is not None else [AZURE_SEARCH_INDEX_NAME] + SEARCH_KNOWN_INDEXES
+        started = time.perf_counter()
+        try:
+            existing = list(client_registry.search_index().list_indexes())
+            self.lookups += 1
+        except Exception as e:
+            print(f"⚠️ Index bootstrap skipped (cannot list indexes): {e}")
+            return
+
+        with self._lock:
+            for index in existing:
+                self._remember(index)
+            self.listed_at = time.time()
+
+        for name in dict.fromkeys(known):
+            if name not in self._indexes:
+                try:
+                    self._create(name)
+                except Exception as e:
+                    print(f"⚠️ Failed to create index '{name}': {e}")
+
+        self.bootstrapped_at = time.time()
+        drifted = {name: drift for name, drift in self._drift.items() if drift}
+        print(f"🗂️ Index bootstrap: {len(self._indexes)} indexes cached, "
+              f"{len(self.created)} created, {len(drifted)} drifted ({(time.perf_counter() - started) * 1000:.0f}ms)")
+        for name, drift in drifted.items():
+            print(f"⚠️ Index '{name}' differs from code schema: {'; '.join(drift[:5])}"
+                  + (f" (+{len(drift) - 5} more)" if len(drift) > 5 else ""))
+
+    def _remember(self, index):
+        self._indexes[index.name] = index
+        self._drift[index.name] = detect_drift(index)
+
+    def _create(self, name: str):
+        print(f"📁 Creating search index '{name}' from code schema")
+        try:
+            index = client_registry.search_index().create_index(build_search_index(name))
+            self.created.append(name)
+        except ResourceExistsError:
+            # 다른 워커가 먼저 생성함
+            index = client_registry.search_index().get_index(name)
+            self.lookups += 1
+        with self._lock:
+            self._remember(index)
+        return index
+
+    def ensure(self, name: str = None):
+        """
+        인덱스가 있음을 보장 (캐시에 있으면 왕복 없음)
+        Returns: SearchIndex
+        """
+        name = name or AZURE_SEARCH_INDEX_NAME
+        index = self._indexes.get(name)
+        if index is not None:
+            return index
+        try:
+            index = client_registry.search_index().get_index(name)
+            self.lookups += 1
+        except ResourceNotFoundError:
+            self.lookups += 1
+            return self._create(name)
+        with self._lock:
+            self._remember(index)
+        return index
+
+    def invalidate(self, name: str):
+        """인덱스가 외부에서 삭제된 경우 등, 다음 ensure()에서 다시 확인하도록 캐시 제거"""
+        with self._lock:
+            self._indexes.pop(name, None)
+            self._drift.pop(name, None)
+
+    def recreate(self, name: str):
+        """업로드 중 인덱스가 없다고 응답받은 경우: 캐시를 버리고 코드 스키마로 생성"""
+        self.invalidate(name)
+        return self.ensure(name)
+
+    def refresh(self):
+        """인덱스 목록/스키마를 다시 읽어 캐시 교체 (외부에서 생성/삭제된 인덱스 반영)"""
+        existing = list(client_registry.search_index().list_indexes())
+        with self._lock:
+            self.lookups += 1
+            self._indexes = {}
+            self._drift = {}
+            for index in existing:
+                self._remember(index)
+            self.listed_at = time.time()
+
+    def list(self) -> list:
+        """캐시된 인덱스 목록 (한 번도 목록을 읽지 않았으면 이때 읽음)"""
+        if self.listed_at is None:
+            self.refresh()
+        with self._lock:
+            return [
+                {"name": index.name, "fields_count": len(index.fields) if index.fields else 0}
+                for index in self._indexes.values()
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "bootstrapped_at": self.bootstrapped_at,
+                "indexes": sorted(self._indexes),
+                "created": list(self.created),
+                "drift": {name: drift for name, drift in self._drift.items() if drift},
+                "lookups": self.lookups
+            }
+
+
+# 전역 인스턴스
+index_registry = IndexRegistry()
@@ -0,0 +1,109 @@
+"""
+AI Search 인덱스 스키마 (코드 기준 정의)
+- create_index_if_not_exists / 인덱스 부트스트랩에서 인덱스 생성에 사용
+- 필터 컴파일러(search_filters)가 필드 검증에 사용
+"""
+
+from azure.search.documents.indexes.models import (
+    SearchIndex,
+    SimpleField,
+    SearchableField,
+    SearchFieldDataType,
+    VectorSearch,
+    HnswAlgorithmConfiguration,
+    VectorSearchProfile,
+    SearchField,
+    SemanticConfiguration,
+    SemanticPrioritizedFields,
+    SemanticField,
+    SemanticSearch
+)
+
+VECTOR_DIMENSIONS = 3072
+SEMANTIC_CONFIGURATION_NAME = "my-semantic-config"
+
+
+def build_index_fields() -> list:
+    """인덱스 필드 정의"""
+    return [
+        # 1. Core Vector & Content (RAG Performance)
+        SearchField(
+            name="content_vector",
+            type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+            searchable=True,
+            vector_search_dimensions=VECTOR_DIMENSIONS,
+            vector_search_profile_name="my-vector-profile"
+        ),
+        SearchableField(name="content", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
+        SearchableField(name="parentSummary", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
+        SearchableField(name="chunkSummary", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
+        SearchableField(name="codeExplanation", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
+        SearchableField(name="designIntent", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
+        SearchableField(name="handoverNotes", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
+        SearchField(name="codeComments", type=SearchFieldDataType.Collection(SearchFieldDataType.String), searchable=True, analyzer_name="ko.lucene"),
+
+        # 2. Filtering & Metadata
+        SimpleField(name="processedDate", type=SearchFieldDataType.DateTimeOffset, sortable=True, filterable=True),
+        SearchableField(name="paraCategory", type=SearchFieldDataType.String, filterable=True, facetable=True),
+        SearchableField(name="fileType", type=SearchFieldDataType.String, filterable=True, facetable=True),
+        SearchableField(name="language", type=SearchFieldDataType.String, filterable=True, facetable=True),
+        SearchableField(name="framework", type=SearchFieldDataType.String, filterable=True, facetable=True),
+        SearchableField(name="serviceDomain", type=SearchFieldDataType.String, filterable=True, facetable=True),
+        SimpleField(name="isArchived", type=SearchFieldDataType.Boolean, filterable=True, facetable=True),
+        SearchField(name="tags", type=SearchFieldDataType.Collection(SearchFieldDataType.String), searchable=True, filterable=True, facetable=True, analyzer_name="standard.lucene"),
+        SearchField(name="relatedSection", type=SearchFieldDataType.Collection(SearchFieldDataType.String), searchable=True, filterable=True, analyzer_name="standard.lucene"),
+
+        # 3. Identifiers & Location
+        SimpleField(name="id", type=SearchFieldDataType.String, key=True, filterable=True, sortable=True),  # sortable: id 순 커서 페이지네이션
+        SimpleField(name="parentId", type=SearchFieldDataType.String, filterable=True),
+        SearchableField(name="fileName", type=SearchFieldDataType.String, filterable=True, analyzer_name="standard.lucene"),
+        SearchableField(name="filePath", type=SearchFieldDataType.String, filterable=True, analyzer_name="standard.lucene"),
+        SimpleField(name="url", type=SearchFieldDataType.String),
+
+        # 4. Payload (LLM Reference - Not Searchable)
+        SimpleField(name="chunkMeta", type=SearchFieldDataType.String), # JSON string
+        SimpleField(name="codeMetadata", type=SearchFieldDataType.String),
+        SimpleField(name="involvedPeople", type=SearchFieldDataType.String),
+        SimpleField(name="rawCode", type=SearchFieldDataType.String), # Not searchable
+        SearchField(name="relatedFiles", type=SearchFieldDataType.Collection(SearchFieldDataType.String), searchable=False),
+    ]
+
+
+def build_search_index(name: str) -> SearchIndex:
+    """필드 + 시맨틱 설정 + 벡터 검색 설정을 포함한 인덱스 정의"""
+    # Define semantic search configuration
+    semantic_config = SemanticConfiguration(
+        name=SEMANTIC_CONFIGURATION_NAME,
+        prioritized_fields=SemanticPrioritizedFields(
+            title_field=SemanticField(field_name="fileName"),
+            content_fields=[
+                SemanticField(field_name="content"),
+                SemanticField(field_name="parentSummary")
+            ],
+            keywords_fields=[
+                SemanticField(field_name="tags"),
+                SemanticField(field_name="paraCategory")
+            ]
+        )
+    )
+
+    vector_search = VectorSearch(
+        algorithms=[
+            HnswAlgorithmConfiguration(name="my-hnsw")
+        ],
+        profiles=[
+            VectorSearchProfile(
+                name="my-vector-profile",
+                algorithm_configuration_name="my-hnsw"
+            )
+        ]
+    )
+
+    semantic_search = SemanticSearch(configurations=[semantic_config])
+    
+    return SearchIndex(name=name, fields=build_index_fields(), vector_search=vector_search, semantic_search=semantic_search)
+
+
+def filterable_fields() -> dict:
+    """필터 가능한 필드 이름 → 데이터 타입 (예: "Edm.String", "Collection(Edm.String)")"""
+    return {field.name: str(field.type) for field in build_index_fields() if field.filterable}
@@ -0,0 +1,235 @@
+"""
+인덱스 통계 (문서 수 / 파일별 청크 수 / facet 분포)
+- 메모리에 유지하고 조회는 메모리에서만 응답 (인덱스당 첫 조회만 서비스에서 계산)
+- index_processed_chunks가 쓸 때 바로 반영 (파일 단위로 교체하므로 재업로드해도 중복 집계 없음)
+- 백그라운드 스레드가 INDEX_STATS_REFRESH_SECONDS마다 서비스 기준으로 다시 계산
+  (다른 워커/외부에서 바뀐 내용, 업로드 일부 실패 등으로 어긋난 값을 바로잡음)
+"""
+
+import threading
+import time
+
+from app.config import INDEX_STATS_REFRESH_SECONDS, SEARCH_BACKEND
+
+FACET_FIELDS = ("fileType", "language", "serviceDomain")
+STATS_FIELDS = ["id", "fileName"] + list(FACET_FIELDS)
+
+
+def _file_entry(chunks: list) -> dict:
+    """청크 목록 → 파일 하나의 통계 {"chunks": n, "facets": {필드: {값: n}}}"""
+    facets = {field: {} for field in FACET_FIELDS}
+    for chunk in chunks:
+        for field in FACET_FIELDS:
+            value = chunk.get(field)
+            if value:
+                value = str(value)
+                facets[field][value] = facets[field].get(value, 0) + 1
+    return {"chunks": len(chunks), "facets": facets}
+
+
+class _IndexStats:
+    """인덱스 하나의 통계. 합계(documents/facets)는 파일 단위 변경 시 차감/가산으로 유지"""
+
+    def __init__(self):
+        self.files = {}
+        self.documents = 0
+        self.facets = {field: {} for field in FACET_FIELDS}
+        self.refreshed_at = None
+        self.updated_at = None
+        self.stale = False
+
+    def _apply(self, entry: dict, sign: int):
+        self.documents += sign * entry["chunks"]
+        for field, values in entry["facets"].items():
+            totals = self.facets[field]
+            for value, count in values.items():
+                totals[value] = totals.get(value, 0) + sign * count
+                if totals[value] <= 0:
+                    del totals[value]
+
+    def set_file(self, file_name: str, entry: dict):
+        old = self.files.pop(file_name, None)
+        if old:
+            self._apply(old, -1)
+        if entry["chunks"]:
+            self.files[file_name] = entry
+            self._apply(entry, +1)
+
+    def add_to_file(self, file_name: str, entry: dict):
+        old = self.files.get(file_name)
+        if old:
+            merged = {"chunks": old["chunks"] + entry["chunks"], "facets": {}}
+            for field in FACET_FIELDS:
+                values = dict(old["facets"][field])
+                for value, count in entry["facets"][field].items():
+                    values[value] = values.get(value, 0) + count
+                merged["facets"][field] = values
+            entry = merged
+        self.set_file(file_name, entry)
+
+    def snapshot(self, include_files: bool) -> dict:
+        result = {
+            "documents": self.documents,
+            "files": len(self.files),
+            "facets": {field: dict(sorted(values.items(), key=lambda kv: -kv[1])) for field, values in self.facets.items()},
+            "refreshed_at": self.refreshed_at,
+            "updated_at": self.updated_at,
+            "stale": self.stale
+        }
+        if include_files:
+            result["file_chunks"] = {name: entry["chunks"] for name, entry in sorted(self.files.items())}
+        return result
+
+
+class IndexStatsCache:
+    def __init__(self, refresh_interval: float = INDEX_STATS_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._refresh_locks = {}
+        # 갱신(전체 순회) 중인 인덱스 → 그동안 쓰기 경로에서 들어온 변경 [(apply, 멱등 여부)]
+        # 순회가 끝나고 새 통계로 교체할 때 다시 적용 (순회 중 변경이 사라지지 않도록)
+        self._refresh_journals = {}
+        self._stop = threading.Event()
+        self._refresher = None
+
+    # ----- 조회 -----
+
+    def peek(self, index_name: str, include_files: bool = False):
+        """메모리에 있으면 통계, 없으면 None (서비스 호출 없음)"""
+        with self._lock:
+            stats = self._stats.get(index_name)
+            return self._snapshot(index_name, stats, include_files) if stats is not None else None
+
+    def get(self, index_name: str, include_files: bool = False) -> dict:
+        """메모리의 통계 반환. 처음 보는 인덱스만 서비스에서 한 번 계산"""
+        with self._lock:
+            stats = self._stats.get(index_name)
+            if stats is not None:
+                return self._snapshot(index_name, stats, include_files)
+        self.refresh(index_name)
+        with self._lock:
+            stats = self._stats.get(index_name)
+        if stats is None:
+            raise RuntimeError(f"Index stats for '{index_name}' are not available yet")
+        return self._snapshot(index_name, stats, include_files)
+
+    @staticmethod
+    def _snapshot(index_name: str, stats: _IndexStats, include_files: bool) -> dict:
+        return {"index_name": index_name, **stats.snapshot(include_files)}
+
+    # ----- 쓰기 경로에서 바로 반영 -----
+
+    def record_file(self, index_name: str, file_name: str, chunks: list):
+        """파일의 전체 청크 목록으로 그 파일의 통계를 교체 (증분 재인덱싱 후 호출)"""
+        entry = _file_entry(chunks)
+        self._update(index_name, lambda stats: stats.set_file(file_name, entry))
+
+    def record_added(self, index_name: str, documents: list):
+        """파일 교체 없이 추가된 문서 반영"""
+        by_file = {}
+        for document in documents:
+            by_file.setdefault(document.get("fileName") or "Unknown", []).append(document)
+
+        entries = {file_name: _file_entry(file_docs) for file_name, file_docs in by_file.items()}
+
+        def apply(stats):
+            for file_name, entry in entries.items():
+                stats.add_to_file(file_name, entry)
+        # 추가분은 다시 적용하면 순회 결과와 중복될 수 있으므로 멱등이 아님
+        self._update(index_name, apply, idempotent=False)
+
+    def mark_stale(self, index_name: str):
+        """정확한 반영이 불가능한 변경 (업로드 일부 실패, id만 아는 삭제): 다음 갱신 주기에 다시 계산"""
+        with self._lock:
+            stats = self._stats.get(index_name)
+            if stats is not None:
+                stats.stale = True
+
+    def _update(self, index_name: str, apply, idempotent: bool = True):
+        with self._lock:
+            journal = self._refresh_journals.get(index_name)
+            if journal is not None:
+                journal.append((apply, idempotent))
+            stats = self._stats.get(index_name)
+            if stats is None:
+                # 아직 조회된 적 없는 인덱스: 첫 조회 때 서비스에서 계산하므로 여기서는 생략
+                return
+            apply(stats)
+            stats.updated_at = time.time()
+
+    # ----- 서비스 기준 재계산 -----
+
+    def refresh(self, index_name: str):
+        """인덱스 전체를 필요한 필드만 순회하여 다시 계산 (같은 인덱스의 동시 갱신은 하나로 합침)"""
+        from app.services.search_service import iter_documents
+
+        with self._lock:
+            refresh_lock = self._refresh_locks.setdefault(index_name, threading.Lock())
+        if not refresh_lock.acquire(blocking=False):
+            # 이미 다른 스레드가 계산 중: 끝날 때까지 기다린 뒤 그 결과 사용
+            with refresh_lock:
+                return
+        with self._lock:
+            self._refresh_journals[index_name] = []
+        try:
+            started = time.perf_counter()
+            by_file = {}
+            for document in iter_documents(index_name, fields=STATS_FIELDS):
+                by_file.setdefault(document.get("fileName") or "Unknown", []).append(
+                    {field: document.get(field) for field in FACET_FIELDS}
+                )
+            stats = _IndexStats()
+            for file_name, chunks in by_file.items():
+                stats.set_file(file_name, _file_entry(chunks))
+            stats.refreshed_at = stats.updated_at = time.time()
+            with self._lock:
+                # 순회 중 쓰기 경로에서 반영된 변경을 새 통계에 다시 적용한 뒤 교체
+                # (파일 교체는 멱등이라 정확, 추가분은 중복 가능성이 있어 다음 주기에 다시 계산)
+                journal = self._refresh_journals.pop(index_name, [])
+                for apply, idempotent in journal:
+                    apply(stats)
+                    if not idempotent:
+                        stats.stale = True
+                self._stats[index_name] = stats
+            print(f"📊 Index stats refreshed for '{index_name}': {stats.documents} documents, "
+                  f"{len(stats.files)} files ({(time.perf_counter() - started) * 1000:.0f}ms"
+                  f"{f', {len(journal)} concurrent updates reapplied' if journal else ''})")
+        finally:
+            with self._lock:
+                self._refresh_journals.pop(index_name, None)
+            refresh_lock.release()
+
+    def start(self):
+        """백그라운드 갱신 스레드 시작 (조회된 적 있는 인덱스만 갱신)"""
+        if self._refresher is not None or self.refresh_interval <= 0:
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="index-stats-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+        self._refresher = None
+
+    def _refresh_loop(self):
+        from app.services.index_bootstrap import index_registry
+
+        while not self._stop.wait(self.refresh_interval):
+            # 인덱스 목록(/api/upload/indexes)도 같은 주기로 갱신
+            if SEARCH_BACKEND != "local":
+                try:
+                    index_registry.refresh()
+                except Exception as e:
+                    print(f"⚠️ Index list refresh failed: {e}")
+            with self._lock:
+                index_names = list(self._stats)
+            for index_name in index_names:
+                try:
+                    self.refresh(index_name)
+                except Exception as e:
+                    print(f"⚠️ Index stats refresh failed for '{index_name}': {e}")
+
+
+# 전역 인스턴스
+index_stats = IndexStatsCache()
@@ -0,0 +1,204 @@
+"""
+업로드 처리(Ingest) 전용 워커 풀
+- API 이벤트 루프와 분리된 스레드에서 파일 처리 파이프라인 실행
+- 대기열 길이 제한 (가득 차면 QueueFullError → 라우터에서 HTTP 429)
+- 단계별 동시 실행 상한 (blob / extract / llm / index)
+- 종료 시 대기열을 처리할 때까지 기다리는 graceful drain
+"""
+
+from contextlib import contextmanager
+import queue
+import threading
+import time
+import traceback
+
+from app.config import INGEST_WORKERS, INGEST_QUEUE_MAX, INGEST_STAGE_LIMITS
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차서 작업을 받을 수 없음"""
+
+    def __init__(self, depth: int, capacity: int):
+        self.depth = depth
+        self.capacity = capacity
+        super().__init__(f"Ingest queue is full ({depth}/{capacity})")
+
+
+class QueueClosedError(Exception):
+    """종료(drain) 중이라 새 작업을 받지 않음"""
+
+
+def parse_stage_limits(value: str) -> dict:
+    """'blob=4,llm=2' 형식의 설정 문자열을 dict로 변환"""
+    limits = {}
+    for part in value.split(","):
+        if "=" not in part:
+            continue
+        name, limit = part.split("=", 1)
+        if name.strip() and limit.strip().isdigit():
+            limits[name.strip()] = max(1, int(limit.strip()))
+    return limits
+
+
+class IngestQueue:
+    def __init__(self, workers: int = INGEST_WORKERS, max_queue: int = INGEST_QUEUE_MAX, stage_limits: dict = None):
+        self.workers = max(1, workers)
+        self.capacity = max(1, max_queue)
+        self.stage_limits = stage_limits if stage_limits is not None else parse_stage_limits(INGEST_STAGE_LIMITS)
+        self._queue = queue.Queue(maxsize=self.capacity)
+        self._stages = {name: threading.BoundedSemaphore(limit) for name, limit in self.stage_limits.items()}
+        self._stage_active = {name: 0 for name in self.stage_limits}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._accepting = True
+        self._active_jobs = 0
+        self._completed = 0
+        self._failed = 0
+
+    # ----- 워커 관리 -----
+
+    def start(self):
+        """워커 스레드 시작 (이미 시작했으면 무시)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._accepting = True
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"ingest-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        print(f"🏭 Ingest workers started: {self.workers} workers, queue capacity {self.capacity}, stage limits {self.stage_limits}")
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                # 종료 신호
+                self._queue.task_done()
+                return
+
+            job_id, func, args, kwargs = job
+            with self._lock:
+                self._active_jobs += 1
+            try:
+                func(*args, **kwargs)
+                with self._lock:
+                    self._completed += 1
+            except Exception as e:
+                print(f"❌ Ingest job {job_id} crashed: {e}")
+                traceback.print_exc()
+                with self._lock:
+                    self._failed += 1
+            finally:
+                with self._lock:
+                    self._active_jobs -= 1
+                self._queue.task_done()
+
+    # ----- 작업 등록 -----
+
+    def submit(self, job_id: str, func, *args, **kwargs) -> int:
+        """
+        작업을 대기열에 넣고 대기 순번(현재 대기열 길이)을 반환합니다.
+        대기열이 가득 차면 QueueFullError, 종료 중이면 QueueClosedError.
+        """
+        if not self._accepting:
+            raise QueueClosedError("Ingest queue is draining")
+        if not self._threads:
+            self.start()
+        try:
+            self._queue.put_nowait((job_id, func, args, kwargs))
+        except queue.Full:
+            raise QueueFullError(self._queue.qsize(), self.capacity)
+        return self._queue.qsize()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        단계별 동시 실행 상한 적용
+
+        사용법:
+            with ingest_queue.stage("llm"):
+                chunks = analyze_text_for_search(...)
+        """
+        semaphore = self._stages.get(name)
+        if semaphore is None:
+            yield
+            return
+        semaphore.acquire()
+        with self._lock:
+            self._stage_active[name] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._stage_active[name] -= 1
+            semaphore.release()
+
+    # ----- 상태 / 종료 -----
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "accepting": self._accepting,
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.capacity,
+                "active_jobs": self._active_jobs,
+                "completed": self._completed,
+                "failed": self._failed,
+                "stages": {
+                    name: {"active": self._stage_active[name], "limit": limit}
+                    for name, limit in self.stage_limits.items()
+                }
+            }
+
+    def drain(self, timeout: float) -> list:
+        """
+        새 작업 접수를 멈추고, 대기열과 진행 중인 작업이 끝날 때까지 최대 timeout초 기다립니다.
+        시간 안에 시작하지 못한 작업은 대기열에서 제거하고 그 job_id 리스트를 반환합니다.
+        """
+        self._accepting = False
+        print(f"🏭 Draining ingest queue ({self._queue.qsize()} queued, {self._active_jobs} active)...")
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            # unfinished_tasks: 대기 중 + 처리 중인 작업 수 (task_done 호출 전까지 유지)
+            with self._queue.mutex:
+                idle = self._queue.unfinished_tasks == 0
+            if idle:
+                break
+            time.sleep(0.2)
+
+        # 시간 초과: 아직 시작하지 않은 작업은 포기
+        abandoned = []
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                abandoned.append(job[0])
+            self._queue.task_done()
+
+        # 워커 종료 신호 (진행 중인 작업은 끝난 뒤 종료됨)
+        for _ in self._threads:
+            try:
+                self._queue.put(None, timeout=max(0.1, deadline - time.time()))
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.time()))
+        self._threads = []
+
+        if abandoned:
+            print(f"⚠️ Ingest drain timed out, {len(abandoned)} queued jobs abandoned.")
+        else:
+            print("🏭 Ingest queue drained.")
+        return abandoned
+
+
+# 전역 인스턴스
+ingest_queue = IngestQueue()
@@ -0,0 +1,121 @@
+"""
+점진적 JSON 파서
+모델 출력이 조각으로 들어오는 동안 최상위 객체의 멤버("key": value)를 값이 닫히는 즉시 반환합니다.
+- 첫 '{' 이전의 텍스트(코드 펜스, 설명 문장)는 무시
+- 끝까지 오지 않은(잘린) 마지막 멤버는 반환하지 않음
+- 값이 JSON으로 읽히지 않는 멤버는 건너뛰고 errors에 기록
+"""
+
+import json
+
+
+class IncrementalJsonParser:
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._state = "start"  # start | key | key_string | colon | value | after_value | done
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.errors = {}
+
+    @property
+    def complete(self) -> bool:
+        """최상위 객체가 닫혔는지"""
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> list:
+        """
+        텍스트 조각 추가
+        Returns: 이번 조각으로 완성된 [(키, 값), ...]
+        """
+        self._text += chunk or ""
+        text = self._text
+        members = []
+        while self._pos < len(text) and self._state != "done":
+            ch = text[self._pos]
+            state = self._state
+
+            if state == "start":
+                if ch == "{":
+                    self._state = "key"
+            elif state == "key":
+                if ch == '"':
+                    self._key_start = self._pos
+                    self._state = "key_string"
+                elif ch == "}":
+                    self._state = "done"
+            elif state == "key_string":
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._key = json.loads(text[self._key_start:self._pos + 1])
+                    self._state = "colon"
+            elif state == "colon":
+                if ch == ":":
+                    self._state = "value"
+                    self._value_start = None
+            elif state == "value":
+                end = self._scan_value(ch)
+                if end is not None:
+                    self._emit(text[self._value_start:end], members)
+            elif state == "after_value":
+                if ch == ",":
+                    self._state = "key"
+                elif ch == "}":
+                    self._state = "done"
+            self._pos += 1
+        return members
+
+    def _scan_value(self, ch: str):
+        """값 안의 문자 하나 처리. 값이 끝났으면 값의 끝 위치(배타적) 반환"""
+        if self._value_start is None:
+            if ch.isspace():
+                return None
+            self._value_start = self._pos
+            self._depth = 0
+            self._in_string = False
+            self._escape = False
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if self._depth == 0:
+                    self._state = "after_value"
+                    return self._pos + 1
+            return None
+
+        if ch == '"':
+            self._in_string = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            if self._depth == 0:
+                # 숫자/true/false/null 뒤에 바로 최상위 객체가 닫힘
+                self._state = "done"
+                return self._pos
+            self._depth -= 1
+            if self._depth == 0:
+                self._state = "after_value"
+                return self._pos + 1
+        elif ch == "," and self._depth == 0:
+            self._state = "key"
+            return self._pos
+        return None
+
+    def _emit(self, raw: str, members: list):
+        try:
+            members.append((self._key, json.loads(raw)))
+        except json.JSONDecodeError as e:
+            self.errors[self._key] = f"invalid JSON value: {e}"
+        self._key = None
+        self._value_start = None
@@ -0,0 +1,531 @@
+"""
+로컬 검색 엔진 (Azure AI Search 대체 / 오프라인 / 핫 레플리카용)
+- 벡터: 정규화된 float32 행렬을 파일에 추가 기록하고 memory-map으로 읽음 (코사인 = 내적)
+- ANN: 행 수가 LOCAL_IVF_MIN_ROWS 이상이면 IVF(k-means 클러스터) 인덱스를 만들어 nprobe개 클러스터만 탐색
+       IVF 생성 이후 추가된 행은 전수 비교하다가, 일정 비율을 넘으면 IVF 재생성
+- 키워드: SQLite FTS5 (bm25) — index_schema의 검색 필드와 같은 필드
+- 하이브리드: 벡터 순위와 BM25 순위를 RRF(Reciprocal Rank Fusion)로 결합
+
+디렉터리 구조 (LOCAL_INDEX_DIR/<인덱스 이름>/):
+    docs.db        문서(JSON), FTS5 키워드 인덱스, 메타데이터
+    vectors.f32    행 번호 순서의 벡터 (N x dim)
+    ivf/           centroids.npy, order.npy, offsets.npy, vectors.npy (클러스터 순서로 재배열한 벡터)
+
+쓰기는 한 프로세스(Ingest 워커)에서 하는 것을 전제로 하며,
+다른 프로세스는 검색 시 generation 값이 바뀌었으면 파일을 다시 엽니다.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from app.config import LOCAL_INDEX_DIR, LOCAL_IVF_MIN_ROWS, LOCAL_IVF_NPROBE, LOCAL_IVF_REBUILD_RATIO
+
+# BM25 대상 필드 (index_schema의 SearchableField와 동일)
+KEYWORD_FIELDS = [
+    "content", "parentSummary", "chunkSummary", "codeExplanation", "designIntent",
+    "handoverNotes", "codeComments", "fileName", "filePath", "paraCategory", "tags", "relatedSection"
+]
+
+RRF_K = 60
+
+# 질문 토큰 끝의 조사 제거 (FTS5 unicode61 토크나이저는 형태소 분석을 하지 않음)
+KOREAN_PARTICLES = re.compile(r"(은|는|이|가|을|를|의|에|에서|에게|으로|로|와|과|도|만|이나|나|랑|이랑|께서|한테)$")
+
+_BATCH_ROWS = 65536
+
+
+def _keyword_query(query: str) -> str:
+    """질문을 FTS5 MATCH 식으로 변환 (토큰별 접두어 검색을 OR로 결합)"""
+    terms = []
+    for token in re.findall(r"\w+", query.lower()):
+        stem = KOREAN_PARTICLES.sub("", token) if len(token) > 2 else token
+        if stem and stem not in terms:
+            terms.append(stem)
+    return " OR ".join(f'"{term}"*' for term in terms)
+
+
+def _as_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+class _Snapshot:
+    """
+    한 generation의 읽기 전용 상태 (벡터 mmap, 행 수, 살아있는 행, IVF)
+    _reload가 새 객체를 다 만든 뒤 한 번에 교체하므로, 검색 중에 reload가 일어나도
+    한 번 읽어 둔 snapshot 안에서는 행 수와 배열 크기가 항상 일치함
+    """
+
+    def __init__(self, dim=None, vectors=None, rows: int = 0, alive=None, ivf: dict = None):
+        self.dim = dim
+        self.vectors = vectors
+        self.rows = rows
+        self.alive = alive if alive is not None else np.ones(0, dtype=bool)
+        self.ivf = ivf
+
+
+class LocalIndex:
+    def __init__(self, name: str, root_dir: str = LOCAL_INDEX_DIR):
+        self.name = name
+        self.path = os.path.join(root_dir, name)
+        os.makedirs(os.path.join(self.path, "ivf"), exist_ok=True)
+        self._db_path = os.path.join(self.path, "docs.db")
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded_generation = None
+        self._snapshot = _Snapshot()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs (row INTEGER PRIMARY KEY, id TEXT UNIQUE, data TEXT NOT NULL, deleted INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_deleted ON docs(deleted)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5({', '.join(KEYWORD_FIELDS)}, tokenize='unicode61')")
+        self._reload()
+
+    # ----- 저장소 -----
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _meta(self, key: str, default=None):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    @staticmethod
+    def _set_meta(conn, key: str, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _reload(self):
+        """파일 상태를 다시 읽음 (memory-map 재생성). generation이 같으면 생략"""
+        generation = self._meta("generation", 0)
+        if generation == self._loaded_generation:
+            return
+        with self._load_lock:
+            if generation == self._loaded_generation:
+                return
+            dim = self._meta("dim")
+            rows = os.path.getsize(self._vectors_path) // (4 * dim) if dim and os.path.exists(self._vectors_path) else 0
+            vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, dim)) if rows else None
+
+            alive = np.ones(rows, dtype=bool)
+            deleted = [r for (r,) in self._connect().execute("SELECT row FROM docs WHERE deleted = 1 AND row < ?", (rows,))]
+            alive[deleted] = False
+
+            ivf = None
+            ivf_rows = self._meta("ivf_rows", 0)
+            if ivf_rows:
+                ivf = self._load_ivf(ivf_rows, rows)
+
+            # 다 만든 뒤 한 번에 교체 (검색 메서드는 self._snapshot을 한 번만 읽음)
+            self._snapshot = _Snapshot(dim, vectors, rows, alive, ivf)
+            self._loaded_generation = generation
+
+    def _load_ivf(self, ivf_rows: int, rows: int):
+        """
+        IVF 파일 로드. 파일 교체 도중(다른 프로세스가 build_ivf 중)에 읽어서 서로 맞지 않으면
+        None을 반환하고 이번 generation은 전수 비교로 검색
+        """
+        ivf_dir = os.path.join(self.path, "ivf")
+        try:
+            ivf = {
+                "rows": ivf_rows,
+                "centroids": np.load(os.path.join(ivf_dir, "centroids.npy")),
+                "order": np.load(os.path.join(ivf_dir, "order.npy"), mmap_mode="r"),
+                "offsets": np.load(os.path.join(ivf_dir, "offsets.npy")),
+                "vectors": np.load(os.path.join(ivf_dir, "vectors.npy"), mmap_mode="r"),
+            }
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Local IVF load failed for '{self.name}', using brute force: {e}")
+            return None
+        order_len = len(ivf["order"])
+        if (ivf_rows > rows or len(ivf["offsets"]) != len(ivf["centroids"]) + 1
+                or int(ivf["offsets"][-1]) != order_len or len(ivf["vectors"]) != order_len):
+            print(f"⚠️ Local IVF files for '{self.name}' are inconsistent, using brute force")
+            return None
+        return ivf
+
+    def _bump_generation(self, conn):
+        self._set_meta(conn, "generation", (self._meta("generation", 0) or 0) + 1)
+
+    # ----- 쓰기 -----
+
+    def upsert(self, documents: list, vector_field: str = "content_vector") -> int:
+        """문서 추가/교체 (같은 id가 있으면 기존 행은 삭제 표시 후 새 행 추가)"""
+        # 같은 배치 안의 중복 id는 마지막 것만 사용
+        documents = list({d["id"]: d for d in documents if d.get("id") and d.get(vector_field)}.values())
+        if not documents:
+            return 0
+
+        vectors = np.asarray([d[vector_field] for d in documents], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                if self._meta("dim") is None:
+                    self._set_meta(conn, "dim", int(vectors.shape[1]))
+                elif self._meta("dim") != vectors.shape[1]:
+                    raise ValueError(f"Vector dimension mismatch: index={self._meta('dim')}, documents={vectors.shape[1]}")
+
+                ids = [d["id"] for d in documents]
+                self._tombstone(conn, ids)
+
+                start_row = self._vector_rows_on_disk(int(vectors.shape[1]))
+                with open(self._vectors_path, "ab") as f:
+                    f.write(vectors.tobytes())
+
+                for offset, document in enumerate(documents):
+                    row = start_row + offset
+                    payload = {k: v for k, v in document.items() if k != vector_field}
+                    conn.execute("INSERT INTO docs (row, id, data) VALUES (?, ?, ?)",
+                                 (row, document["id"], json.dumps(payload, ensure_ascii=False)))
+                    conn.execute(
+                        f"INSERT INTO fts (rowid, {', '.join(KEYWORD_FIELDS)}) VALUES (?, {', '.join('?' * len(KEYWORD_FIELDS))})",
+                        [row] + [_as_text(document.get(field)) for field in KEYWORD_FIELDS]
+                    )
+                self._bump_generation(conn)
+
+        self._reload()
+        self._maybe_rebuild_ivf()
+        return len(documents)
+
+    def merge(self, documents: list) -> int:
+        """
+        기존 문서의 일부 필드만 갱신 (Azure Search의 merge 동작, 벡터는 그대로)
+        없는 id는 건너뜀. Returns: 갱신한 문서 수
+        """
+        documents = [d for d in documents if d.get("id")]
+        if not documents:
+            return 0
+
+        merged = 0
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                for document in documents:
+                    found = conn.execute("SELECT row, data FROM docs WHERE id = ? AND deleted = 0", (document["id"],)).fetchone()
+                    if found is None:
+                        continue
+                    row, data = found
+                    payload = json.loads(data)
+                    payload.update({k: v for k, v in document.items() if k != "id"})
+                    conn.execute("UPDATE docs SET data = ? WHERE row = ?", (json.dumps(payload, ensure_ascii=False), row))
+                    # 키워드 대상 필드(parentSummary 등)가 바뀌었을 수 있으므로 FTS 행도 다시 기록
+                    conn.execute("DELETE FROM fts WHERE rowid = ?", (row,))
+                    conn.execute(
+                        f"INSERT INTO fts (rowid, {', '.join(KEYWORD_FIELDS)}) VALUES (?, {', '.join('?' * len(KEYWORD_FIELDS))})",
+                        [row] + [_as_text(payload.get(field)) for field in KEYWORD_FIELDS]
+                    )
+                    merged += 1
+                self._bump_generation(conn)
+
+        self._reload()
+        return merged
+
+    def _vector_rows_on_disk(self, dim: int) -> int:
+        return os.path.getsize(self._vectors_path) // (4 * dim) if os.path.exists(self._vectors_path) else 0
+
+    def _tombstone(self, conn, ids: list) -> int:
+        """기존 행을 삭제 표시 (벡터 파일에서는 지우지 않고 검색 시 제외)"""
+        removed = 0
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            marks = ",".join("?" * len(part))
+            rows = [r for (r,) in conn.execute(f"SELECT row FROM docs WHERE id IN ({marks})", part)]
+            if not rows:
+                continue
+            row_marks = ",".join("?" * len(rows))
+            conn.execute(f"DELETE FROM fts WHERE rowid IN ({row_marks})", rows)
+            # id UNIQUE 제약 때문에 삭제된 행의 id는 비움
+            conn.execute(f"UPDATE docs SET deleted = 1, id = NULL WHERE row IN ({row_marks})", rows)
+            removed += len(rows)
+        return removed
+
+    def delete(self, ids) -> int:
+        ids = list(ids)
+        if not ids:
+            return 0
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                removed = self._tombstone(conn, ids)
+                self._bump_generation(conn)
+        self._reload()
+        return removed
+
+    # ----- IVF -----
+
+    def _maybe_rebuild_ivf(self):
+        snap = self._snapshot
+        alive_rows = int(snap.alive.sum()) if snap.rows else 0
+        if alive_rows < LOCAL_IVF_MIN_ROWS:
+            return
+        built = snap.ivf["rows"] if snap.ivf else 0
+        if built and (snap.rows - built) < built * LOCAL_IVF_REBUILD_RATIO:
+            return
+        self.build_ivf()
+
+    def build_ivf(self, nlist: int = None, iterations: int = 10):
+        """
+        구면 k-means로 클러스터를 만들고, 벡터를 클러스터 순서로 재배열하여 저장
+        (검색 시 클러스터 하나가 연속된 메모리 구간이 되도록)
+        """
+        self._reload()
+        snap = self._snapshot
+        rows = snap.rows
+        if not rows:
+            return
+        started = time.time()
+        vectors = snap.vectors
+        alive_idx = np.flatnonzero(snap.alive)
+        nlist = nlist or max(16, int(np.sqrt(len(alive_idx))))
+        rng = np.random.default_rng(0)
+
+        # 1. 샘플로 centroid 학습
+        sample_idx = rng.choice(alive_idx, size=min(len(alive_idx), nlist * 64), replace=False)
+        sample = np.asarray(vectors[np.sort(sample_idx)])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+                else:
+                    centroids[c] = sample[rng.integers(len(sample))]
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        # 2. 전체 행 배정 (삭제된 행 제외)
+        assignments = np.empty(len(alive_idx), dtype=np.int32)
+        for i in range(0, len(alive_idx), _BATCH_ROWS):
+            part = alive_idx[i:i + _BATCH_ROWS]
+            assignments[i:i + _BATCH_ROWS] = np.argmax(np.asarray(vectors[part]) @ centroids.T, axis=1)
+
+        order = alive_idx[np.argsort(assignments, kind="stable")].astype(np.int64)
+        counts = np.bincount(assignments, minlength=nlist)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        # 3. 모든 파일을 임시 이름으로 기록한 뒤 교체
+        #    (제자리 덮어쓰기는 다른 스레드/프로세스가 mmap 중인 order/vectors를 깨뜨릴 수 있음.
+        #     os.replace는 기존 mmap이 옛 파일을 계속 보도록 유지)
+        ivf_dir = os.path.join(self.path, "ivf")
+        tmp_vectors = os.path.join(ivf_dir, "vectors.tmp.npy")
+        out = np.lib.format.open_memmap(tmp_vectors, mode="w+", dtype=np.float32, shape=(len(order), snap.dim))
+        for i in range(0, len(order), _BATCH_ROWS):
+            out[i:i + _BATCH_ROWS] = vectors[order[i:i + _BATCH_ROWS]]
+        out.flush()
+        del out
+        staged = [(tmp_vectors, os.path.join(ivf_dir, "vectors.npy"))]
+        for name, array in (("centroids", centroids), ("order", order), ("offsets", offsets)):
+            tmp_path = os.path.join(ivf_dir, f"{name}.tmp.npy")
+            np.save(tmp_path, array)
+            staged.append((tmp_path, os.path.join(ivf_dir, f"{name}.npy")))
+
+        with self._write_lock:
+            for tmp_path, final_path in staged:
+                os.replace(tmp_path, final_path)
+            conn = self._connect()
+            with conn:
+                self._set_meta(conn, "ivf_rows", rows)
+                self._bump_generation(conn)
+        self._reload()
+        print(f"🗂️ Local IVF built for '{self.name}': {len(order)} vectors, {nlist} lists in {time.time() - started:.1f}s")
+
+    # ----- 검색 -----
+
+    def _vector_search(self, query_vector, k: int, allowed_rows=None) -> list:
+        """
+        코사인 유사도 상위 k개 (행 번호, 점수)
+        allowed_rows가 있으면 그 행만 전수 비교 (필터 결과가 작아도 k개를 모두 채우는 pre-filter)
+        """
+        snap = self._snapshot
+        if not snap.rows:
+            return []
+        q = np.asarray(query_vector, dtype=np.float32)
+        q /= max(float(np.linalg.norm(q)), 1e-12)
+
+        candidate_rows = []
+        candidate_scores = []
+
+        if allowed_rows is not None:
+            allowed_rows = allowed_rows[allowed_rows < snap.rows]
+            for start in range(0, len(allowed_rows), _BATCH_ROWS):
+                batch = allowed_rows[start:start + _BATCH_ROWS]
+                candidate_scores.append(np.asarray(snap.vectors[batch]) @ q)
+                candidate_rows.append(batch)
+            brute_from = snap.rows
+        else:
+            brute_from = 0
+        if snap.ivf is not None and allowed_rows is None:
+            ivf = snap.ivf
+            nprobe = min(LOCAL_IVF_NPROBE, len(ivf["centroids"]))
+            probes = np.argpartition(-(ivf["centroids"] @ q), nprobe - 1)[:nprobe]
+            for list_no in probes:
+                start, end = ivf["offsets"][list_no], ivf["offsets"][list_no + 1]
+                if start == end:
+                    continue
+                candidate_scores.append(np.asarray(ivf["vectors"][start:end]) @ q)
+                candidate_rows.append(np.asarray(ivf["order"][start:end]))
+            brute_from = ivf["rows"]
+
+        # IVF 이후 추가된 행 (또는 IVF가 없으면 전체) 전수 비교
+        for start in range(brute_from, snap.rows, _BATCH_ROWS):
+            end = min(start + _BATCH_ROWS, snap.rows)
+            candidate_scores.append(np.asarray(snap.vectors[start:end]) @ q)
+            candidate_rows.append(np.arange(start, end))
+
+        if not candidate_rows:
+            return []
+        rows = np.concatenate(candidate_rows)
+        scores = np.concatenate(candidate_scores)
+        keep = snap.alive[rows]
+        rows, scores = rows[keep], scores[keep]
+        if not len(rows):
+            return []
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def _keyword_search(self, query: str, k: int, filter_sql: str = None, filter_params=()) -> list:
+        """BM25 상위 k개 (행 번호, 점수). FTS5의 bm25()는 낮을수록 관련도가 높음"""
+        match = _keyword_query(query)
+        if not match:
+            return []
+        try:
+            if filter_sql:
+                rows = self._connect().execute(
+                    "SELECT fts.rowid, bm25(fts) FROM fts JOIN docs ON docs.row = fts.rowid "
+                    f"WHERE fts MATCH ? AND docs.deleted = 0 AND ({filter_sql}) ORDER BY bm25(fts) LIMIT ?",
+                    (match, *filter_params, k)
+                ).fetchall()
+            else:
+                rows = self._connect().execute(
+                    "SELECT rowid, bm25(fts) FROM fts WHERE fts MATCH ? ORDER BY bm25(fts) LIMIT ?", (match, k)
+                ).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Local keyword search failed: {e}")
+            return []
+        return [(row, -score) for row, score in rows]
+
+    def _filtered_rows(self, filter_sql: str, filter_params=()):
+        """필터(search_filters.to_sql)를 만족하는 살아있는 행 번호 배열"""
+        rows = self._connect().execute(
+            f"SELECT row FROM docs WHERE deleted = 0 AND ({filter_sql}) ORDER BY row", tuple(filter_params)
+        ).fetchall()
+        return np.fromiter((r for (r,) in rows), dtype=np.int64, count=len(rows))
+
+    def search(self, query: str, query_vector, top_k: int = 5, candidates: int = None, filter_sql: str = None, filter_params=()) -> list:
+        """
+        하이브리드 검색: 벡터/BM25 후보를 각각 뽑아 RRF로 결합
+
+        Args:
+            filter_sql / filter_params: search_filters.to_sql 결과 (두 후보 모두 필터를 먼저 적용)
+
+        Returns:
+            search_service.search_documents와 같은 형식의 dict 리스트
+        """
+        self._reload()
+        candidates = candidates or max(top_k * 4, 50)
+        allowed_rows = None
+        if filter_sql:
+            allowed_rows = self._filtered_rows(filter_sql, filter_params)
+            if not len(allowed_rows):
+                return []
+        vector_hits = self._vector_search(query_vector, candidates, allowed_rows) if query_vector is not None else []
+        keyword_hits = self._keyword_search(query, candidates, filter_sql, filter_params) if query else []
+
+        fused = {}
+        for hits in (vector_hits, keyword_hits):
+            for rank, (row, _) in enumerate(hits):
+                fused[row] = fused.get(row, 0.0) + 1.0 / (RRF_K + rank + 1)
+        top_rows = sorted(fused, key=fused.get, reverse=True)[:top_k]
+        if not top_rows:
+            return []
+
+        marks = ",".join("?" * len(top_rows))
+        data = dict(self._connect().execute(f"SELECT row, data FROM docs WHERE deleted = 0 AND row IN ({marks})", top_rows))
+        docs = []
+        for row in top_rows:
+            if row not in data:
+                continue
+            document = json.loads(data[row])
+            docs.append({
+                "id": document.get("id"),
+                "content": document.get("content"),
+                "fileName": document.get("fileName"),
+                "parentSummary": document.get("parentSummary"),
+                "chunkSummary": document.get("chunkSummary"),
+                "score": round(fused[row], 6),
+                "reranker_score": None
+            })
+        return docs
+
+    # ----- 조회 -----
+
+    def ids_for_file(self, file_name: str) -> set:
+        rows = self._connect().execute(
+            "SELECT id FROM docs WHERE deleted = 0 AND json_extract(data, '$.fileName') = ?", (file_name,)
+        )
+        return {chunk_id for (chunk_id,) in rows}
+
+    def list_page(self, after: str = None, limit: int = 100, fields: list = None) -> list:
+        """id 순으로 after 다음부터 limit개 (fields만 포함한 dict 리스트)"""
+        rows = self._connect().execute(
+            "SELECT data FROM docs WHERE deleted = 0 AND id > ? ORDER BY id LIMIT ?", (after or "", limit)
+        )
+        docs = []
+        for (data,) in rows:
+            document = json.loads(data)
+            docs.append({field: document.get(field) for field in fields} if fields else document)
+        return docs
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM docs WHERE deleted = 0").fetchone()[0]
+
+    def stats(self) -> dict:
+        self._reload()
+        snap = self._snapshot
+        return {
+            "name": self.name,
+            "documents": self.count(),
+            "vector_rows": snap.rows,
+            "dim": snap.dim,
+            "ivf_rows": snap.ivf["rows"] if snap.ivf else 0,
+            "ivf_lists": len(snap.ivf["centroids"]) if snap.ivf else 0
+        }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_local_index(name: str) -> LocalIndex:
+    """인덱스 이름별 LocalIndex (프로세스 공유)"""
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = LocalIndex(name)
+            _indexes[name] = index
+            print(f"🗂️ Local index opened: {index.path}")
+        return index
@@ -0,0 +1,50 @@
+"""
+간단한 지연 시간 메트릭 수집기
+최근 N건의 측정값으로 count / 평균 / p50 / p95 / 최대값을 계산합니다.
+"""
+
+from collections import defaultdict, deque
+import threading
+
+WINDOW_SIZE = 1000
+
+
+class LatencyMetrics:
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self._samples = defaultdict(lambda: deque(maxlen=window_size))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self._samples[name].append(seconds * 1000)
+            self._counts[name] += 1
+
+    @staticmethod
+    def _percentile(ordered: list, pct: float) -> float:
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self, prefix: str = "") -> dict:
+        """이름별 통계 (단위: ms)"""
+        with self._lock:
+            items = {name: list(samples) for name, samples in self._samples.items() if name.startswith(prefix)}
+            counts = dict(self._counts)
+
+        result = {}
+        for name, samples in sorted(items.items()):
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[name] = {
+                "count": counts.get(name, 0),
+                "avg_ms": round(sum(ordered) / len(ordered), 1),
+                "p50_ms": round(self._percentile(ordered, 50), 1),
+                "p95_ms": round(self._percentile(ordered, 95), 1),
+                "max_ms": round(ordered[-1], 1)
+            }
+        return result
+
+
+# 전역 인스턴스
+metrics = LatencyMetrics()
@@ -1,66 +1,135 @@
-from openai import AzureOpenAI, OpenAI
 from app.config import (
-    AZURE_OPENAI_ENDPOINT, 
-    AZURE_OPENAI_API_KEY, 
-    AZURE_OPENAI_API_VERSION,
     AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-    GOOGLE_API_KEY,
-    GEMINI_MODEL
+    GEMINI_MODEL,
+    ANALYZE_CONCURRENCY
 )
 from app.services.prompts import DOC_PROMPT, CODE_PROMPT
+from app.services.client_registry import client_registry
+from app.services.embedding_cache import embedding_cache
+from app.services.segmenter import split_into_segments
+from app.services.document_service import page_for_offset
+from app.services.content_hash import sha256_hex, assign_chunk_ids
+from concurrent.futures import ThreadPoolExecutor
 import json
+import re
 import traceback
-import uuid
 
 def get_openai_client():
-    return AzureOpenAI(
-        api_key=AZURE_OPENAI_API_KEY,
-        api_version="2024-02-15-preview",
-        azure_endpoint=AZURE_OPENAI_ENDPOINT
-    )
+    """Azure OpenAI 클라이언트 (프로세스 공유, keep-alive 풀 재사용)"""
+    return client_registry.openai()
 
 def get_google_client():
-    """Google Gemini 클라이언트 (채팅/분석용)"""
-    return OpenAI(
-        api_key=GOOGLE_API_KEY,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-    )
+    """Google Gemini 클라이언트 (채팅/분석용, 프로세스 공유)"""
+    return client_registry.google()
 
 def get_embedding(text: str) -> list:
+    cached = embedding_cache.get(text, AZURE_OPENAI_EMBEDDING_DEPLOYMENT)
+    if cached is not None:
+        return cached.tolist()
+
     client = get_openai_client()
     response = client.embeddings.create(
         input=text,
-        model="text-embedding-3-large"
+        model=AZURE_OPENAI_EMBEDDING_DEPLOYMENT
     )
-    return response.data[0].embedding
+    embedding = response.data[0].embedding
+    embedding_cache.put(text, AZURE_OPENAI_EMBEDDING_DEPLOYMENT, embedding)
+    return embedding
 
-def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc") -> list:
+def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc", pages: list = None) -> list:
     """
     [복구됨] 추출된 텍스트를 LLM(Gemini)에 보내 구조화된 JSON(청크 리스트)으로 변환합니다.
     file_type: 'code' 또는 'doc' (그 외는 doc으로 처리)
+    pages: document_service.extract_document의 페이지 오프셋 (있으면 chunkMeta에 startPage/endPage 기록)
+
+    긴 문서는 제목/페이지/코드 정의 경계에서 구간으로 나누어 동시에 처리(map)하고,
+    청크를 원문 순서대로 합친 뒤 문서 전체 요약을 한 번 더 생성(reduce)합니다.
     """
     client = get_google_client()
-    
+    segments = split_into_segments(text, file_type)
+
+    if len(segments) == 1:
+        segment_chunks = [_analyze_segment(client, segments[0], 1, file_name, file_type)]
+    else:
+        print(f"🧩 Splitting {file_name} ({len(text)} chars) into {len(segments)} segments "
+              f"(concurrency={ANALYZE_CONCURRENCY})", flush=True)
+        with ThreadPoolExecutor(max_workers=max(1, min(ANALYZE_CONCURRENCY, len(segments)))) as pool:
+            segment_chunks = list(pool.map(
+                lambda segment: _analyze_segment(client, segment, len(segments), file_name, file_type),
+                segments
+            ))
+        failed = [segment.index + 1 for segment, chunks in zip(segments, segment_chunks) if not chunks]
+        if failed:
+            print(f"⚠️ {len(failed)}/{len(segments)} segments produced no chunks: {failed}", flush=True)
+
+    if pages:
+        _assign_pages(segments, segment_chunks, text, pages)
+
+    return _merge_segment_chunks(client, segments, segment_chunks, text, file_name, file_type)
+
+
+def _segment_offset(text: str, segment) -> int:
+    """구간의 전체 텍스트 기준 시작 위치 (start_line의 줄 시작, 한 줄이 잘린 구간이면 그 안에서 다시 찾음)"""
+    line_start = 0
+    for _ in range(segment.start_line - 1):
+        line_start = text.index("\n", line_start) + 1
+    found = text.find(segment.text[:64], line_start)
+    return found if found >= 0 else line_start
+
+
+def _assign_pages(segments: list, segment_chunks: list, text: str, pages: list):
+    """
+    청크 본문을 원문에서 찾아 chunkMeta.startPage / endPage 기록
+    (LLM이 줄바꿈을 공백으로 바꾸므로 앞부분 단어들을 공백 무관하게 검색, 못 찾으면 구간 전체의 페이지 범위)
+    """
+    for segment, chunks in zip(segments, segment_chunks):
+        base = _segment_offset(text, segment)
+        segment_pages = (page_for_offset(pages, base), page_for_offset(pages, base + max(len(segment.text) - 1, 0)))
+        cursor = 0
+        for chunk in chunks:
+            content = chunk.get("content") or ""
+            words = content.split()[:8]
+            match = re.search(r"\s+".join(map(re.escape, words)), segment.text[cursor:]) if words else None
+            if match:
+                start = cursor + match.start()
+                cursor = start + 1
+                span = (page_for_offset(pages, base + start),
+                        page_for_offset(pages, base + min(start + len(content), len(segment.text)) - 1))
+            else:
+                span = segment_pages
+            chunk_meta = chunk.get("chunkMeta") if isinstance(chunk.get("chunkMeta"), dict) else {}
+            chunk_meta.update({"startPage": span[0], "endPage": span[1]})
+            chunk["chunkMeta"] = chunk_meta
+
+
+def _analyze_segment(client, segment, total_segments: int, file_name: str, file_type: str) -> list:
+    """구간 하나를 Gemini로 청킹. 실패하면 빈 리스트"""
     # 1. 파일 유형에 따른 프롬프트 선택
     if file_type == "code":
         system_prompt = CODE_PROMPT
     else:
         system_prompt = DOC_PROMPT
-        
+
+    segment_info = ""
+    if total_segments > 1:
+        segment_info = f"""
+    Segment: {segment.index + 1}/{total_segments} (긴 문서의 일부 구간입니다. 이 구간의 내용만 청킹하세요.)
+    StartLine: {segment.start_line}"""
+
     user_message = f"""
     [Input Document Info]
     FileName: {file_name}
-    FileType: {file_type}
+    FileType: {file_type}{segment_info}
     
     [Input Text]
-    {text[:50000]} 
+    {segment.text} 
     
-    (Note: If text is truncated, process only what is provided. Do not hallucinate.)
+    (Note: Process only what is provided. Do not hallucinate.)
     """
-    # 50000자 제한: Gemini Context Window는 크지만 안전하게 제한
 
     try:
-        print(f"🧠 Processing with Gemini ({file_type})... Input length: {len(text[:50000])}", flush=True)
+        print(f"🧠 Processing with Gemini ({file_type})... Segment {segment.index + 1}/{total_segments}, "
+              f"input length: {len(segment.text)}", flush=True)
         
         # Gemini 호출
         response = client.chat.completions.create(
@@ -75,7 +144,7 @@ def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc") -
             timeout=120
         )
         
-        print("✅ Gemini response received.", flush=True)
+        print(f"✅ Gemini response received (segment {segment.index + 1}/{total_segments}).", flush=True)
         response_text = response.choices[0].message.content
 
         print("\n=== [Gemini Response Output] ===")
@@ -102,19 +171,11 @@ def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc") -
                     chunks = [parsed]
             else:
                 chunks = []
-                
-            # 필수 필드 보정
+
+            chunks = [chunk for chunk in chunks if isinstance(chunk, dict)]
             print(f"Generated {len(chunks)} chunks.")
-            for chunk in chunks:
-                if not chunk.get("id"):
-                    chunk["id"] = f"{uuid.uuid4()}"
-                if not chunk.get("fileName"):
-                    chunk["fileName"] = file_name
-                if not chunk.get("chunkMeta"):
-                    chunk["chunkMeta"] = {}
-                
             return chunks
-            
+
         except json.JSONDecodeError:
             print(f"❌ Gemini response is not valid JSON: {response_text[:100]}...")
             return []
@@ -123,173 +184,96 @@ def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc") -
         print(f"❌ Gemini Chat Completion failed: {e}")
         traceback.print_exc()
         return []
-    
-def analyze_files_for_handover(file_context: str) -> dict:
-    """파일 내용을 분석하여 인수인계서 JSON 생성 - 프론트엔드 HandoverData 형식으로 반환"""
-    from app.services.search_service import get_search_client
-    
-    client = get_openai_client()
-    
-    # Azure Search에서 모든 문서의 실제 내용 직접 검색
-    print("📄 Azure Search에서 모든 문서 검색 중...")
-    try:
-        search_client = get_search_client()
-        results = search_client.search(search_text="*", include_total_count=True, top=10)
-        
-        doc_contents = []
-        for result in results:
-            file_name = result.get("file_name", "Unknown")
-            content = result.get("content", "")
-            if content and len(content) > 0:
-                # 최대 1000자까지만 포함
-                content_preview = content[:1000]
-                doc_contents.append(f"[파일: {file_name}]\n{content_preview}\n")
-                print(f"✅ 문서 포함됨: {file_name} ({len(content)} 글자)")
-        
-        if doc_contents:
-            print(f"📋 {len(doc_contents)}개 문서 검색됨")
-            indexed_context = "\n".join(doc_contents)
-            file_context = indexed_context if not file_context else file_context + "\n\n---\n\n" + indexed_context
-        else:
-            print("⚠️  검색 결과가 비어있음")
-    except Exception as e:
-        print(f"⚠️  문서 검색 실패: {e}")
-        traceback.print_exc()
-    
-    # 파일이 없거나 매우 짧으면 샘플 데이터 추가
-    if not file_context or len(file_context.strip()) < 20:
-        print("ℹ️  파일 컨텍스트가 부족함 - 샘플 데이터 추가")
-        file_context += """
-
-[샘플: 프로젝트 현황 보고]
-프로젝트명: 시스템 고도화
-담당자: 김철수 과장 (kim.cs@company.com)
-인수자: 이영희 대리 (lee.yh@company.com)
-인수 예정일: 2025-02-15
-개발현황: 70% 진행 중 (메인 기능 개발 완료, 최적화 진행 중)
-주요 담당 업무: 백엔드 API 개발, 데이터베이스 설계, 보안 구현
-팀원: 박준호(프론트엔드), 최민수(QA)
-위험요소: 일정 지연 가능성 (2주)
-다음 마일스톤: 2025-02-01 알파 테스트"""
-    
-    print(f"📊 최종 컨텍스트 길이: {len(file_context)} 글자")
-
-    system_message = """
-당신은 인수인계서 생성 전문가입니다. 반드시 유효한 JSON 형식으로만 답변하세요.
-
-아래 자료는 AI Search 인덱스에서 추출된 업무 문서의 요약 또는 원문입니다. 자료가 많을 경우 중복되거나 불필요한 내용은 통합·요약하고, 실제 인수인계서처럼 구체적이고 실무적으로 작성하세요.
-
-자료에 포함된 정보는 최대한 반영하고, 자료가 부족하거나 없는 항목은 빈 배열([]) 또는 빈 문자열("")로 채워주세요. 자료가 너무 많으면 핵심 내용 위주로 요약해도 됩니다.
-
-응답 형식 (프론트엔드 요구사항에 맞춤):
-{
-    "overview": {
-        "transferor": {"name": "인계자명", "position": "직급/부서", "contact": "연락처"},
-        "transferee": {"name": "인수자명", "position": "직급/부서", "contact": "연락처", "startDate": "시작일"},
-        "reason": "인수인계 사유",
-        "background": "업무 배경",
-        "period": "근무 기간",
-        "schedule": [{"date": "날짜", "activity": "활동"}]
-    },
-    "jobStatus": {
-        "title": "직책",
-        "responsibilities": ["책임내용1", "책임내용2"],
-        "authority": "권한",
-        "reportingLine": "보고체계",
-        "teamMission": "팀 미션",
-        "teamGoals": ["목표1", "목표2"]
-    },
-    "priorities": [
-        {"rank": 1, "title": "우선과제명", "status": "상태", "solution": "해결방안", "deadline": "마감일"}
-    ],
-    "stakeholders": {
-        "manager": "상급자",
-        "internal": [{"name": "이름", "role": "역할"}],
-        "external": [{"name": "이름", "role": "역할"}]
-    },
-    "teamMembers": [
-        {"name": "팀원명", "position": "직급", "role": "역할", "notes": "비고"}
-    ],
-    "ongoingProjects": [
-        {"name": "프로젝트명", "owner": "담당자", "status": "상태", "progress": 50, "deadline": "마감일", "description": "설명"}
-    ],
-    "risks": {"issues": "현안", "risks": "위험요소"},
-    "roadmap": {"shortTerm": "단기계획", "longTerm": "장기계획"},
-    "resources": {
-        "docs": [{"category": "분류", "name": "문서명", "location": "위치"}],
-        "systems": [{"name": "시스템명", "usage": "사용방법", "contact": "담당자"}],
-        "contacts": [{"category": "분류", "name": "이름", "position": "직급", "contact": "연락처"}]
-    },
-    "checklist": [{"text": "확인항목", "completed": false}]
-}
-"""
 
-    user_message = f"""
-아래는 AI Search 인덱스에서 추출된 업무 자료(요약/원문)입니다. 이 자료들을 분석하여 실제 업무 인수인계서처럼 구체적이고 실무적으로 JSON을 작성해 주세요.
 
-자료가 많으면 중복/불필요한 내용은 통합·요약하고, 자료에 있는 정보는 최대한 반영하세요. 없는 항목은 빈 배열([]) 또는 빈 문자열("")로 남겨두세요.
+def _merge_segment_chunks(client, segments: list, segment_chunks: list, text: str, file_name: str, file_type: str) -> list:
+    """
+    구간별 청크를 원문 순서대로 합치고 필수 필드를 보정합니다.
+    - id: 파일명 + 청크 본문 해시 (본문이 같으면 항상 같은 id → 증분 재인덱싱)
+    - parentId / parentSummary: 모든 청크 공통
+    - chunkMeta: 전체 기준 index/total/isLast, 코드는 startLine/endLine을 원문 줄 번호로 보정
+    """
+    parent_id = "doc_" + sha256_hex(f"{file_name}\0{text}")[:16]
+
+    if len(segments) > 1:
+        segment_summaries = [
+            next((c.get("parentSummary") for c in chunks if c.get("parentSummary")), "")
+            for chunks in segment_chunks
+        ]
+        parent_summary = _summarize_segments(client, file_name, segment_summaries)
+    else:
+        parent_summary = None
 
-자료:
-{file_context}
+    merged = []
+    for segment, chunks in zip(segments, segment_chunks):
+        line_offset = segment.start_line - 1
+        for chunk in chunks:
+            chunk_meta = chunk.get("chunkMeta") if isinstance(chunk.get("chunkMeta"), dict) else {}
+            if line_offset:
+                for key in ("startLine", "endLine"):
+                    if isinstance(chunk_meta.get(key), int):
+                        chunk_meta[key] += line_offset
+            chunk["chunkMeta"] = chunk_meta
+            if parent_summary:
+                chunk["parentSummary"] = parent_summary
+            merged.append(chunk)
 
-위의 JSON 형식을 반드시 따르세요.
-"""
+    assign_chunk_ids(merged, file_name)
+    total = len(merged)
+    for n, chunk in enumerate(merged, start=1):
+        chunk["parentId"] = parent_id
+        chunk["chunkMeta"].update({"index": n, "total": total, "isLast": n == total})
 
-    try:
-        print(f"🚀 Azure OpenAI 호출 시작...")
-        print(f"   - 엔드포인트: {AZURE_OPENAI_ENDPOINT}")
-        print(f"   - 컨텍스트 길이: {len(file_context)}")
+    # 단일 구간이면 Gemini가 채운 parentSummary를 모든 청크에 맞춤
+    if parent_summary is None and merged:
+        shared = next((c.get("parentSummary") for c in merged if c.get("parentSummary")), None)
+        if shared:
+            for chunk in merged:
+                chunk["parentSummary"] = shared
+
+    return merged
 
+
+def _summarize_segments(client, file_name: str, segment_summaries: list) -> str:
+    """구간별 요약을 문서 전체 요약 하나로 합침 (reduce). 실패하면 구간 요약을 이어 붙임"""
+    summaries = [s for s in segment_summaries if s]
+    if not summaries:
+        return ""
+    if len(summaries) == 1:
+        return summaries[0]
+
+    joined = "\n".join(f"{i}. {summary}" for i, summary in enumerate(summaries, start=1))
+    try:
         response = client.chat.completions.create(
-            model="gpt-4o",
+            model=GEMINI_MODEL,
             messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
+                {"role": "system", "content": "아래는 한 문서를 여러 구간으로 나누어 각각 요약한 내용입니다. "
+                                              "문서 전체의 핵심을 담은 요약 하나를 5문장 이내로 작성하세요. "
+                                              "구간 요약에 없는 내용은 추가하지 마세요. 요약문만 출력하세요."},
+                {"role": "user", "content": f"FileName: {file_name}\n\n[구간별 요약]\n{joined}"}
             ],
-            temperature=0.7,
-            max_tokens=4000,
-            response_format={"type": "json_object"}
+            temperature=0.1,
+            max_tokens=1000,
+            timeout=60
         )
+        summary = (response.choices[0].message.content or "").strip()
+        if summary:
+            return summary
+    except Exception as e:
+        print(f"⚠️ Segment summary merge failed, joining segment summaries: {e}")
+    return " ".join(summaries)
 
-        print(f"✅ OpenAI 응답 수신")
-        response_text = response.choices[0].message.content
-        print(f"   응답 길이: {len(response_text)} 글자")
+def analyze_files_for_handover(file_context: str, index_name: str = None) -> dict:
+    """
+    파일 내용 + 인덱스 검색 결과로 인수인계서 JSON 생성 - 프론트엔드 HandoverData 형식으로 반환
+    섹션(overview, jobStatus, priorities, ...)마다 관련 청크만 검색하여 병렬로 생성합니다 (handover_engine)
+    """
+    from app.services.handover_engine import generate_handover
 
-        # JSON 파싱 시도
-        try:
-            print(f"🔍 JSON 파싱 시도...")
-            result = json.loads(response_text)
-            print(f"✅ JSON 파싱 성공 - 키: {list(result.keys())}")
-            return result
-        except json.JSONDecodeError as e:
-            print(f"⚠️  JSON 파싱 실패: {e}")
-            # JSON 파싱 실패 시 기본 구조 반환
-            return {
-                "overview": {
-                    "transferor": {"name": "", "position": "", "contact": ""},
-                    "transferee": {"name": "", "position": "", "contact": ""}
-                },
-                "jobStatus": {"title": "", "responsibilities": []},
-                "priorities": [],
-                "stakeholders": {"manager": "", "internal": [], "external": []},
-                "teamMembers": [],
-                "ongoingProjects": [],
-                "risks": {"issues": "", "risks": ""},
-                "roadmap": {"shortTerm": "", "longTerm": ""},
-                "resources": {"docs": [], "systems": [], "contacts": []},
-                "checklist": [],
-                "rawContent": response_text
-            }
-    except Exception as e:
-        print(f"❌ Azure OpenAI 호출 실패: {e}")
-        traceback.print_exc()
-        # system_message 등 로컬 변수 참조 없이 에러만 반환
-        raise Exception(f"API 에러: {e}")
+    print(f"📊 파일 컨텍스트 길이: {len(file_context or '')} 글자")
+    return generate_handover(file_context or "", index_name=index_name)
 
-def chat_with_context(query: str, context: str) -> str:
-    client = get_openai_client()
-    
-    system_message = """당신은 '꿀단지' 인수인계서 생성 AI입니다. 🍯
+CHAT_SYSTEM_MESSAGE = """당신은 '꿀단지' 인수인계서 생성 AI입니다. 🍯
 
 ## 핵심 원칙
 1. **문서 내용을 반드시 먼저 분석**하세요
@@ -311,6 +295,8 @@ def chat_with_context(query: str, context: str) -> str:
 - 📌 일반적인 질문에는 문서 내용을 바탕으로 자연스럽게 답변
 - 📌 이모지를 적절히 사용해 가독성을 높이세요 🐝"""
 
+
+def _build_chat_messages(query: str, context: str) -> list:
     user_message = f"""[참고 문서]
 {context}
 
@@ -319,13 +305,19 @@ def chat_with_context(query: str, context: str) -> str:
 
 위 문서 내용을 꼼꼼히 분석하여 질문에 답변해주세요. 문서에 있는 실제 정보를 인용해서 답변하세요."""
 
+    return [
+        {"role": "system", "content": CHAT_SYSTEM_MESSAGE},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def chat_with_context(query: str, context: str) -> str:
+    client = get_openai_client()
+
     try:
         response = client.chat.completions.create(
             model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
+            messages=_build_chat_messages(query, context),
             temperature=0.7,
             max_tokens=4000
         )
@@ -334,4 +326,34 @@ def chat_with_context(query: str, context: str) -> str:
     except Exception as e:
         print(f"Error in chat_with_context: {e}")
         traceback.print_exc()
-        raise
\ No newline at end of file
+        raise
+
+
+def chat_with_context_stream(query: str, context: str):
+    """
+    chat_with_context의 스트리밍 버전
+    토큰(델타 문자열)이 도착하는 대로 yield 합니다.
+    """
+    client = get_openai_client()
+
+    try:
+        stream = client.chat.completions.create(
+            model="gpt-4o",
+            messages=_build_chat_messages(query, context),
+            temperature=0.7,
+            max_tokens=4000,
+            stream=True
+        )
+
+        with stream:
+            for chunk in stream:
+                # Azure는 첫 청크에 choices 없이 필터 결과만 보내는 경우가 있음
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+    except Exception as e:
+        print(f"Error in chat_with_context_stream: {e}")
+        traceback.print_exc()
+        raise
@@ -0,0 +1,164 @@
+"""
+검색 필터 컴파일러
+ChatRequest.filters 같은 dict를 검증하여 Azure AI Search OData 식 / 로컬 엔진 SQL 조건으로 변환합니다.
+
+입력 형식:
+    {"fileType": "code"}                              → fileType eq 'code'
+    {"paraCategory": ["Projects", "Areas"]}           → search.in(paraCategory, 'Projects|Areas', '|')
+    {"tags": ["배포", "DB"]}                           → tags/any(t: search.in(t, '배포|DB', '|'))
+    {"isArchived": False}                             → isArchived eq false
+    {"processedDate": {"ge": "2025-01-01T00:00:00Z"}} → processedDate ge 2025-01-01T00:00:00Z
+여러 필드는 and로 결합합니다.
+필드는 인덱스 스키마(index_schema)의 filterable 필드만 허용하며, 값은 타입 검사 후 이스케이프합니다.
+"""
+
+from datetime import datetime, timezone
+
+from app.services.index_schema import filterable_fields
+
+COMPARISON_OPERATORS = {"eq", "ne", "gt", "ge", "lt", "le"}
+SQL_OPERATORS = {"eq": "=", "ne": "!=", "gt": ">", "ge": ">=", "lt": "<", "le": "<="}
+MAX_VALUES = 100
+
+_FIELDS = filterable_fields()
+
+
+class FilterError(ValueError):
+    """잘못된 필터 (알 수 없는 필드, 타입 불일치, 지원하지 않는 연산자)"""
+
+
+def _check_value(field: str, edm_type: str, value):
+    """값 타입 검사 후 정규화된 값 반환"""
+    base_type = edm_type[len("Collection("):-1] if edm_type.startswith("Collection(") else edm_type
+    if base_type == "Edm.Boolean":
+        if not isinstance(value, bool):
+            raise FilterError(f"'{field}' expects true/false")
+        return value
+    if base_type == "Edm.DateTimeOffset":
+        if not isinstance(value, str):
+            raise FilterError(f"'{field}' expects an ISO 8601 datetime string")
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise FilterError(f"'{field}' expects an ISO 8601 datetime string, got '{value}'")
+        if parsed.tzinfo is None:
+            raise FilterError(f"'{field}' datetime must include a timezone (e.g. 2025-01-01T00:00:00Z)")
+        # 로컬 엔진은 문자열로 비교하므로 UTC로 맞춤 (저장된 processedDate도 UTC "Z" 형식)
+        return parsed.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+    if not isinstance(value, str):
+        raise FilterError(f"'{field}' expects a string")
+    return value
+
+
+def parse_filters(filters: dict) -> list:
+    """
+    필터 dict를 검증하여 조건 리스트로 변환
+    Returns: [(필드, 연산자, 값 또는 값 리스트, 타입), ...]  연산자: eq/ne/gt/ge/lt/le/in
+    """
+    if not filters:
+        return []
+    if not isinstance(filters, dict):
+        raise FilterError("filters must be an object")
+
+    conditions = []
+    for field, spec in filters.items():
+        edm_type = _FIELDS.get(field)
+        if edm_type is None:
+            raise FilterError(f"'{field}' is not a filterable field (allowed: {', '.join(sorted(_FIELDS))})")
+        is_collection = edm_type.startswith("Collection(")
+
+        if isinstance(spec, dict):
+            if not spec:
+                raise FilterError(f"'{field}' has an empty condition")
+            for op, value in spec.items():
+                if op == "in":
+                    values = value if isinstance(value, list) else [value]
+                    conditions.append(_in_condition(field, edm_type, values))
+                elif op in COMPARISON_OPERATORS:
+                    if is_collection:
+                        raise FilterError(f"'{field}' is a collection; use a list or {{\"in\": [...]}}")
+                    conditions.append((field, op, _check_value(field, edm_type, value), edm_type))
+                else:
+                    raise FilterError(f"Unsupported operator '{op}' (allowed: in, {', '.join(sorted(COMPARISON_OPERATORS))})")
+        elif isinstance(spec, list):
+            conditions.append(_in_condition(field, edm_type, spec))
+        elif is_collection:
+            conditions.append(_in_condition(field, edm_type, [spec]))
+        else:
+            conditions.append((field, "eq", _check_value(field, edm_type, spec), edm_type))
+    return conditions
+
+
+def _in_condition(field: str, edm_type: str, values: list) -> tuple:
+    if not values:
+        raise FilterError(f"'{field}' has an empty value list")
+    if len(values) > MAX_VALUES:
+        raise FilterError(f"'{field}' has too many values (max {MAX_VALUES})")
+    return (field, "in", [_check_value(field, edm_type, v) for v in values], edm_type)
+
+
+# ----- OData (Azure AI Search) -----
+
+def _odata_literal(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _odata_search_in(variable: str, values: list) -> str:
+    # search.in 구분자는 값에 없는 문자로 선택 (값에 모두 포함되면 eq를 or로 연결)
+    for delimiter in ("|", ",", ";", "~", "^"):
+        if not any(delimiter in v for v in values):
+            joined = delimiter.join(values).replace("'", "''")
+            return f"search.in({variable}, '{joined}', '{delimiter}')"
+    return "(" + " or ".join(f"{variable} eq {_odata_literal(v)}" for v in values) + ")"
+
+
+def _odata_value(value, edm_type: str) -> str:
+    if edm_type.endswith("DateTimeOffset") or edm_type.endswith("DateTimeOffset)"):
+        return value  # OData의 DateTimeOffset 리터럴은 따옴표 없이 사용
+    return _odata_literal(value)
+
+
+def to_odata(conditions: list):
+    """조건 리스트 → OData $filter 식 (조건이 없으면 None)"""
+    clauses = []
+    for field, op, value, edm_type in conditions:
+        is_collection = edm_type.startswith("Collection(")
+        if op == "in":
+            if is_collection:
+                clauses.append(f"{field}/any(t: {_odata_search_in('t', value)})")
+            elif edm_type == "Edm.String":
+                clauses.append(_odata_search_in(field, value))
+            else:
+                clauses.append("(" + " or ".join(f"{field} eq {_odata_value(v, edm_type)}" for v in value) + ")")
+        else:
+            clauses.append(f"{field} {op} {_odata_value(value, edm_type)}")
+    return " and ".join(clauses) or None
+
+
+def compile_filter(filters: dict):
+    """필터 dict → OData 식. 잘못된 필터는 FilterError"""
+    return to_odata(parse_filters(filters))
+
+
+# ----- SQL (로컬 엔진: docs.data JSON) -----
+
+def to_sql(conditions: list) -> tuple:
+    """조건 리스트 → (SQLite WHERE 절, 파라미터). docs 테이블의 data(JSON) 컬럼 기준"""
+    clauses = []
+    params = []
+    for field, op, value, edm_type in conditions:
+        path = f"$.{field}"
+        if op == "in":
+            marks = ",".join("?" * len(value))
+            sql_values = [int(v) if isinstance(v, bool) else v for v in value]
+            if edm_type.startswith("Collection("):
+                clauses.append(f"EXISTS (SELECT 1 FROM json_each(data, ?) WHERE value IN ({marks}))")
+            else:
+                clauses.append(f"json_extract(data, ?) IN ({marks})")
+            params.extend([path] + sql_values)
+        else:
+            clauses.append(f"json_extract(data, ?) {SQL_OPERATORS[op]} ?")
+            params.extend([path, int(value) if isinstance(value, bool) else value])
+    return " AND ".join(clauses), params
@@ -1,28 +1,15 @@
-from azure.search.documents import SearchClient
-from azure.search.documents.indexes import SearchIndexClient
-from azure.search.documents.indexes.models import (
-    SearchIndex,
-    SimpleField,
-    SearchableField,
-    SearchFieldDataType,
-    VectorSearch,
-    HnswAlgorithmConfiguration,
-    VectorSearchProfile,
-    SearchField,
-    SemanticConfiguration,
-    SemanticPrioritizedFields,
-    SemanticField,
-    SemanticSearch
-)
-from azure.core.credentials import AzureKeyCredential
-from app.config import (
-    AZURE_SEARCH_ENDPOINT,
-    AZURE_SEARCH_KEY,
-    AZURE_SEARCH_INDEX_NAME,
-    AZURE_SEARCH_ADMIN_KEY,
-    AZURE_SEARCH_SERVICE_ENDPOINT
-)
+from app.config import AZURE_SEARCH_INDEX_NAME, SEARCH_BACKEND
 from app.services.openai_service import get_embedding
+from app.services.embedding_service import embed_texts
+from app.services.client_registry import client_registry
+from app.services.answer_cache import answer_cache
+from app.services.search_uploader import upload_documents_batched
+from app.services.local_index import get_local_index
+from app.services.index_bootstrap import index_registry
+from app.services.index_stats import index_stats
+from app.services.index_schema import SEMANTIC_CONFIGURATION_NAME
+from app.services.search_filters import parse_filters, to_odata, to_sql
+from azure.core.exceptions import ResourceNotFoundError
 import traceback
 
 INDEX_NAME = AZURE_SEARCH_INDEX_NAME
@@ -45,103 +32,17 @@ def get_search_client(index_name: str = None):
 """
 
 def get_search_client(index_name: str = None):
-    return SearchClient(
-        endpoint=AZURE_SEARCH_ENDPOINT,
-        index_name=index_name or AZURE_SEARCH_INDEX_NAME,
-        credential=AzureKeyCredential(AZURE_SEARCH_KEY)
-    )
+    """인덱스별 Search 클라이언트 (프로세스 공유)"""
+    return client_registry.search(index_name or AZURE_SEARCH_INDEX_NAME)
 
 def get_search_index_client():
-    return SearchIndexClient(
-        endpoint=AZURE_SEARCH_SERVICE_ENDPOINT,
-        credential=AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY)
-    )
+    """인덱스 관리 클라이언트 (프로세스 공유)"""
+    return client_registry.search_index()
 
 
-def create_index_if_not_exists():
-    index_client = get_search_index_client()
-    
-    try:
-        index_client.get_index(INDEX_NAME)
-        return
-    except:
-        pass
-    
-    fields = [
-        # 1. Core Vector & Content (RAG Performance)
-        SearchField(
-            name="content_vector",
-            type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
-            searchable=True,
-            vector_search_dimensions=3072,
-            vector_search_profile_name="my-vector-profile"
-        ),
-        SearchableField(name="content", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
-        SearchableField(name="parentSummary", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
-        SearchableField(name="chunkSummary", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
-        SearchableField(name="codeExplanation", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
-        SearchableField(name="designIntent", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
-        SearchableField(name="handoverNotes", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
-        SearchField(name="codeComments", type=SearchFieldDataType.Collection(SearchFieldDataType.String), searchable=True, analyzer_name="ko.lucene"),
-
-        # 2. Filtering & Metadata
-        SimpleField(name="processedDate", type=SearchFieldDataType.DateTimeOffset, sortable=True, filterable=True),
-        SearchableField(name="paraCategory", type=SearchFieldDataType.String, filterable=True, facetable=True),
-        SearchableField(name="fileType", type=SearchFieldDataType.String, filterable=True, facetable=True),
-        SearchableField(name="language", type=SearchFieldDataType.String, filterable=True, facetable=True),
-        SearchableField(name="framework", type=SearchFieldDataType.String, filterable=True, facetable=True),
-        SearchableField(name="serviceDomain", type=SearchFieldDataType.String, filterable=True, facetable=True),
-        SimpleField(name="isArchived", type=SearchFieldDataType.Boolean, filterable=True, facetable=True),
-        SearchField(name="tags", type=SearchFieldDataType.Collection(SearchFieldDataType.String), searchable=True, filterable=True, facetable=True, analyzer_name="standard.lucene"),
-        SearchField(name="relatedSection", type=SearchFieldDataType.Collection(SearchFieldDataType.String), searchable=True, filterable=True, analyzer_name="standard.lucene"),
-
-        # 3. Identifiers & Location
-        SimpleField(name="id", type=SearchFieldDataType.String, key=True, filterable=True),
-        SimpleField(name="parentId", type=SearchFieldDataType.String, filterable=True),
-        SearchableField(name="fileName", type=SearchFieldDataType.String, filterable=True, analyzer_name="standard.lucene"),
-        SearchableField(name="filePath", type=SearchFieldDataType.String, filterable=True, analyzer_name="standard.lucene"),
-        SimpleField(name="url", type=SearchFieldDataType.String),
-
-        # 4. Payload (LLM Reference - Not Searchable)
-        SimpleField(name="chunkMeta", type=SearchFieldDataType.String), # JSON string
-        SimpleField(name="codeMetadata", type=SearchFieldDataType.String),
-        SimpleField(name="involvedPeople", type=SearchFieldDataType.String),
-        SimpleField(name="rawCode", type=SearchFieldDataType.String), # Not searchable
-        SearchField(name="relatedFiles", type=SearchFieldDataType.Collection(SearchFieldDataType.String), searchable=False),
-    ]
-    
-    # Define semantic search configuration
-    semantic_config = SemanticConfiguration(
-        name="my-semantic-config",
-        prioritized_fields=SemanticPrioritizedFields(
-            title_field=SemanticField(field_name="fileName"),
-            content_fields=[
-                SemanticField(field_name="content"),
-                SemanticField(field_name="parentSummary")
-            ],
-            keywords_fields=[
-                SemanticField(field_name="tags"),
-                SemanticField(field_name="paraCategory")
-            ]
-        )
-    )
-    
-    vector_search = VectorSearch(
-        algorithms=[
-            HnswAlgorithmConfiguration(name="my-hnsw")
-        ],
-        profiles=[
-            VectorSearchProfile(
-                name="my-vector-profile",
-                algorithm_configuration_name="my-hnsw"
-            )
-        ]
-    )
-    
-    semantic_search = SemanticSearch(configurations=[semantic_config])
-    
-    index = SearchIndex(name=INDEX_NAME, fields=fields, vector_search=vector_search, semantic_search=semantic_search)
-    index_client.create_index(index)
+def create_index_if_not_exists(index_name: str = None):
+    """인덱스 보장 (앱 시작 시 부트스트랩된 스키마 캐시를 사용하므로 보통 왕복 없음)"""
+    index_registry.ensure(index_name or INDEX_NAME)
 
 def add_document_to_index(doc_id: str, content: str, file_name: str):
     create_index_if_not_exists()
@@ -162,14 +63,56 @@ def add_document_to_index(doc_id: str, content: str, file_name: str):
     
     search_client.upload_documents([document])
 
-def index_processed_chunks(chunks: list, index_name: str = None):
+def get_indexed_chunk_ids(file_name: str, index_name: str = None) -> set:
+    """파일(fileName)에 해당하는 인덱스 내 청크 id 집합. 인덱스가 없으면 빈 집합"""
+    if SEARCH_BACKEND == "local":
+        return get_local_index(index_name or AZURE_SEARCH_INDEX_NAME).ids_for_file(file_name)
+    search_client = get_search_client(index_name=index_name)
+    escaped = file_name.replace("'", "''")
+    try:
+        results = search_client.search(search_text="*", filter=f"fileName eq '{escaped}'", select=["id"])
+        return {result["id"] for result in results}
+    except ResourceNotFoundError:
+        return set()
+
+
+def delete_chunks(chunk_ids, index_name: str = None) -> int:
+    """청크 id 목록을 인덱스에서 삭제"""
+    chunk_ids = list(chunk_ids)
+    if not chunk_ids:
+        return 0
+    if SEARCH_BACKEND in ("local", "replica"):
+        removed = get_local_index(index_name or AZURE_SEARCH_INDEX_NAME).delete(chunk_ids)
+        if SEARCH_BACKEND == "local":
+            print(f"🗑️ Deleted {removed}/{len(chunk_ids)} stale chunks from local index")
+            return removed
+    search_client = get_search_client(index_name=index_name)
+    result = search_client.delete_documents(documents=[{"id": chunk_id} for chunk_id in chunk_ids])
+    deleted = sum(1 for r in result if r.succeeded)
+    print(f"🗑️ Deleted {deleted}/{len(chunk_ids)} stale chunks from '{index_name or AZURE_SEARCH_INDEX_NAME}'")
+    return deleted
+
+
+def index_processed_chunks(chunks: list, index_name: str = None, on_progress=None, replace_file: str = None):
     """
     LLM 전처리가 완료된 청크 리스트(메모리 상의 객체)를 받아 Azure Search에 업로드합니다.
     인덱스가 없으면 자동으로 생성합니다.
+    임베딩은 embedding_service의 배치 엔진으로 한 번에 생성합니다.
+
+    replace_file을 지정하면 그 파일의 기존 청크와 비교하여 증분 반영합니다.
+    (청크 id는 본문 해시이므로) 이미 인덱스에 있는 id는 임베딩/업로드를 건너뛰고
+    파일 공통 필드(parentId / parentSummary / chunkMeta)만 merge로 갱신하며,
+    새 청크 목록에 없는 기존 id는 업로드 후 삭제합니다.
 
     Args:
         chunks: 인덱싱할 청크 리스트
         index_name: RAG 인덱스 이름 (None이면 기본 인덱스 사용)
+        on_progress: 임베딩 진행 상황 콜백 (완료 개수, 전체 개수)
+        replace_file: 증분 반영할 파일명 (None이면 전체 업로드)
+
+    Returns:
+        인덱스에 반영된 청크 수 (건너뛴 기존 청크 포함).
+        전체 청크 수보다 작으면 일부가 반영되지 않은 것이며, 이때 이전 버전의 청크는 삭제하지 않음
     """
     if not chunks:
         print("[Warning] No chunks to index.")
@@ -177,11 +120,30 @@ def index_processed_chunks(chunks: list, index_name: str = None):
 
     target_index = index_name or AZURE_SEARCH_INDEX_NAME
     print(f"🔍 Target index: {target_index}")
+    if SEARCH_BACKEND != "local":
+        index_registry.ensure(target_index)  # 부트스트랩된 인덱스는 캐시 확인만
 
     search_client = get_search_client(index_name=index_name)
     documents_batch = []
     count = 0
 
+    # 0. 증분 반영: 본문이 바뀌지 않은 청크는 건너뛰고, 사라진 청크는 삭제 대상
+    all_chunks = chunks  # 파일의 전체 청크 (통계 반영용)
+    stale_ids = set()
+    unchanged = 0
+    unchanged_chunks = []
+    if replace_file:
+        existing_ids = get_indexed_chunk_ids(replace_file, index_name=index_name)
+        new_ids = {item.get("id") for item in chunks}
+        stale_ids = existing_ids - new_ids
+        unchanged_chunks = [item for item in chunks if item.get("id") in existing_ids]
+        unchanged = len(unchanged_chunks)
+        chunks = [item for item in chunks if item.get("id") not in existing_ids]
+        print(f"[Info] Incremental update for '{replace_file}': {unchanged} unchanged, "
+              f"{len(chunks)} new/changed, {len(stale_ids)} stale")
+        if on_progress and not chunks:
+            on_progress(unchanged, unchanged)
+
     print(f"[Info] Indexing {len(chunks)} chunks to '{target_index}'...")
 
     # Helper functions for type safety
@@ -207,23 +169,29 @@ def index_processed_chunks(chunks: list, index_name: str = None):
             return ""
         return str(value)
 
+    def ensure_payload(value, default):
+        """JSON 성격의 필드(chunkMeta 등)를 문자열로 (이미 문자열이면 그대로)"""
+        return value if isinstance(value, str) else str(default if value is None else value)
+
+    # 1. 임베딩 입력 텍스트 조합 (ingest_data.py와 동일 로직)
+    embedding_inputs = []
     for item in chunks:
-        # ... (기존 임베딩 생성 및 문서 매핑 로직 유지) ...
+        parent_summary = item.get("parentSummary", "")
+        content = item.get("content", "")
+        embedding_inputs.append(f"파일 전체 요약: {parent_summary}\n\n 상세 본문: {content}")
+
+    # 임베딩 생성 (배치 + 동시 처리)
+    vectors = embed_texts(embedding_inputs, on_progress=on_progress)
+
+    for item, vector in zip(chunks, vectors):
         try:
-            # 1. 임베딩 생성 (ingest_data.py와 동일 로직)
-            parent_summary = item.get("parentSummary", "")
-            content = item.get("content", "")
-            
-            # 임베딩 입력 텍스트 조합
-            embedding_input = f"파일 전체 요약: {parent_summary}\n\n 상세 본문: {content}"
-            
-            # 임베딩 생성
-            vector = get_embedding(embedding_input)
-            
             if not vector:
                 print(f"[Warning] Skipping chunk {item.get('id')}: Embedding failed.")
                 continue
 
+            parent_summary = item.get("parentSummary", "")
+            content = item.get("content", "")
+
             # 2. 필드 매핑
             document = {
                 # Core Vector & Content
@@ -255,9 +223,9 @@ def index_processed_chunks(chunks: list, index_name: str = None):
                 "url": ensure_string(item.get("url")),
 
                 # Payload (Stringified JSON)
-                "chunkMeta": ensure_string(item.get("chunkMeta")) if isinstance(item.get("chunkMeta"), str) else str(item.get("chunkMeta", {})),
-                "codeMetadata": ensure_string(item.get("codeMetadata")) if isinstance(item.get("codeMetadata"), str) else str(item.get("codeMetadata", {})),
-                "involvedPeople": ensure_string(item.get("involvedPeople")) if isinstance(item.get("involvedPeople"), str) else str(item.get("involvedPeople", [])),
+                "chunkMeta": ensure_payload(item.get("chunkMeta"), {}),
+                "codeMetadata": ensure_payload(item.get("codeMetadata"), {}),
+                "involvedPeople": ensure_payload(item.get("involvedPeople"), []),
                 "rawCode": ensure_string(item.get("rawCode")),
                 "relatedFiles": ensure_list_str(item.get("relatedFiles"))
             }
@@ -269,43 +237,37 @@ def index_processed_chunks(chunks: list, index_name: str = None):
             print(f"❌ Error preparing chunk {item.get('id')}: {e}")
             traceback.print_exc()
  
-    # 3. 배치 업로드 (자동 인덱스 생성 로직 추가)
+    # 3. 배치 업로드 (크기/개수 기준 분할 + 실패 키 재시도, 인덱스가 사라졌으면 재생성)
+    def upload_all():
+        upload = upload_documents_batched(search_client, documents_batch)
+        if upload["failed"]:
+            index_stats.mark_stale(target_index)
+            print(f"[Warning] {len(upload['failed'])} documents failed to upload: "
+                  f"{dict(list(upload['failed'].items())[:5])}")
+        else:
+            print(f"[Success] Successfully indexed {len(documents_batch)} documents.")
+        return upload["succeeded"]
+
+    # 로컬 백엔드: 로컬 엔진에 기록 (local이면 Azure 업로드 생략)
+    if documents_batch and SEARCH_BACKEND in ("local", "replica"):
+        local_count = get_local_index(target_index).upsert(documents_batch)
+        print(f"[Success] Indexed {local_count} documents to local index '{target_index}'.")
+        if SEARCH_BACKEND == "local":
+            answer_cache.invalidate_index(target_index)
+            count = local_count
+            documents_batch = []
+
     if documents_batch:
         try:
-            result = search_client.upload_documents(documents=documents_batch)
-            if not all(r.succeeded for r in result):
-                print("[Warning] Some documents failed to upload.")
-            else:
-                print(f"[Success] Successfully indexed {len(documents_batch)} documents.")
+            count = upload_all()
         except Exception as e:
-            # 인덱스가 없어서 실패한 경우 (ResourceNotFoundError)
+            # 시작 이후 인덱스가 삭제된 경우 (ResourceNotFoundError): 코드 스키마로 다시 만들고 재시도
             if "The index" in str(e) and "was not found" in str(e):
-                print(f"⚠️ Index not found. Attempting to create index '{AZURE_SEARCH_INDEX_NAME}'...")
+                print(f"⚠️ Index '{target_index}' not found. Recreating from code schema...")
                 try:
-                    # create_index.py 로직을 subprocess로 실행
-                    import subprocess
-                    import sys
-                    import os
-                    
-                    # create_index.py 위치 찾기 (루트 디렉토리 가정)
-                    root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))) # app -> Proto -> proto -> project_root
-                    script_path = os.path.join(root_dir, "create_index.py")
-                    
-                    if not os.path.exists(script_path):
-                        # 경로가 다를 경우 상대 경로 시도
-                        script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../create_index.py"))
-                    
-                    if os.path.exists(script_path):
-                        print(f"   Running index creation script: {script_path}")
-                        subprocess.run([sys.executable, script_path], check=True)
-                        print("✅ Index created. Retrying upload...")
-                        
-                        # 인덱스 생성 후 다시 업로드 시도
-                        result = search_client.upload_documents(documents=documents_batch)
-                        print(f"[Success] Successfully indexed {len(documents_batch)} documents (after creation).")
-                    else:
-                        print(f"❌ Could not find create_index.py at {script_path}")
-                        raise e
+                    index_registry.recreate(target_index)
+                    print("✅ Index created. Retrying upload...")
+                    count = upload_all()
                 except Exception as create_error:
                     print(f"❌ Failed to create index automatically: {create_error}")
                     raise e
@@ -313,26 +275,90 @@ def index_processed_chunks(chunks: list, index_name: str = None):
                 print(f"[Error] Error uploading batch to Search: {e}")
                 traceback.print_exc()
                 raise e
-            
-    return count
-
-def search_documents(query: str, filters: dict = None, top_k: int = 5, index_name: str = None):
+        finally:
+            # 인덱스 내용이 바뀌었으므로 이 인덱스에 대한 캐시된 답변은 폐기
+            answer_cache.invalidate_index(target_index)
+
+    # 새/변경 청크가 모두 반영됐을 때만 이전 버전을 정리 (임베딩 실패로 건너뛴 청크, 업로드 실패 키가 있으면
+    # 기존 청크를 지우지 않고 그대로 둠 → 재업로드 중 스로틀링이 나도 파일이 인덱스에서 사라지지 않음)
+    complete = count >= len(chunks)
+    if not complete:
+        index_stats.mark_stale(target_index)
+        if replace_file and (stale_ids or unchanged_chunks):
+            print(f"[Warning] {len(chunks) - count}/{len(chunks)} new chunks of '{replace_file}' were not indexed. "
+                  f"Keeping the previous version ({len(stale_ids)} old chunks not deleted).")
+
+    # 3-1. 본문이 같아 건너뛴 청크도 파일 공통 필드는 새 버전 값으로 맞춤
+    #      (새 청크와 parentId / parentSummary / chunkMeta 순번이 섞이지 않도록, 본문/벡터는 그대로)
+    if unchanged_chunks and complete:
+        merge_batch = [
+            {
+                "id": item.get("id"),
+                "parentId": ensure_string(item.get("parentId")),
+                "parentSummary": ensure_string(item.get("parentSummary")),
+                "chunkMeta": ensure_payload(item.get("chunkMeta"), {})
+            }
+            for item in unchanged_chunks
+        ]
+        if SEARCH_BACKEND in ("local", "replica"):
+            get_local_index(target_index).merge(merge_batch)
+        if SEARCH_BACKEND != "local":
+            merged = upload_documents_batched(search_client, merge_batch, action="merge")
+            if merged["failed"]:
+                index_stats.mark_stale(target_index)
+                print(f"[Warning] {len(merged['failed'])} unchanged chunks failed to merge: "
+                      f"{dict(list(merged['failed'].items())[:5])}")
+        answer_cache.invalidate_index(target_index)
+
+    # 4. 새 버전에 없는 기존 청크 삭제 (새 청크 업로드 후 삭제하여 검색 공백 방지)
+    if stale_ids and complete:
+        delete_chunks(stale_ids, index_name=index_name)
+        answer_cache.invalidate_index(target_index)
+
+    # 5. 통계 반영 (증분 반영이면 파일의 전체 청크로 교체, 아니면 추가분만)
+    if replace_file:
+        index_stats.record_file(target_index, replace_file, all_chunks)
+    else:
+        index_stats.record_added(target_index, [doc for doc in all_chunks if doc.get("id")])
+
+    return count + unchanged
+
+def search_documents(query: str, filters: dict = None, top_k: int = 5, index_name: str = None, query_embedding: list = None):
     """
     하이브리드 검색 수행 (Vector + Semantic + Keyword)
 
     Args:
         query: 검색 쿼리
-        filters: 필터 조건
+        filters: 필터 조건 (search_filters 형식, 예: {"fileType": "code", "tags": ["배포"]}). 잘못된 필터는 FilterError
         top_k: 반환할 최대 결과 수
         index_name: 검색할 RAG 인덱스 이름 (None이면 기본 인덱스)
+        query_embedding: 미리 계산한 쿼리 임베딩 (None이면 여기서 생성)
     """
     from azure.search.documents.models import VectorizedQuery
 
     target_index = index_name or AZURE_SEARCH_INDEX_NAME
-    print(f"🔍 Searching in index: {target_index}")
+    print(f"🔍 Searching in index: {target_index} ({SEARCH_BACKEND})")
+
+    # 필터 검증은 임베딩/검색 호출 전에 (잘못된 필터는 FilterError로 호출자에게 전달)
+    conditions = parse_filters(filters)
+
+    if query_embedding is None:
+        query_embedding = get_embedding(query)
+
+    # 로컬 엔진 (local: 유일한 저장소 / replica: Azure와 같은 내용의 로컬 사본)
+    if SEARCH_BACKEND in ("local", "replica"):
+        try:
+            filter_sql, filter_params = to_sql(conditions)
+            return get_local_index(target_index).search(
+                query, query_embedding, top_k=top_k, filter_sql=filter_sql, filter_params=filter_params
+            )
+        except Exception as e:
+            print(f"[Error] Local search failed: {e}")
+            traceback.print_exc()
+            if SEARCH_BACKEND == "local":
+                return []
 
     search_client = get_search_client(index_name=index_name)
-    query_embedding = get_embedding(query)
 
     vector_query = VectorizedQuery(
         vector=query_embedding,
@@ -340,11 +366,9 @@ def search_documents(query: str, filters: dict = None, top_k: int = 5, index_nam
         fields="content_vector"
     )
 
-    # 필터 구성 (필요 시 확장)
-    filter_expression = None
-    if filters:
-        # 예: category eq 'Backend'
-        pass
+    # 필터는 키워드/시맨틱 결과와 벡터 검색 모두에 적용
+    # preFilter: k-NN 전에 필터를 적용하므로 필터 결과가 작아도 k개를 채움 (postFilter는 k개 중 걸러져 결과가 줄어듦)
+    filter_expression = to_odata(conditions)
 
     try:
         results = search_client.search(
@@ -352,10 +376,11 @@ def search_documents(query: str, filters: dict = None, top_k: int = 5, index_nam
             vector_queries=[vector_query],
             top=top_k,
             filter=filter_expression,
+            vector_filter_mode="preFilter" if filter_expression else None,
             include_total_count=True,
-            # 시맨틱 설정이 create_index.py에 되어 있으므로 활용
+            # 시맨틱 설정은 코드 스키마(index_schema)에 정의
             query_type="semantic",
-            semantic_configuration_name="my-semantic-config"
+            semantic_configuration_name=SEMANTIC_CONFIGURATION_NAME
         )
 
         docs = []
@@ -379,6 +404,8 @@ def search_documents(query: str, filters: dict = None, top_k: int = 5, index_nam
     
 def get_document_count(index_name: str = None) -> int:
     """AI Search 인덱스의 총 문서 개수 조회"""
+    if SEARCH_BACKEND == "local":
+        return get_local_index(index_name or AZURE_SEARCH_INDEX_NAME).count()
     try:
         search_client = get_search_client(index_name)
         results = search_client.search(
@@ -394,27 +421,98 @@ def get_document_count(index_name: str = None) -> int:
         traceback.print_exc()
         return 0
 
-def get_all_documents() -> list:
-    """AI Search 인덱스의 모든 문서 목록 조회"""
-    try:
-        search_client = get_search_client()
+# 목록 조회 시 가져오는 필드 (벡터 / 긴 본문 필드 제외)
+LIST_FIELDS = ["id", "fileName", "parentId", "fileType", "paraCategory", "processedDate"]
+LIST_CONTENT_FIELDS = ["content"]
+MAX_LIST_PAGE_SIZE = 1000  # AI Search 요청당 최대 top
+MAX_LIST_SKIP = 100000  # AI Search skip 상한 (id가 sortable이 아닌 기존 인덱스에서만 사용)
+
+
+def _id_sortable(index_name: str) -> bool:
+    index = index_registry.ensure(index_name)
+    return any(field.name == "id" and field.sortable for field in (index.fields or []))
+
+
+def list_documents_page(index_name: str = None, limit: int = 100, cursor: dict = None, include_content: bool = False,
+                        fields: list = None):
+    """
+    인덱스 문서(청크)를 id 순으로 한 페이지 조회 (필요한 필드만 select)
+
+    Args:
+        index_name: RAG 인덱스 이름 (None이면 기본 인덱스)
+        limit: 페이지 크기 (최대 1000)
+        cursor: 이전 페이지가 돌려준 커서 ({"after": 마지막 id} 또는 {"skip": n}), None이면 처음부터
+        include_content: True면 content 필드도 포함
+        fields: 가져올 필드 (None이면 LIST_FIELDS, id는 항상 포함)
+
+    Returns:
+        (문서 리스트, 다음 커서 또는 None)
+    """
+    target_index = index_name or AZURE_SEARCH_INDEX_NAME
+    limit = max(1, min(limit, MAX_LIST_PAGE_SIZE))
+    cursor = cursor or {}
+    fields = list(fields or LIST_FIELDS) + (LIST_CONTENT_FIELDS if include_content else [])
+    if "id" not in fields:
+        fields.insert(0, "id")
+
+    if SEARCH_BACKEND in ("local", "replica"):
+        docs = get_local_index(target_index).list_page(after=cursor.get("after"), limit=limit, fields=fields)
+        next_cursor = {"after": docs[-1]["id"]} if len(docs) == limit else None
+        return docs, next_cursor
+
+    search_client = get_search_client(index_name=index_name)
+    if _id_sortable(target_index):
+        # 키셋 페이지네이션: 페이지 위치와 관계없이 요청 비용이 같음
+        after = cursor.get("after")
         results = search_client.search(
             search_text="*",
-            include_total_count=True,
-            top=1000
+            filter="id gt '{}'".format(after.replace("'", "''")) if after else None,
+            order_by=["id asc"],
+            select=fields,
+            top=limit
         )
-        docs = []
-        for result in results:
-            docs.append({
-                "id": result["id"],
-                "file_name": result.get("file_name", "Unknown"),
-                "content_length": len(result.get("content", ""))
-            })
-        print(f"📋 인덱싱된 문서 목록: {len(docs)}개")
-        for doc in docs:
-            print(f"   - {doc['file_name']} (ID: {doc['id']}, 길이: {doc['content_length']})")
-        return docs
+        docs = [{field: result.get(field) for field in fields} for result in results]
+        next_cursor = {"after": docs[-1]["id"]} if len(docs) == limit else None
+    else:
+        # 기존 인덱스 (id가 sortable이 아님): skip 기반, MAX_LIST_SKIP까지만 조회 가능
+        skip = int(cursor.get("skip", 0))
+        if skip >= MAX_LIST_SKIP:
+            raise ValueError(f"Index '{target_index}' cannot be paged past {MAX_LIST_SKIP} documents "
+                             f"(recreate it with a sortable id field)")
+        results = search_client.search(search_text="*", select=fields, skip=skip, top=min(limit, MAX_LIST_SKIP - skip))
+        docs = [{field: result.get(field) for field in fields} for result in results]
+        next_cursor = {"skip": skip + len(docs)} if len(docs) == limit else None
+    return docs, next_cursor
+
+
+def iter_documents(index_name: str = None, page_size: int = MAX_LIST_PAGE_SIZE, include_content: bool = False,
+                   fields: list = None):
+    """인덱스 전체 문서를 페이지 단위로 순회 (한 번에 한 페이지만 메모리에 유지)"""
+    cursor = None
+    while True:
+        docs, cursor = list_documents_page(index_name, page_size, cursor, include_content, fields)
+        yield from docs
+        if cursor is None:
+            return
+
+
+def get_all_documents(index_name: str = None) -> list:
+    """AI Search 인덱스의 파일별 청크 수 조회 (벡터/본문 없이 id 순으로 순회)"""
+    try:
+        files = {}
+        for doc in iter_documents(index_name):
+            file_name = doc.get("fileName") or "Unknown"
+            files[file_name] = files.get(file_name, 0) + 1
+        summary = [{"file_name": name, "chunk_count": count} for name, count in files.items()]
+        print(f"📋 인덱싱된 파일 목록: {len(summary)}개")
+        for item in summary:
+            print(f"   - {item['file_name']} ({item['chunk_count']} chunks)")
+        return summary
     except Exception as e:
         print(f"⚠️  문서 목록 조회 실패: {e}")
         traceback.print_exc()
         return []
+
+def list_indexes() -> list:
+    """사용 가능한 모든 RAG 인덱스 목록 조회 (부트스트랩/백그라운드 갱신된 스키마 캐시 사용)"""
+    return index_registry.list()
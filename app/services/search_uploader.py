@@ -0,0 +1,172 @@
+"""
+Azure AI Search 배치 업로더
+- 직렬화 크기(SEARCH_UPLOAD_MAX_BYTES)와 문서 수(SEARCH_UPLOAD_MAX_DOCS) 기준으로 배치 분할
+- 배치 간 동시 업로드 (SEARCH_UPLOAD_CONCURRENCY)
+- 부분 실패 시 실패한 키만 재시도 (429/5xx 일시 오류와 문서별 409 버전 충돌만, 지수 백오프)
+- 배치별 처리량(문서/초, MB/초) 보고
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import random
+import time
+
+from azure.core.exceptions import HttpResponseError
+
+from app.config import (
+    SEARCH_UPLOAD_MAX_BYTES,
+    SEARCH_UPLOAD_MAX_DOCS,
+    SEARCH_UPLOAD_CONCURRENCY,
+    SEARCH_UPLOAD_MAX_RETRIES
+)
+
+# 재시도할 상태 코드: 스로틀링(429)과 일시적인 서버 오류(5xx)만
+# (400/404/422 등 문서 자체의 문제는 재시도해도 같은 결과이므로 바로 실패로 보고)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# 문서별 결과에서만 추가로 재시도: 409 = 같은 키를 동시에 쓰다가 생긴 버전 충돌
+# ("Version conflict detected when attempting to index this document"), 다시 보내면 성공함
+RETRYABLE_KEY_STATUS_CODES = RETRYABLE_STATUS_CODES | {409}
+
+# 업로드 방식 → SearchClient 메서드 (merge: 기존 문서의 일부 필드만 갱신)
+ACTIONS = {"upload": "upload_documents", "merge": "merge_documents"}
+
+# 요청 본문의 {"value": [...]} 와 문서별 "@search.action" 등 부가 바이트 (대략치)
+BATCH_OVERHEAD_BYTES = 64
+DOCUMENT_OVERHEAD_BYTES = 40
+
+
+def document_size(document: dict) -> int:
+    """문서 하나의 직렬화 크기 (bytes)"""
+    return len(json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")) + DOCUMENT_OVERHEAD_BYTES
+
+
+def split_batches(documents: list, max_bytes: int = None, max_docs: int = None) -> list:
+    """
+    문서를 순서대로 배치로 나눕니다. 각 배치는 max_docs개, max_bytes 바이트를 넘지 않습니다.
+    (문서 하나가 max_bytes보다 크면 그 문서만 단독 배치)
+
+    Returns:
+        [(문서 리스트, 바이트 수), ...]
+    """
+    max_bytes = max_bytes or SEARCH_UPLOAD_MAX_BYTES
+    max_docs = max_docs or SEARCH_UPLOAD_MAX_DOCS
+
+    batches = []
+    current = []
+    current_bytes = BATCH_OVERHEAD_BYTES
+    for document in documents:
+        size = document_size(document)
+        if current and (len(current) >= max_docs or current_bytes + size > max_bytes):
+            batches.append((current, current_bytes))
+            current = []
+            current_bytes = BATCH_OVERHEAD_BYTES
+        current.append(document)
+        current_bytes += size
+    if current:
+        batches.append((current, current_bytes))
+    return batches
+
+
+def _backoff(attempt: int):
+    """지수 백오프 + 지터"""
+    time.sleep(min(2 ** attempt, 30) * 0.5 + random.uniform(0, 0.5))
+
+
+def _upload_batch(search_client, batch_no: int, documents: list, batch_bytes: int, key_field: str, max_retries: int,
+                  action: str = "upload") -> dict:
+    """
+    배치 하나 업로드. 실패한 키만 골라 재시도합니다.
+
+    Returns:
+        {"batch", "documents", "bytes", "succeeded", "failed": {키: 오류}, "attempts", "seconds"}
+    """
+    started = time.time()
+    pending = {document[key_field]: document for document in documents}
+    failed = {}
+    attempts = 0
+    send = getattr(search_client, ACTIONS[action])
+
+    for attempt in range(max_retries + 1):
+        attempts = attempt + 1
+        try:
+            results = send(documents=list(pending.values()))
+        except HttpResponseError as e:
+            # 요청 전체 실패: 일시 오류면 배치 그대로 재시도, 아니면 상위로 전달
+            if e.status_code in RETRYABLE_STATUS_CODES and attempt < max_retries:
+                print(f"   ⏳ Batch {batch_no}: HTTP {e.status_code}, retrying {len(pending)} docs (attempt {attempts})")
+                _backoff(attempt)
+                continue
+            raise
+
+        retry = {}
+        for result in results:
+            if result.succeeded:
+                pending.pop(result.key, None)
+                continue
+            if result.status_code in RETRYABLE_KEY_STATUS_CODES and attempt < max_retries:
+                retry[result.key] = pending[result.key]
+            else:
+                failed[result.key] = f"{result.status_code}: {result.error_message}"
+                pending.pop(result.key, None)
+
+        if not retry:
+            break
+        print(f"   ⏳ Batch {batch_no}: retrying {len(retry)} failed keys (attempt {attempts})")
+        pending = retry
+        _backoff(attempt)
+
+    seconds = time.time() - started
+    succeeded = len(documents) - len(failed)
+    print(f"   📤 Batch {batch_no}: {succeeded}/{len(documents)} docs, {batch_bytes / 1024 / 1024:.2f} MB "
+          f"in {seconds:.2f}s ({succeeded / seconds if seconds else 0:.0f} docs/s, "
+          f"{batch_bytes / 1024 / 1024 / seconds if seconds else 0:.2f} MB/s, {attempts} attempts)")
+    return {
+        "batch": batch_no,
+        "documents": len(documents),
+        "bytes": batch_bytes,
+        "succeeded": succeeded,
+        "failed": failed,
+        "attempts": attempts,
+        "seconds": round(seconds, 3)
+    }
+
+
+def upload_documents_batched(search_client, documents: list, key_field: str = "id", max_bytes: int = None,
+                             max_docs: int = None, concurrency: int = None, max_retries: int = None,
+                             action: str = "upload") -> dict:
+    """
+    문서를 크기/개수 기준 배치로 나누어 동시에 업로드합니다.
+    action="merge"이면 기존 문서의 일부 필드만 갱신합니다 (merge_documents).
+    일시 오류가 아닌 요청 전체 실패(인덱스 없음, 인증 오류 등)는 예외로 전달됩니다.
+
+    Returns:
+        {"succeeded": 성공 문서 수, "failed": {키: 오류}, "batches": [배치별 통계], "seconds": 전체 소요 시간}
+    """
+    concurrency = max(1, concurrency or SEARCH_UPLOAD_CONCURRENCY)
+    max_retries = SEARCH_UPLOAD_MAX_RETRIES if max_retries is None else max_retries
+
+    if not documents:
+        return {"succeeded": 0, "failed": {}, "batches": [], "seconds": 0.0}
+
+    batches = split_batches(documents, max_bytes=max_bytes, max_docs=max_docs)
+    total_bytes = sum(batch_bytes for _, batch_bytes in batches)
+    started = time.time()
+    print(f"📤 Uploading {len(documents)} docs ({total_bytes / 1024 / 1024:.2f} MB) "
+          f"in {len(batches)} batches (concurrency={concurrency})...")
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+        futures = [
+            executor.submit(_upload_batch, search_client, n, batch, batch_bytes, key_field, max_retries, action)
+            for n, (batch, batch_bytes) in enumerate(batches, start=1)
+        ]
+        # 하나라도 요청 전체가 실패하면 예외 전달 (나머지 배치는 완료될 때까지 기다림)
+        stats = [future.result() for future in futures]
+
+    failed = {}
+    for batch_stats in stats:
+        failed.update(batch_stats["failed"])
+    seconds = time.time() - started
+    succeeded = len(documents) - len(failed)
+    print(f"📤 Upload finished: {succeeded}/{len(documents)} docs in {seconds:.2f}s "
+          f"({succeeded / seconds if seconds else 0:.0f} docs/s)")
+    return {"succeeded": succeeded, "failed": failed, "batches": stats, "seconds": round(seconds, 3)}
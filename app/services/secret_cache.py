@@ -0,0 +1,217 @@
+"""
+Key Vault 시크릿 캐시
+- 시크릿별 TTL 동안 메모리에서 응답 (SECRET_CACHE_TTLS로 시크릿마다 다르게 지정 가능)
+- 백그라운드 스레드가 만료 SECRET_REFRESH_AHEAD_SECONDS 전에 미리 갱신 → 요청 경로에서 Key Vault를 기다리지 않음
+- 앱 시작 시 SECRET_PREFETCH 목록을 병렬로 한 번에 가져옴
+- Key Vault에 일시적으로 접근할 수 없으면 만료된 값을 SECRET_MAX_STALE_SECONDS까지 계속 사용
+  (stale-while-revalidate, 갱신은 백그라운드에서 재시도)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import (
+    ENVIRONMENT,
+    SECRET_CACHE_TTL_SECONDS,
+    SECRET_CACHE_TTLS,
+    SECRET_REFRESH_AHEAD_SECONDS,
+    SECRET_REFRESH_CHECK_SECONDS,
+    SECRET_MAX_STALE_SECONDS,
+    SECRET_PREFETCH,
+    fetch_secret
+)
+
+PREFETCH_CONCURRENCY = 8
+
+
+def parse_secret_ttls(value: str) -> dict:
+    """"NAME=600,OTHER=86400" → {"NAME": 600.0, "OTHER": 86400.0} (잘못된 항목은 무시)"""
+    ttls = {}
+    for item in (value or "").split(","):
+        name, _, seconds = item.strip().partition("=")
+        try:
+            ttls[name.strip()] = float(seconds)
+        except ValueError:
+            continue
+    return ttls
+
+
+class _SecretEntry:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.value = None
+        self.fetched_at = None
+        self.expires_at = 0.0
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_error_at = None
+        self.lock = threading.Lock()  # 같은 시크릿 동시 조회는 한 번만 (single-flight)
+
+
+class SecretCache:
+    def __init__(self, fetch=fetch_secret, default_ttl: float = SECRET_CACHE_TTL_SECONDS, ttls: dict = None,
+                 refresh_ahead: float = SECRET_REFRESH_AHEAD_SECONDS, check_interval: float = SECRET_REFRESH_CHECK_SECONDS,
+                 max_stale: float = SECRET_MAX_STALE_SECONDS):
+        self.fetch = fetch
+        self.default_ttl = default_ttl
+        self.ttls = parse_secret_ttls(SECRET_CACHE_TTLS) if ttls is None else ttls
+        self.refresh_ahead = refresh_ahead
+        self.check_interval = check_interval
+        self.max_stale = max_stale
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._refresher = None
+
+    # ----- 조회 -----
+
+    def _entry(self, name: str) -> _SecretEntry:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _SecretEntry(self.ttls.get(name, self.default_ttl))
+            return entry
+
+    def get(self, name: str) -> str:
+        """
+        시크릿 값 (로컬 개발은 .env 우선)
+        1. 유효한 캐시 → 바로 반환
+        2. 만료됐지만 SECRET_MAX_STALE_SECONDS 이내 + 백그라운드 갱신 중 → 이전 값 반환하고 갱신 요청
+        3. 그 외 → Key Vault에서 조회 (실패 시 남은 값이 있으면 그 값, 없으면 개발: "" / 그 외: 예외)
+        """
+        if ENVIRONMENT == "development":
+            env_value = os.getenv(name)
+            if env_value:
+                return env_value
+
+        entry = self._entry(name)
+        now = time.time()
+        if entry.value is not None and now < entry.expires_at:
+            return entry.value
+        if entry.value is not None and self._refresher is not None and now - entry.expires_at < self.max_stale:
+            self._wake.set()
+            return entry.value
+
+        with entry.lock:
+            # 기다리는 동안 다른 스레드가 갱신했으면 그 값 사용
+            if entry.value is not None and time.time() < entry.expires_at:
+                return entry.value
+            if self._refresh_entry(name, entry):
+                return entry.value
+
+        if entry.value is not None and time.time() - entry.expires_at < self.max_stale:
+            print(f"⚠️ Using stale secret {name} (age {time.time() - entry.fetched_at:.0f}s)")
+            return entry.value
+        if ENVIRONMENT == "development":
+            return ""  # 개발 환경에서는 빈 문자열 반환
+        raise Exception(f"필수 시크릿 {name}을(를) 찾을 수 없습니다")
+
+    # ----- 갱신 -----
+
+    def _refresh_entry(self, name: str, entry: _SecretEntry) -> bool:
+        """Key Vault에서 다시 조회해 캐시 갱신. 실패하면 이전 값은 그대로 두고 False"""
+        try:
+            value = self.fetch(name)
+        except Exception as e:
+            entry.failures += 1
+            entry.last_error = str(e)
+            entry.last_error_at = time.time()
+            print(f"⚠️ Key Vault에서 {name} 조회 실패: {e}")
+            return False
+        now = time.time()
+        entry.value = value
+        entry.fetched_at = now
+        entry.expires_at = now + entry.ttl
+        entry.refreshes += 1
+        entry.last_error = None
+        return True
+
+    def refresh(self, name: str) -> bool:
+        entry = self._entry(name)
+        with entry.lock:
+            return self._refresh_entry(name, entry)
+
+    def prefetch(self, names=None) -> dict:
+        """
+        시크릿 목록을 병렬로 한 번에 가져옴 (기본: SECRET_PREFETCH)
+        로컬 개발에서 .env에 있는 값은 Key Vault를 조회하지 않음
+        """
+        if names is None:
+            names = [name.strip() for name in SECRET_PREFETCH.split(",") if name.strip()]
+        if ENVIRONMENT == "development":
+            names = [name for name in names if not os.getenv(name)]
+        if not names:
+            return {}
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(PREFETCH_CONCURRENCY, len(names)), thread_name_prefix="secret-prefetch") as pool:
+            results = dict(zip(names, pool.map(self.refresh, names)))
+        loaded = sum(1 for ok in results.values() if ok)
+        print(f"🔐 Prefetched {loaded}/{len(names)} secrets ({time.perf_counter() - started:.2f}s)")
+        return results
+
+    def _due(self) -> list:
+        """만료 refresh_ahead초 전에 들어선 시크릿 (실패한 시크릿도 매 주기 재시도)"""
+        now = time.time()
+        with self._lock:
+            return [
+                name for name, entry in self._entries.items()
+                if entry.value is not None and entry.expires_at - now <= self.refresh_ahead
+            ]
+
+    def start(self):
+        """백그라운드 갱신 스레드 시작"""
+        if self._refresher is not None:
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="secret-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._refresher = None
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            for name in self._due():
+                self.refresh(name)
+
+    # ----- 상태 -----
+
+    def stats(self) -> dict:
+        """시크릿별 캐시 나이 / 만료까지 남은 시간 / 실패 기록 (값은 포함하지 않음)"""
+        now = time.time()
+        with self._lock:
+            entries = dict(self._entries)
+        secrets = {}
+        for name, entry in sorted(entries.items()):
+            cached = entry.fetched_at is not None
+            secrets[name] = {
+                "cached": cached,
+                "age_seconds": round(now - entry.fetched_at, 1) if cached else None,
+                "ttl_seconds": entry.ttl,
+                "expires_in_seconds": round(entry.expires_at - now, 1) if cached else None,
+                "stale": cached and now >= entry.expires_at,
+                "refreshes": entry.refreshes,
+                "failures": entry.failures,
+                "last_error": entry.last_error,
+                "last_error_at": entry.last_error_at
+            }
+        return {
+            "background_refresh": self._refresher is not None,
+            "refresh_ahead_seconds": self.refresh_ahead,
+            "max_stale_seconds": self.max_stale,
+            "secrets": secrets
+        }
+
+
+# 전역 인스턴스
+secret_cache = SecretCache()
@@ -0,0 +1,149 @@
+"""
+긴 문서를 LLM 전처리용 구간(segment)으로 분할
+- 문서: 페이지 구분(\f), 제목(마크다운 #, "제N장/절/조", "1.", "1.1", "Ⅰ." 등)에서 분할
+- 코드: 최상위 함수/클래스 정의에서 분할
+- 구조적 경계만으로 max_chars를 넘는 구간은 빈 줄 → 줄 → 글자 수 순으로 다시 분할
+- 각 구간은 원문 순서와 시작 줄 번호를 유지 (코드 청크의 startLine 보정용)
+"""
+
+import re
+
+from app.config import ANALYZE_SEGMENT_MAX_CHARS
+
+PAGE_BREAK = "\f"
+
+DOC_HEADING_PATTERN = re.compile(
+    r"^\s*("
+    r"#{1,6}\s+\S"                                  # 마크다운 제목
+    r"|제\s*\d+\s*[장절조편부]"                       # 제1장, 제 3 조
+    r"|[IVXⅠ-Ⅻ]+\.\s+\S"                             # Ⅰ. 개요
+    r"|\d+(\.\d+){0,2}\.?\s+\S.{0,60}$"              # 1. 개요 / 1.2 범위 (짧은 줄만)
+    r"|\[[^\]]{1,40}\]\s*$"                          # [회의 개요]
+    r")"
+)
+
+CODE_DEFINITION_PATTERN = re.compile(
+    r"^("
+    r"(async\s+)?def\s+\w+"
+    r"|class\s+\w+"
+    r"|(export\s+)?(default\s+)?(async\s+)?function\s*\*?\s*\w*"
+    r"|export\s+(const|class|interface|type|enum)\s+\w+"
+    r"|(public|private|protected|internal)\s+(static\s+)?[\w<>\[\],\s]*\s(class|interface|enum|record|\w+\s*\()"
+    r"|@\w+"                                         # 데코레이터/어노테이션 (바로 아래 정의와 함께 이동)
+    r")"
+)
+
+
+class Segment:
+    def __init__(self, index: int, text: str, start_line: int):
+        self.index = index
+        self.text = text
+        self.start_line = start_line  # 원문 기준 1부터 시작
+
+    def __repr__(self):
+        return f"Segment(index={self.index}, start_line={self.start_line}, chars={len(self.text)})"
+
+
+def _is_boundary(line: str, prev_line: str, file_type: str) -> bool:
+    if line.startswith(PAGE_BREAK):
+        return True
+    if file_type == "code":
+        # 데코레이터 바로 다음 정의는 데코레이터와 같은 구간에 둠
+        if prev_line.startswith("@"):
+            return False
+        return bool(CODE_DEFINITION_PATTERN.match(line))
+    return bool(DOC_HEADING_PATTERN.match(line))
+
+
+def _split_oversized(lines: list, start_line: int, max_chars: int) -> list:
+    """구조적 경계 하나가 max_chars보다 클 때: 빈 줄 → 줄 → 글자 수 기준으로 분할"""
+    pieces = []
+    current = []
+    current_len = 0
+    current_start = start_line
+
+    def flush():
+        nonlocal current, current_len, current_start
+        if current:
+            pieces.append((current_start, current))
+        current_start += len(current)
+        current = []
+        current_len = 0
+
+    for line in lines:
+        line_len = len(line) + 1
+        if line_len > max_chars:
+            # 한 줄 자체가 너무 긴 경우 (줄바꿈 없는 OCR 결과 등)
+            flush()
+            for offset in range(0, len(line), max_chars):
+                pieces.append((current_start, [line[offset:offset + max_chars]]))
+            current_start += 1
+            continue
+        if current and current_len + line_len > max_chars:
+            # 가능하면 마지막 빈 줄(문단 경계)에서 자름
+            cut = max((i for i, l in enumerate(current) if not l.strip()), default=-1)
+            if cut > 0:
+                carry = current[cut + 1:]
+                current = current[:cut + 1]
+                flush()
+                current = carry
+                current_len = sum(len(l) + 1 for l in carry)
+            else:
+                flush()
+        current.append(line)
+        current_len += line_len
+    flush()
+    return pieces
+
+
+def split_into_segments(text: str, file_type: str = "doc", max_chars: int = None) -> list:
+    """
+    텍스트를 max_chars 이하의 구간 리스트로 분할합니다.
+    max_chars 이하의 텍스트는 구간 하나로 그대로 반환합니다.
+    """
+    max_chars = max_chars or ANALYZE_SEGMENT_MAX_CHARS
+    if len(text) <= max_chars:
+        return [Segment(0, text, 1)]
+
+    lines = text.split("\n")
+
+    # 1. 구조적 경계(제목/페이지/정의)로 블록 분할
+    blocks = []
+    block_start = 0
+    for i in range(1, len(lines)):
+        if _is_boundary(lines[i], lines[i - 1], file_type):
+            blocks.append((block_start, lines[block_start:i]))
+            block_start = i
+    blocks.append((block_start, lines[block_start:]))
+
+    # 2. max_chars를 넘는 블록은 더 작게 분할
+    pieces = []
+    for start, block_lines in blocks:
+        block_len = sum(len(l) + 1 for l in block_lines)
+        if block_len > max_chars:
+            pieces.extend(_split_oversized(block_lines, start + 1, max_chars))
+        else:
+            pieces.append((start + 1, block_lines))
+
+    # 3. 인접 블록을 max_chars까지 묶어 LLM 호출 수를 줄임
+    segments = []
+    current = []
+    current_len = 0
+    current_start = 1
+    for start, piece_lines in pieces:
+        piece_len = sum(len(l) + 1 for l in piece_lines)
+        if current and current_len + piece_len > max_chars:
+            segments.append(Segment(len(segments), "\n".join(current), current_start))
+            current = []
+            current_len = 0
+        if not current:
+            current_start = start
+        current.extend(piece_lines)
+        current_len += piece_len
+    if current:
+        segments.append(Segment(len(segments), "\n".join(current), current_start))
+
+    segments = [segment for segment in segments if segment.text.strip()] or [Segment(0, text, 1)]
+    for i, segment in enumerate(segments):
+        segment.index = i
+    return segments
@@ -0,0 +1,11 @@
+"""Server-Sent Events 포맷 유틸리티"""
+
+import json
+
+
+def format_sse(event: str, data: dict) -> str:
+    """SSE 이벤트 한 건을 문자열로 변환 (data는 JSON)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
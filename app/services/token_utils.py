@@ -0,0 +1,45 @@
+"""
+토큰 수 추정 유틸리티
+tiktoken이 설치되어 있으면 정확히 계산하고, 없으면 문자 종류별 근사치를 사용합니다.
+"""
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수 추정
+    - ASCII: 약 4글자당 1토큰
+    - 한글 등 비ASCII: 약 1글자당 1토큰 (보수적으로 계산)
+    """
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    non_ascii_chars = len(text) - ascii_chars
+    return ascii_chars // 4 + non_ascii_chars + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """토큰 추정치가 max_tokens를 넘지 않도록 텍스트 뒷부분을 잘라냄"""
+    if not text:
+        return text
+    if _encoding is not None:
+        tokens = _encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return _encoding.decode(tokens[:max_tokens])
+
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 비율로 대략 자른 뒤 한도 안에 들어올 때까지 줄임
+    end = int(len(text) * max_tokens / estimate_tokens(text))
+    while end > 0 and estimate_tokens(text[:end]) > max_tokens:
+        end = int(end * 0.9)
+    return text[:end]
@@ -0,0 +1,115 @@
+"""
+업로드 스풀 파일
+요청 본문을 청크 단위로 임시 파일에 기록하면서 sha256을 함께 계산합니다.
+이후 단계(Blob 업로드, 텍스트 추출)는 bytes 대신 파일 스트림이나 mmap으로 읽으므로
+큰 파일 여러 개가 동시에 올라와도 워커 메모리에 파일 전체가 오래 남지 않습니다.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from app.config import UPLOAD_SPOOL_DIR, UPLOAD_SPOOL_CHUNK_BYTES, UPLOAD_MAX_BYTES
+from app.services.executor import run_blocking
+
+
+class UploadTooLargeError(ValueError):
+    def __init__(self, limit: int):
+        super().__init__(f"File exceeds upload limit ({limit} bytes)")
+        self.limit = limit
+
+
+# 아직 삭제되지 않은 스풀 파일 (종료 시 대기열에서 포기한 작업의 파일 정리용)
+_live_paths = set()
+_live_lock = threading.Lock()
+
+
+class SpooledUpload:
+    """임시 파일로 저장된 업로드 (경로, 크기, sha256)"""
+
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def open(self):
+        """읽기용 파일 스트림 (Blob 스트리밍 업로드, docx 파서용)"""
+        return open(self.path, "rb")
+
+    @contextmanager
+    def mapped(self):
+        """
+        읽기 전용 mmap (bytes처럼 슬라이스/정규식 검색 가능, 페이지 단위로 필요할 때만 읽힘)
+        빈 파일은 mmap할 수 없으므로 b"" 반환
+        """
+        if self.size == 0:
+            yield b""
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+    def read_bytes(self) -> bytes:
+        """파일 전체 (텍스트/코드 파일 디코딩용, 호출한 단계에서만 잠깐 유지)"""
+        with self.open() as f:
+            return f.read()
+
+    def remove(self):
+        with _live_lock:
+            _live_paths.discard(self.path)
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def remove_all_spools() -> int:
+    """남아 있는 스풀 파일 모두 삭제 (앱 종료 시 drain 이후 호출)"""
+    with _live_lock:
+        paths = list(_live_paths)
+        _live_paths.clear()
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return len(paths)
+
+
+def _write_chunk(out, digest, chunk: bytes):
+    digest.update(chunk)
+    out.write(chunk)
+
+
+async def spool_upload(upload, max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    """
+    UploadFile → 임시 파일 (UPLOAD_SPOOL_CHUNK_BYTES씩 읽으며 해시 계산)
+    해시 계산과 디스크 쓰기는 청크마다 스레드 풀에서 실행 (이벤트 루프를 막지 않도록)
+    max_bytes를 넘으면 지금까지 쓴 파일을 지우고 UploadTooLargeError
+    """
+    if UPLOAD_SPOOL_DIR:
+        os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=".part", dir=UPLOAD_SPOOL_DIR or None)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_SPOOL_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                await run_blocking(_write_chunk, out, digest, chunk)
+    except BaseException:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        raise
+    with _live_lock:
+        _live_paths.add(path)
+    return SpooledUpload(path, size, digest.hexdigest())
@@ -1,33 +1,332 @@
-# 간단한 인메모리 상태 저장소
-# 실무에서는 Redis 등을 사용하지만 MVP에서는 메모리로 충분함
+# 업로드 작업 상태 저장소
+# - memory: 프로세스 내 dict (단일 워커, 기본값)
+# - sqlite: 같은 서버의 여러 uvicorn 워커가 하나의 DB 파일을 공유
+# 진행률 업데이트는 로컬에 모아두었다가 TASK_FLUSH_INTERVAL마다 한 번에 저장하고,
+# 완료/실패 등 상태 변경은 즉시 저장합니다. 완료된 작업은 TASK_TTL_SECONDS 후 삭제됩니다.
+# subscribe()로 작업 상태 변경을 push 받을 수 있습니다 (SSE 스트림용).
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+from app.config import TASK_STATE_BACKEND, TASK_STATE_DB_PATH, TASK_TTL_SECONDS, TASK_FLUSH_INTERVAL
+
+TERMINAL_STATUSES = {"completed", "completed_with_warning", "failed"}
+
+
+class InMemoryTaskStore:
+    """프로세스 내 메모리 저장소"""
 
-class TaskManager:
     def __init__(self):
-        self.tasks = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def save_many(self, tasks: dict):
+        with self._lock:
+            for task_id, task in tasks.items():
+                self._tasks[task_id] = json.loads(json.dumps(task))
+
+    def load(self, task_id: str):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return json.loads(json.dumps(task)) if task else None
+
+    def delete(self, task_id: str):
+        with self._lock:
+            self._tasks.pop(task_id, None)
+
+    def evict_expired(self, before: float) -> int:
+        with self._lock:
+            expired = [
+                task_id for task_id, task in self._tasks.items()
+                if task.get("finished_at") and task["finished_at"] < before
+            ]
+            for task_id in expired:
+                del self._tasks[task_id]
+            return len(expired)
+
+
+class SqliteTaskStore:
+    """SQLite 파일 저장소 (같은 서버의 여러 워커 프로세스가 공유)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    finished_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_finished_at ON tasks(finished_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # 스레드별 연결 재사용 (sqlite3 연결은 스레드 간 공유 불가)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save_many(self, tasks: dict):
+        rows = [
+            (task_id, json.dumps(task, ensure_ascii=False), task.get("updated_at", time.time()), task.get("finished_at"))
+            for task_id, task in tasks.items()
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO tasks (task_id, data, updated_at, finished_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def load(self, task_id: str):
+        row = self._connect().execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, task_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def evict_expired(self, before: float) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM tasks WHERE finished_at IS NOT NULL AND finished_at < ?", (before,))
+            return cursor.rowcount
+
+
+class TaskSubscription:
+    """
+    작업 하나에 대한 구독 (최신 상태만 유지)
+    발행자는 워커 스레드, 구독자는 이벤트 루프이므로 call_soon_threadsafe로 전달합니다.
+    여러 번 갱신되어도 구독자가 읽기 전이면 마지막 상태 하나로 합쳐집니다.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self._event = asyncio.Event()
+        self._snapshot = None
+
+    def publish(self, snapshot: dict):
+        self.loop.call_soon_threadsafe(self._set, snapshot)
+
+    def _set(self, snapshot: dict):
+        self._snapshot = snapshot
+        self._event.set()
+
+    async def next(self) -> dict:
+        """다음 상태 변경까지 대기"""
+        await self._event.wait()
+        self._event.clear()
+        return self._snapshot
+
+
+def create_task_store(backend: str = TASK_STATE_BACKEND):
+    if backend == "sqlite":
+        print(f"🗂️ Task state backend: sqlite ({TASK_STATE_DB_PATH})")
+        return SqliteTaskStore(TASK_STATE_DB_PATH)
+    return InMemoryTaskStore()
+
+
+class TaskManager:
+    def __init__(self, store=None, flush_interval: float = TASK_FLUSH_INTERVAL, ttl_seconds: int = TASK_TTL_SECONDS):
+        self.store = store or create_task_store()
+        self.flush_interval = flush_interval
+        self.ttl_seconds = ttl_seconds
+        # 이 프로세스가 처리 중인 작업의 최신 상태 (저장소보다 앞설 수 있음)
+        self._local = {}
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self._last_eviction = time.time()
+        self._flusher = None
+        # task_id -> 구독 목록, 다른 워커 작업의 마지막 updated_at
+        self._subscribers = {}
+        self._remote_seen = {}
+
+    # ----- 작업 생성 / 갱신 -----
 
     def create_task(self, task_id: str):
-        self.tasks[task_id] = {
-            "status": "pending",
-            "progress": 0,
-            "message": "Initializing...",
-            "details": []
-        }
+        now = time.time()
+        with self._lock:
+            self._local[task_id] = {
+                "status": "pending",
+                "stage": "queued",
+                "progress": 0,
+                "message": "Initializing...",
+                "details": [],
+                "created_at": now,
+                "updated_at": now,
+                "finished_at": None
+            }
+            self._dirty.add(task_id)
+        # 다른 워커에서도 바로 조회되도록 생성은 즉시 저장
+        self.flush()
+        self._ensure_flusher()
 
-    def update_task(self, task_id: str, status: str = None, progress: int = None, message: str = None):
-        if task_id in self.tasks:
+    def update_task(self, task_id: str, status: str = None, progress: int = None, message: str = None, stage: str = None):
+        with self._lock:
+            task = self._local.get(task_id)
+            if task is None:
+                return
+            status_changed = bool(status) and status != task["status"]
             if status:
-                self.tasks[task_id]["status"] = status
+                task["status"] = status
+                if status in TERMINAL_STATUSES:
+                    task["finished_at"] = time.time()
+                    task["stage"] = "done"
+            if stage:
+                task["stage"] = stage
             if progress is not None:
-                self.tasks[task_id]["progress"] = progress
+                task["progress"] = progress
             if message:
-                self.tasks[task_id]["message"] = message
+                task["message"] = message
+            task["updated_at"] = time.time()
+            self._dirty.add(task_id)
+            snapshot = self._public(task)
+
+        self._publish(task_id, snapshot)
+        # 상태 변경은 즉시, 진행률/메시지는 flush_interval마다 모아서 저장
+        if status_changed:
+            self.flush()
 
     def add_detail(self, task_id: str, detail: str):
-        if task_id in self.tasks:
-            self.tasks[task_id]["details"].append(detail)
+        with self._lock:
+            task = self._local.get(task_id)
+            if task is None:
+                return
+            task["details"].append(detail)
+            task["updated_at"] = time.time()
+            self._dirty.add(task_id)
+            snapshot = self._public(task)
+
+        self._publish(task_id, snapshot)
+
+    def delete_task(self, task_id: str):
+        with self._lock:
+            self._local.pop(task_id, None)
+            self._dirty.discard(task_id)
+        self.store.delete(task_id)
 
     def get_task(self, task_id: str):
-        return self.tasks.get(task_id, None)
+        with self._lock:
+            task = self._local.get(task_id)
+            if task is not None:
+                return self._public(task)
+        # 다른 워커가 처리 중인 작업은 저장소에서 조회
+        task = self.store.load(task_id)
+        return self._public(task) if task else None
+
+    @staticmethod
+    def _public(task: dict) -> dict:
+        return {
+            "status": task["status"],
+            "stage": task.get("stage"),
+            "progress": task["progress"],
+            "message": task["message"],
+            "details": list(task["details"]),
+            "updated_at": task.get("updated_at")
+        }
+
+    # ----- 상태 변경 구독 -----
+
+    def subscribe(self, task_id: str) -> TaskSubscription:
+        """현재 이벤트 루프에서 작업 상태 변경을 받을 구독 생성"""
+        subscription = TaskSubscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(task_id, set()).add(subscription)
+        self._ensure_flusher()
+        return subscription
+
+    def unsubscribe(self, task_id: str, subscription: TaskSubscription):
+        with self._lock:
+            subscribers = self._subscribers.get(task_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[task_id]
+                    self._remote_seen.pop(task_id, None)
+
+    def _publish(self, task_id: str, snapshot: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(task_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.publish(snapshot)
+            except RuntimeError:
+                # 구독자의 이벤트 루프가 이미 종료됨
+                self.unsubscribe(task_id, subscription)
+
+    def _poll_remote_subscriptions(self):
+        """
+        다른 워커 프로세스가 처리 중인 작업(sqlite 공유)의 구독자에게 변경 사항 전달.
+        연결마다 타이머를 두지 않고, 프로세스당 이 루프 하나가 모든 구독을 처리합니다.
+        """
+        with self._lock:
+            remote_ids = [task_id for task_id in self._subscribers if task_id not in self._local]
+        for task_id in remote_ids:
+            task = self.store.load(task_id)
+            if not task or task.get("updated_at") == self._remote_seen.get(task_id):
+                continue
+            self._remote_seen[task_id] = task.get("updated_at")
+            self._publish(task_id, self._public(task))
+
+    # ----- 저장 / 정리 -----
+
+    def flush(self):
+        """변경된 작업 상태를 저장소에 한 번에 기록"""
+        with self._lock:
+            if not self._dirty:
+                return
+            batch = {task_id: json.loads(json.dumps(self._local[task_id])) for task_id in self._dirty if task_id in self._local}
+            self._dirty.clear()
+            # 저장 후에는 로컬 사본이 필요 없는 완료된 작업 정리
+            for task_id, task in batch.items():
+                if task["status"] in TERMINAL_STATUSES:
+                    self._local.pop(task_id, None)
+        try:
+            self.store.save_many(batch)
+        except Exception as e:
+            print(f"⚠️ Task state flush failed: {e}")
+            with self._lock:
+                for task_id, task in batch.items():
+                    self._local.setdefault(task_id, task)
+                    self._dirty.add(task_id)
+
+    def evict_expired(self) -> int:
+        """TTL이 지난 완료 작업 삭제"""
+        removed = self.store.evict_expired(time.time() - self.ttl_seconds)
+        if removed:
+            print(f"🗂️ Evicted {removed} expired tasks")
+        return removed
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="task-state-flusher", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+                if self._subscribers:
+                    self._poll_remote_subscriptions()
+                if time.time() - self._last_eviction >= min(60, self.ttl_seconds):
+                    self._last_eviction = time.time()
+                    self.evict_expired()
+            except Exception as e:
+                print(f"⚠️ Task state flusher error: {e}")
+
 
 # 전역 인스턴스
-task_manager = TaskManager()
\ No newline at end of file
+task_manager = TaskManager()
@@ -218,7 +218,7 @@ const App: React.FC = () => {
         );
         try {
           const response = await fetchWithRetry(
-            API_ENDPOINTS.DOCUMENTS,
+            `${API_ENDPOINTS.DOCUMENTS}?include_content=true&limit=100`,
             {
               headers: getAuthHeaders(), // ← 토큰 포함
             }
@@ -0,0 +1,140 @@
+# load_test_health.py
+# 긴 채팅 응답이 처리되는 동안 /api/health 지연 시간이 일정하게 유지되는지 확인하는 부하 테스트
+#
+# 실제 Azure 호출 대신 search_documents / chat_with_context를 time.sleep으로 대체하고,
+# 앱을 같은 프로세스(ASGI)로 띄워 측정합니다. 외부 서비스나 서버 실행이 필요 없습니다.
+#
+# 실행:
+#   python load_test_health.py                # 현재 구현 측정
+#   python load_test_health.py --compare      # 이벤트 루프에서 직접 호출하던 기존 방식과 비교
+#   python load_test_health.py --chats 16 --chat-delay 3
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+import app.routers.chat as chat_router
+import app.services.executor as executor
+from app.services.answer_cache import answer_cache
+from app.main import app
+from app.routers.auth import create_access_token, create_csrf_token
+
+
+def fake_get_embedding(text):
+    time.sleep(0.05)  # 임베딩 왕복
+    return [0.0] * 8
+
+
+def fake_search_documents(query, filters=None, top_k=5, index_name=None, **kwargs):
+    time.sleep(0.15)  # 검색 왕복
+    return [{"id": "1", "fileName": "sample.docx", "content": "인수인계 샘플 문서", "chunkSummary": "", "parentSummary": ""}]
+
+
+def make_fake_chat(delay: float):
+    def fake_chat_with_context(query, context, *args, **kwargs):
+        time.sleep(delay)  # 긴 GPT-4o 응답
+        return "샘플 응답"
+    return fake_chat_with_context
+
+
+async def run_inline(func, *args, **kwargs):
+    """기존 방식: 이벤트 루프에서 동기 함수를 그대로 호출"""
+    return func(*args, **kwargs)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def measure(chats: int, chat_delay: float, probe_interval: float) -> dict:
+    email = "user1@company.com"
+    token = create_access_token(email=email, name="부하테스트", role="employee")
+    csrf = create_csrf_token(email)
+    headers = {"Authorization": f"Bearer {token}", "X-CSRF-Token": csrf}
+    payload = {"messages": [{"role": "user", "content": "인수자가 누구인가요?"}]}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        async def probe_health(stop: asyncio.Event, samples: list):
+            while not stop.is_set():
+                started = time.perf_counter()
+                response = await client.get("/api/health")
+                samples.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200
+                await asyncio.sleep(probe_interval)
+
+        # 1) 부하 없는 상태의 기준 지연
+        baseline = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(stop, baseline))
+        await asyncio.sleep(1.0)
+        stop.set()
+        await probe
+
+        # 2) 긴 채팅 요청을 동시에 보내면서 health 지연 측정
+        loaded = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(stop, loaded))
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[client.post("/api/chat", json=payload, headers=headers) for _ in range(chats)])
+        chat_elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    if failed:
+        raise RuntimeError(f"chat requests failed: {failed}")
+
+    return {
+        "baseline_p50": statistics.median(baseline),
+        "loaded_p50": statistics.median(loaded),
+        "loaded_p95": percentile(loaded, 95),
+        "loaded_max": max(loaded),
+        "samples": len(loaded),
+        "chat_elapsed": chat_elapsed,
+    }
+
+
+def print_report(label: str, result: dict, chats: int):
+    print(f"\n=== {label} ===")
+    print(f"  health p50 (부하 없음): {result['baseline_p50']:.1f} ms")
+    print(f"  health p50 (부하 중):   {result['loaded_p50']:.1f} ms")
+    print(f"  health p95 (부하 중):   {result['loaded_p95']:.1f} ms")
+    print(f"  health max (부하 중):   {result['loaded_max']:.1f} ms  (샘플 {result['samples']}개)")
+    print(f"  채팅 {chats}건 완료 시간: {result['chat_elapsed']:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/api/health latency under long-running chat load")
+    parser.add_argument("--chats", type=int, default=8, help="동시에 보낼 채팅 요청 수")
+    parser.add_argument("--chat-delay", type=float, default=2.0, help="채팅 응답 1건의 지연 (초)")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="health 체크 간격 (초)")
+    parser.add_argument("--max-p95-ms", type=float, default=250.0, help="허용할 health p95 지연 (ms)")
+    parser.add_argument("--compare", action="store_true", help="기존(이벤트 루프 블로킹) 방식도 함께 측정")
+    args = parser.parse_args()
+
+    chat_router.get_embedding = fake_get_embedding
+    chat_router.search_documents = fake_search_documents
+    # 같은 질문을 반복하므로 답변 캐시를 끄고 매번 GPT 호출 지연을 재현
+    answer_cache.max_entries = 0
+    chat_router.chat_with_context = make_fake_chat(args.chat_delay)
+
+    result = asyncio.run(measure(args.chats, args.chat_delay, args.probe_interval))
+    print_report("스레드 풀 오프로딩 (현재)", result, args.chats)
+
+    if args.compare:
+        chat_router.run_blocking = run_inline
+        blocking = asyncio.run(measure(args.chats, args.chat_delay, args.probe_interval))
+        chat_router.run_blocking = executor.run_blocking
+        print_report("이벤트 루프에서 직접 호출 (기존)", blocking, args.chats)
+
+    if result["loaded_p95"] > args.max_p95_ms:
+        print(f"\n❌ health p95 {result['loaded_p95']:.1f} ms > {args.max_p95_ms} ms")
+        sys.exit(1)
+    print(f"\n✅ health p95 {result['loaded_p95']:.1f} ms <= {args.max_p95_ms} ms")
@@ -0,0 +1,155 @@
+# test_search_uploader.py
+# Azure Search 배치 업로더 테스트 (가짜 SearchClient 사용, 외부 서비스 불필요)
+#
+# 실행:
+#   python test_search_uploader.py
+#   (pytest가 있다면 pytest test_search_uploader.py 도 가능)
+
+import types
+
+from azure.core.exceptions import HttpResponseError
+
+import app.services.search_uploader as search_uploader
+from app.services.search_uploader import split_batches, upload_documents_batched, document_size
+
+# 테스트에서는 백오프 대기 없이 실행
+search_uploader._backoff = lambda attempt: None
+
+
+class FakeSearchClient:
+    """
+    upload_documents 호출을 기록하는 가짜 클라이언트
+    - fail_keys: {키: 실패시킬 횟수} (문서별 429)
+    - fail_requests: 요청 전체를 HTTP 503으로 실패시킬 횟수
+    - bad_keys: 재시도해도 소용없는 400 오류 키
+    - status_keys: {키: [상태 코드, ...]} 호출마다 앞에서부터 하나씩 실패 상태로 반환 (다 쓰면 성공)
+    - request_status: 요청 전체 실패 시 상태 코드 (기본 503)
+    """
+
+    def __init__(self, fail_keys=None, fail_requests=0, bad_keys=(), status_keys=None, request_status=503):
+        self.fail_keys = dict(fail_keys or {})
+        self.fail_requests = fail_requests
+        self.bad_keys = set(bad_keys)
+        self.status_keys = {key: list(codes) for key, codes in (status_keys or {}).items()}
+        self.request_status = request_status
+        self.calls = []
+        self.stored = {}
+
+    def upload_documents(self, documents):
+        self.calls.append([d["id"] for d in documents])
+        if self.fail_requests > 0:
+            self.fail_requests -= 1
+            error = HttpResponseError(message="Request failed")
+            error.status_code = self.request_status
+            raise error
+
+        results = []
+        for d in documents:
+            key = d["id"]
+            if key in self.bad_keys:
+                results.append(types.SimpleNamespace(key=key, succeeded=False, status_code=400, error_message="bad field"))
+            elif self.status_keys.get(key):
+                code = self.status_keys[key].pop(0)
+                results.append(types.SimpleNamespace(key=key, succeeded=False, status_code=code, error_message=f"HTTP {code}"))
+            elif self.fail_keys.get(key, 0) > 0:
+                self.fail_keys[key] -= 1
+                results.append(types.SimpleNamespace(key=key, succeeded=False, status_code=429, error_message="throttled"))
+            else:
+                self.stored[key] = d
+                results.append(types.SimpleNamespace(key=key, succeeded=True, status_code=201, error_message=None))
+        return results
+
+
+def make_documents(count, vector_size=3072):
+    return [{"id": f"doc-{i}", "content": f"본문 {i}", "content_vector": [0.123456] * vector_size} for i in range(count)]
+
+
+def test_split_by_document_count():
+    documents = make_documents(25, vector_size=4)
+    batches = split_batches(documents, max_bytes=10 * 1024 * 1024, max_docs=10)
+    assert [len(batch) for batch, _ in batches] == [10, 10, 5]
+    assert [d["id"] for batch, _ in batches for d in batch] == [d["id"] for d in documents]
+
+
+def test_split_by_bytes():
+    documents = make_documents(20)
+    one = document_size(documents[0])
+    batches = split_batches(documents, max_bytes=one * 3 + 100, max_docs=1000)
+    assert all(len(batch) <= 3 for batch, _ in batches)
+    assert all(batch_bytes <= one * 3 + 100 for _, batch_bytes in batches)
+    assert sum(len(batch) for batch, _ in batches) == 20
+
+
+def test_oversized_document_gets_own_batch():
+    documents = make_documents(3)
+    batches = split_batches(documents, max_bytes=100, max_docs=1000)
+    assert [len(batch) for batch, _ in batches] == [1, 1, 1]
+
+
+def test_retry_only_failed_keys():
+    client = FakeSearchClient(fail_keys={"doc-3": 2, "doc-7": 1})
+    result = upload_documents_batched(client, make_documents(10, vector_size=4), max_docs=5, concurrency=1)
+    assert result["succeeded"] == 10 and not result["failed"]
+    assert len(client.stored) == 10
+    # 첫 배치(0~4): doc-3만 두 번 재시도 / 두 번째 배치(5~9): doc-7만 한 번 재시도
+    assert client.calls[1] == ["doc-3"] and client.calls[2] == ["doc-3"]
+    assert client.calls[4] == ["doc-7"]
+    assert len(client.calls) == 5
+
+
+def test_whole_request_retry_on_503():
+    client = FakeSearchClient(fail_requests=2)
+    result = upload_documents_batched(client, make_documents(4, vector_size=4), concurrency=1)
+    assert result["succeeded"] == 4
+    assert len(client.calls) == 3
+
+
+def test_non_retryable_and_exhausted_keys_reported():
+    client = FakeSearchClient(fail_keys={"doc-1": 99}, bad_keys={"doc-2"})
+    result = upload_documents_batched(client, make_documents(5, vector_size=4), concurrency=2, max_retries=2)
+    assert result["succeeded"] == 3
+    assert set(result["failed"]) == {"doc-1", "doc-2"}
+    # 400 키는 재시도하지 않음
+    assert sum(call.count("doc-2") for call in client.calls) == 1
+    assert sum(call.count("doc-1") for call in client.calls) == 3
+
+
+def test_422_key_not_retried():
+    client = FakeSearchClient(status_keys={"doc-1": [422, 422, 422]})
+    result = upload_documents_batched(client, make_documents(3, vector_size=4), concurrency=1, max_retries=3)
+    assert result["succeeded"] == 2
+    assert result["failed"]["doc-1"].startswith("422")
+    assert len(client.calls) == 1
+
+
+def test_409_version_conflict_key_retried():
+    client = FakeSearchClient(status_keys={"doc-0": [409]})
+    result = upload_documents_batched(client, make_documents(3, vector_size=4), concurrency=1)
+    assert result["succeeded"] == 3 and not result["failed"]
+    assert client.calls[1] == ["doc-0"]
+
+
+def test_non_retryable_request_error_raised():
+    client = FakeSearchClient(fail_requests=1, request_status=422)
+    try:
+        upload_documents_batched(client, make_documents(2, vector_size=4), concurrency=1)
+    except HttpResponseError as e:
+        assert e.status_code == 422
+    else:
+        raise AssertionError("422 request error should not be retried")
+    assert len(client.calls) == 1
+
+
+def test_batch_stats_reported():
+    client = FakeSearchClient()
+    result = upload_documents_batched(client, make_documents(12, vector_size=4), max_docs=5, concurrency=3)
+    assert [b["documents"] for b in result["batches"]] == [5, 5, 2]
+    assert all(b["bytes"] > 0 and b["attempts"] == 1 for b in result["batches"])
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_") and callable(value)]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"\n{len(tests)} tests passed")